@@ -1 +1,39 @@
+import importlib
+
 from . import config  # noqa: F401
+
+
+# Submódulos carregados só no primeiro acesso (ex: `src.graficos`), para que processos que usam
+# apenas a escoragem não importem matplotlib, seaborn e sklearn.
+SUBMODULOS = [
+    "benchmarks",
+    "dados",
+    "escoragem",
+    "features",
+    "funcoes_auxiliares",
+    "graficos",
+    "instrumentacao",
+    "lucro",
+    "metricas",
+    "models",
+    "oof",
+    "perfil",
+    "preprocessamento",
+    "quantis",
+    "relatorios",
+    "segmentacao",
+    "selecao_features",
+    "servico",
+]
+
+__all__ = ["config"] + SUBMODULOS
+
+
+def __getattr__(nome):
+    if nome in SUBMODULOS:
+        return importlib.import_module(f".{nome}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(SUBMODULOS))
@@ -0,0 +1,229 @@
+"""Teste de carga do serviço de escoragem (`src.servico`).
+
+Reenvia os clientes de `customers_clustered.csv` (mesmo schema usado no treino do modelo) para
+`POST /escorar` com várias conexões keep-alive simultâneas durante um tempo fixo, e mede vazão e
+latência. No final, consulta `/saude` para mostrar a fila e o histograma do tamanho dos lotes.
+
+Uso (a partir da pasta `notebooks`):
+
+    python -m src.benchmarks.carga --iniciar-servidor --workers 4 --conexoes 256 --duracao 10
+    python -m src.benchmarks.carga --porta 8000 --processos 2        # serviço já em execução
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+import numpy as np
+
+
+PASTA_NOTEBOOKS = Path(__file__).resolve().parents[2]
+HOST = "127.0.0.1"
+PORTA = 8000
+
+
+def corpos_requisicao(clientes_por_requisicao=1):
+    """Corpos JSON de `POST /escorar` com os clientes de customers_clustered.csv.
+
+    Parameters
+    ----------
+    clientes_por_requisicao : int, opcional
+        Clientes em cada requisição (1 = formato de um único cliente), por padrão 1
+
+    Returns
+    -------
+    List[bytes]
+    """
+    from ..dados import ler_csv_etapa
+
+    registros = ler_csv_etapa("clusterizado").drop(columns=["Response"]).to_dict("records")
+
+    if clientes_por_requisicao == 1:
+        return [json.dumps(registro).encode() for registro in registros]
+
+    return [
+        json.dumps({"clientes": registros[inicio:inicio + clientes_por_requisicao]}).encode()
+        for inicio in range(0, len(registros), clientes_por_requisicao)
+    ]
+
+
+def _requisicao_http(host, corpo):
+    return (
+        f"POST /escorar HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(corpo)}\r\n\r\n"
+    ).encode("latin-1") + corpo
+
+
+async def _conexao(host, porta, requisicoes, inicio, fim, latencias, erros):
+    reader, writer = await asyncio.open_connection(host, porta)
+    i = inicio
+
+    try:
+        while time.perf_counter() < fim:
+            comeco = time.perf_counter()
+            writer.write(requisicoes[i % len(requisicoes)])
+            i += 1
+
+            cabecalho = await reader.readuntil(b"\r\n\r\n")
+            status = int(cabecalho.split(b" ", 2)[1])
+            tamanho = 0
+            for linha in cabecalho.split(b"\r\n"):
+                if linha.lower().startswith(b"content-length:"):
+                    tamanho = int(linha.split(b":", 1)[1])
+            await reader.readexactly(tamanho)
+
+            latencias.append(time.perf_counter() - comeco)
+            if status != 200:
+                erros.append(status)
+    except (asyncio.IncompleteReadError, ConnectionError) as erro:
+        erros.append(type(erro).__name__)
+    finally:
+        writer.close()
+
+
+async def _executar_conexoes(host, porta, corpos, conexoes, duracao):
+    requisicoes = [_requisicao_http(host, corpo) for corpo in corpos]
+    latencias, erros = [], []
+
+    inicio = time.perf_counter()
+    fim = inicio + duracao
+    await asyncio.gather(*(
+        _conexao(host, porta, requisicoes, i * 997, fim, latencias, erros) for i in range(conexoes)
+    ))
+
+    return latencias, erros, time.perf_counter() - inicio
+
+
+def _processo_cliente(parametros):
+    return asyncio.run(_executar_conexoes(**parametros))
+
+
+def consultar_saude(host=HOST, porta=PORTA, tempo_limite=1.0):
+    """Resposta de `GET /saude` (com vários workers, a de um deles)."""
+    with urllib.request.urlopen(f"http://{host}:{porta}/saude", timeout=tempo_limite) as resposta:
+        return json.loads(resposta.read())
+
+
+def testar_carga(host=HOST, porta=PORTA, conexoes=64, duracao=10.0, processos=1, clientes_por_requisicao=1):
+    """Envia requisições ao serviço durante `duracao` segundos e mede vazão e latência.
+
+    Parameters
+    ----------
+    host, porta : str, int, opcional
+        Endereço do serviço, por padrão 127.0.0.1:8000
+    conexoes : int, opcional
+        Conexões keep-alive simultâneas (somando todos os processos), por padrão 64
+    duracao : float, opcional
+        Duração do teste em segundos, por padrão 10.0
+    processos : int, opcional
+        Processos gerando carga (um cliente asyncio em um único processo pode ser o gargalo),
+        por padrão 1
+    clientes_por_requisicao : int, opcional
+        Clientes em cada requisição, por padrão 1
+
+    Returns
+    -------
+    dict
+        'requisicoes', 'erros', 'requisicoes_por_s', 'clientes_por_s', latências p50/p95/p99 (ms)
+        e a resposta de /saude ao final.
+    """
+    corpos = corpos_requisicao(clientes_por_requisicao)
+    parametros = [
+        {
+            "host": host,
+            "porta": porta,
+            "corpos": corpos,
+            "conexoes": conexoes // processos + (i < conexoes % processos),
+            "duracao": duracao,
+        }
+        for i in range(processos)
+    ]
+
+    if processos == 1:
+        resultados = [_processo_cliente(parametros[0])]
+    else:
+        with multiprocessing.Pool(processos) as pool:
+            resultados = pool.map(_processo_cliente, parametros)
+
+    latencias = np.concatenate([np.asarray(lat) for lat, _, _ in resultados]) * 1000
+    erros = [erro for _, lista, _ in resultados for erro in lista]
+    tempo = max(tempo for _, _, tempo in resultados)
+    p50, p95, p99 = np.percentile(latencias, [50, 95, 99]) if len(latencias) else (np.nan,) * 3
+
+    return {
+        "requisicoes": len(latencias),
+        "erros": len(erros),
+        "requisicoes_por_s": len(latencias) / tempo,
+        "clientes_por_s": len(latencias) * clientes_por_requisicao / tempo,
+        "latencia_p50_ms": p50,
+        "latencia_p95_ms": p95,
+        "latencia_p99_ms": p99,
+        "saude": consultar_saude(host, porta),
+    }
+
+
+def iniciar_servidor(porta=PORTA, workers=1, argumentos_servico=(), tempo_limite=60.0):
+    """Inicia `python -m src.servico` em um subprocesso e espera `/saude` responder."""
+    processo = subprocess.Popen(
+        [sys.executable, "-m", "src.servico", "--porta", str(porta), "--workers", str(workers), *argumentos_servico],
+        cwd=PASTA_NOTEBOOKS,
+    )
+
+    limite = time.monotonic() + tempo_limite
+    while time.monotonic() < limite:
+        if processo.poll() is not None:
+            raise RuntimeError(f"O serviço terminou com código {processo.returncode}.")
+        try:
+            consultar_saude(HOST, porta)
+            # com vários workers, dá tempo para os demais carregarem o modelo
+            time.sleep(0.5 if workers > 1 else 0)
+            return processo
+        except OSError:
+            time.sleep(0.1)
+
+    processo.terminate()
+    raise TimeoutError("O serviço não respondeu em /saude.")
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Teste de carga do serviço de escoragem.")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--porta", type=int, default=PORTA)
+    parser.add_argument("--conexoes", type=int, default=64)
+    parser.add_argument("--duracao", type=float, default=10.0)
+    parser.add_argument("--processos", type=int, default=1, help="Processos gerando carga")
+    parser.add_argument("--clientes-por-requisicao", type=int, default=1)
+    parser.add_argument("--iniciar-servidor", action="store_true", help="Inicia o serviço antes do teste")
+    parser.add_argument("--workers", type=int, default=1, help="Workers do serviço iniciado")
+    parser.add_argument("--exportado", help="Pipeline exportado passado ao serviço iniciado")
+    argumentos = parser.parse_args(argumentos)
+
+    processo = None
+    if argumentos.iniciar_servidor:
+        extras = ["--exportado", argumentos.exportado] if argumentos.exportado else []
+        processo = iniciar_servidor(argumentos.porta, argumentos.workers, extras)
+
+    try:
+        resultado = testar_carga(
+            argumentos.host,
+            argumentos.porta,
+            argumentos.conexoes,
+            argumentos.duracao,
+            argumentos.processos,
+            argumentos.clientes_por_requisicao,
+        )
+    finally:
+        if processo is not None:
+            processo.terminate()
+            processo.wait()
+
+    print(json.dumps(resultado, indent=2, default=float))
+
+
+if __name__ == "__main__":
+    main()
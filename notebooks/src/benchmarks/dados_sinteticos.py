@@ -0,0 +1,187 @@
+"""Gerador de clientes sintéticos com o schema de `ml_project1_data.csv`.
+
+Usa uma cópula gaussiana ajustada na base original: amostras de uma normal multivariada voltam para
+a escala original pelos quantis empíricos de cada coluna, e a correlação da normal é calibrada para
+que a correlação de rank entre as colunas (inclusive com `Response`) seja a da base original. Assim
+as distribuições marginais (valores discretos, caudas, outliers) e as correlações são preservadas,
+para qualquer número de linhas.
+"""
+import numpy as np
+import pandas as pd
+from scipy.special import ndtr
+
+from ..config import PASTA_DADOS
+from ..dados import FORMATOS_DATA
+
+
+ARQUIVO_ORIGINAL = PASTA_DADOS / "ml_project1_data.csv"
+TAMANHO_CHUNK = 1_000_000
+
+COLUNAS_CATEGORICAS = ["Education", "Marital_Status"]
+COLUNAS_CONSTANTES = ["Z_CostContact", "Z_Revenue"]
+
+
+def ajustar_copula(dataframe=None, n_iteracoes=8, tamanho_calibracao=50_000, random_state=42):
+    """Ajusta a cópula gaussiana na base original.
+
+    Parameters
+    ----------
+    dataframe : pandas.DataFrame, opcional
+        Base no formato de ml_project1_data.csv, por padrão None (lê `ARQUIVO_ORIGINAL`)
+    n_iteracoes : int, opcional
+        Iterações de correção da correlação latente, por padrão 8
+    tamanho_calibracao : int, opcional
+        Linhas geradas em cada iteração de correção, por padrão 50_000
+    random_state : int, opcional
+        Semente da calibração, por padrão 42
+
+    Returns
+    -------
+    dict
+        Colunas modeladas, matriz de Cholesky da correlação, valores ordenados de cada coluna
+        (quantis empíricos), tipos originais, categorias, proporção de faltantes e valores constantes.
+    """
+    if dataframe is None:
+        dataframe = pd.read_csv(ARQUIVO_ORIGINAL, sep="\t")
+
+    dataframe = dataframe.drop(columns=["ID"])
+    tipos = dataframe.dtypes.to_dict()
+    datas = pd.to_datetime(dataframe["Dt_Customer"], format=FORMATOS_DATA["Dt_Customer"])
+    dataframe = dataframe.assign(Dt_Customer=(datas - pd.Timestamp("1970-01-01")).dt.days)
+
+    # categorias ordenadas pela frequência, para que os códigos tenham uma ordem estável
+    categorias = {
+        coluna: dataframe[coluna].value_counts().index.to_numpy() for coluna in COLUNAS_CATEGORICAS
+    }
+    for coluna, valores in categorias.items():
+        dataframe[coluna] = pd.Categorical(dataframe[coluna], categories=valores).codes
+
+    colunas = [coluna for coluna in dataframe.columns if coluna not in COLUNAS_CONSTANTES]
+    faltantes = dataframe[colunas].isna().mean()
+    quantis = {coluna: np.sort(dataframe[coluna].dropna().to_numpy()) for coluna in colunas}
+
+    # correlação de rank alvo (faltantes entram com a mediana; eles são sorteados à parte na geração)
+    alvo = dataframe[colunas].fillna(dataframe[colunas].median()).corr(method="spearman").to_numpy()
+    alvo = np.nan_to_num(alvo)
+    np.fill_diagonal(alvo, 1.0)
+
+    # Colunas discretas (binárias, contagens) perdem correlação ao voltar dos normais para os
+    # quantis empíricos. A correlação da normal latente é corrigida iterativamente até a
+    # correlação de rank das amostras geradas ficar próxima da original.
+    rng = np.random.default_rng(random_state)
+    latente = alvo.copy()
+    for _ in range(n_iteracoes):
+        cholesky = _cholesky(latente)
+        amostra = _valores(quantis, colunas, ndtr(rng.standard_normal((tamanho_calibracao, len(colunas))) @ cholesky.T))
+        gerada = np.nan_to_num(pd.DataFrame(amostra).corr(method="spearman").to_numpy())
+        np.fill_diagonal(gerada, 1.0)
+        latente = np.clip(latente + (alvo - gerada), -0.999, 0.999)
+        np.fill_diagonal(latente, 1.0)
+
+    return {
+        "colunas": colunas,
+        "cholesky": _cholesky(latente),
+        "quantis": quantis,
+        "tipos": tipos,
+        "categorias": categorias,
+        "faltantes": faltantes[faltantes > 0].to_dict(),
+        "constantes": {coluna: dataframe[coluna].iloc[0] for coluna in COLUNAS_CONSTANTES},
+        "colunas_originais": ["ID"] + list(dataframe.columns),
+    }
+
+
+def _cholesky(correlacao):
+    # projeta na matriz de correlação positiva definida mais próxima antes da decomposição
+    autovalores, autovetores = np.linalg.eigh(correlacao)
+    correlacao = autovetores @ np.diag(np.maximum(autovalores, 1e-6)) @ autovetores.T
+    desvios = np.sqrt(np.diag(correlacao))
+
+    return np.linalg.cholesky(correlacao / np.outer(desvios, desvios))
+
+
+def _valores(quantis, colunas, U):
+    # quantil empírico (inverso da distribuição acumulada) de cada coluna: mantém os valores discretos
+    saida = np.empty(U.shape)
+    for i, coluna in enumerate(colunas):
+        ordenados = quantis[coluna]
+        saida[:, i] = ordenados[np.minimum((U[:, i] * len(ordenados)).astype(np.int64), len(ordenados) - 1)]
+    return saida
+
+
+def _gerar_chunk(copula, n_linhas, inicio_id, rng):
+    U = ndtr(rng.standard_normal((n_linhas, len(copula["colunas"]))) @ copula["cholesky"].T)
+    matriz = _valores(copula["quantis"], copula["colunas"], U)
+
+    dados = {"ID": np.arange(inicio_id, inicio_id + n_linhas, dtype=np.int64)}
+
+    for i, coluna in enumerate(copula["colunas"]):
+        valores = matriz[:, i]
+
+        if coluna in copula["categorias"]:
+            valores = pd.Categorical.from_codes(valores.astype(np.int64), categories=copula["categorias"][coluna])
+        elif coluna == "Dt_Customer":
+            valores = (pd.Timestamp("1970-01-01") + pd.to_timedelta(valores, unit="D")).strftime(
+                FORMATOS_DATA["Dt_Customer"]
+            )
+        elif coluna in copula["faltantes"]:
+            valores = valores.copy()
+            valores[rng.random(n_linhas) < copula["faltantes"][coluna]] = np.nan
+        else:
+            # volta ao tipo da base original (contagens e binárias são int64 em ml_project1_data.csv)
+            valores = valores.astype(copula["tipos"][coluna])
+
+        dados[coluna] = valores
+
+    for coluna, valor in copula["constantes"].items():
+        dados[coluna] = np.full(n_linhas, valor)
+
+    return pd.DataFrame(dados)[copula["colunas_originais"]]
+
+
+def gerar_em_chunks(n_linhas, copula=None, tamanho_chunk=TAMANHO_CHUNK, random_state=42):
+    """Gera clientes sintéticos em blocos (a memória depende de `tamanho_chunk`, não de `n_linhas`).
+
+    Parameters
+    ----------
+    n_linhas : int
+        Total de clientes.
+    copula : dict, opcional
+        Resultado de `ajustar_copula`, por padrão None (ajusta na base original)
+    tamanho_chunk : int, opcional
+        Linhas por bloco, por padrão 1_000_000
+    random_state : int, opcional
+        Semente, por padrão 42
+
+    Yields
+    ------
+    pandas.DataFrame
+        Blocos com as colunas de ml_project1_data.csv (IDs sequenciais a partir de 0).
+    """
+    if copula is None:
+        copula = ajustar_copula()
+
+    rng = np.random.default_rng(random_state)
+
+    for inicio in range(0, n_linhas, tamanho_chunk):
+        yield _gerar_chunk(copula, min(tamanho_chunk, n_linhas - inicio), inicio, rng)
+
+
+def gerar_dados_sinteticos(n_linhas, copula=None, tamanho_chunk=TAMANHO_CHUNK, random_state=42):
+    """Gera `n_linhas` clientes sintéticos em um único dataframe (ver `gerar_em_chunks`)."""
+    return pd.concat(
+        gerar_em_chunks(n_linhas, copula, tamanho_chunk, random_state), ignore_index=True
+    ).astype({coluna: "category" for coluna in COLUNAS_CATEGORICAS})
+
+
+def salvar_dados_sinteticos(n_linhas, caminho, copula=None, tamanho_chunk=TAMANHO_CHUNK, random_state=42):
+    """Grava clientes sintéticos em um CSV separado por tabulação, bloco a bloco.
+
+    Returns
+    -------
+    pathlib.Path ou str
+        Caminho do arquivo gravado.
+    """
+    for i, chunk in enumerate(gerar_em_chunks(n_linhas, copula, tamanho_chunk, random_state)):
+        chunk.to_csv(caminho, sep="\t", index=False, mode="w" if i == 0 else "a", header=i == 0)
+
+    return caminho
@@ -0,0 +1,174 @@
+"""Preprocessamento padrão x `esparso=True` em dados com categorias de cardinalidades diferentes.
+
+Os clientes sintéticos de `suite.clientes` recebem colunas de loja, região e produto com
+frequências desiguais (poucas categorias concentram a maioria dos clientes), como as categorias
+que entram no modelo da campanha. O mesmo pipeline (preprocessamento do notebook 03 +
+LogisticRegression) é medido com `construir_preprocessamento` padrão (sparse_threshold=0.3 do
+sklearn) e com `construir_preprocessamento(..., esparso=True)`.
+
+O ColumnTransformer padrão já devolve CSR quando a densidade da saída fica abaixo de 0.3, então
+a opção só muda o resultado quando o one-hot deixa a matriz mais densa que isso. Por isso são
+medidos dois cenários (`CENARIOS`): 'largo', com muitas categorias (densidade ~1,4%, as duas
+saídas são CSR), e 'estreito', com poucas categorias (densidade ~39%, a saída padrão é densa).
+
+Uso (a partir da pasta `notebooks`):
+
+    python -m src.benchmarks.esparso
+    python -m src.benchmarks.esparso --linhas 50000 --cardinalidades Loja=1000 Produto=5000
+"""
+import argparse
+
+from .suite import COLUNAS_REMOVIDAS_MODELO, RANDOM_STATE, _medir, clientes
+
+
+N_LINHAS = 20_000
+CARDINALIDADES = {"Loja": 500, "Regiao": 30, "Produto": 2_000}
+CENARIOS = {"largo": CARDINALIDADES, "estreito": {"Loja": 20, "Regiao": 5}}
+
+
+def dados_largos(n_linhas=N_LINHAS, cardinalidades=None, random_state=RANDOM_STATE):
+    """Clientes sintéticos do modelo da campanha com colunas categóricas de alta cardinalidade.
+
+    Parameters
+    ----------
+    n_linhas : int, opcional
+        Número de clientes gerados, por padrão 20_000
+    cardinalidades : dict, opcional
+        Coluna -> número de categorias, por padrão None (`CARDINALIDADES`)
+    random_state : int, opcional
+        Semente das colunas categóricas, por padrão 42
+
+    Returns
+    -------
+    Tuple[pandas.DataFrame, pandas.Series]
+        Features e 'Response'.
+    """
+    import numpy as np
+
+    cardinalidades = CARDINALIDADES if cardinalidades is None else cardinalidades
+    rng = np.random.default_rng(random_state)
+
+    df = clientes(n_linhas).drop(columns=COLUNAS_REMOVIDAS_MODELO)
+    X, y = df.drop(columns=["Response"]), df["Response"]
+
+    novas = {}
+    for coluna, n_categorias in cardinalidades.items():
+        # frequência proporcional a 1 / posição (lei de Zipf)
+        pesos = 1 / np.arange(1, n_categorias + 1)
+        codigos = rng.choice(n_categorias, size=len(X), p=pesos / pesos.sum())
+        novas[coluna] = np.char.add(f"{coluna}_", codigos.astype(str))
+
+    return X.assign(**novas), y
+
+
+def _pipelines(X, cardinalidades):
+    from sklearn.linear_model import LogisticRegression
+
+    from ..models import construir_pipeline_modelo_classificacao
+    from ..preprocessamento import (
+        COLUNAS_ONE_HOT_CLUSTERIZACAO,
+        COLUNAS_STANDARD_CLUSTERIZACAO,
+        colunas_por_transformacao,
+        construir_preprocessamento,
+    )
+
+    colunas = colunas_por_transformacao(
+        X.columns, COLUNAS_ONE_HOT_CLUSTERIZACAO + list(cardinalidades), COLUNAS_STANDARD_CLUSTERIZACAO
+    )
+    classificador = LogisticRegression(class_weight="balanced", max_iter=1000, random_state=RANDOM_STATE)
+
+    return {
+        "padrao": construir_pipeline_modelo_classificacao(classificador, construir_preprocessamento(colunas)),
+        "esparso": construir_pipeline_modelo_classificacao(
+            classificador, construir_preprocessamento(colunas), esparso=True
+        ),
+    }
+
+
+def _tamanho_mb(matriz):
+    if hasattr(matriz, "indptr"):
+        return (matriz.data.nbytes + matriz.indices.nbytes + matriz.indptr.nbytes) / 2**20
+    return matriz.nbytes / 2**20
+
+
+def _densidade(matriz):
+    nao_nulos = matriz.nnz if hasattr(matriz, "nnz") else (matriz != 0).sum()
+    return nao_nulos / (matriz.shape[0] * matriz.shape[1])
+
+
+def comparar_denso_esparso(n_linhas=N_LINHAS, cenarios=None, repeticoes=1):
+    """Mede tempo e pico de memória do preprocessamento e do pipeline completo, padrão e esparso.
+
+    Parameters
+    ----------
+    n_linhas : int, opcional
+        Número de clientes gerados, por padrão 20_000
+    cenarios : dict, opcional
+        Nome do cenário -> {coluna: número de categorias}, por padrão None (`CENARIOS`)
+    repeticoes : int, opcional
+        Execuções cronometradas de cada medição, por padrão 1
+
+    Returns
+    -------
+    pandas.DataFrame
+        Uma linha por cenário, modo ('padrao', 'esparso') e etapa ('preprocessamento' = fit_transform
+        do ColumnTransformer, 'pipeline' = fit do preprocessamento + LogisticRegression), com
+        'tempo_s', 'memoria_pico_mb', o formato ('saida', 'densa' ou 'csr'), a densidade e o tamanho
+        da matriz gerada ('saida_mb') e o número de colunas.
+    """
+    import pandas as pd
+
+    cenarios = CENARIOS if cenarios is None else cenarios
+
+    resultados = []
+    for cenario, cardinalidades in cenarios.items():
+        X, y = dados_largos(n_linhas, cardinalidades)
+
+        for modo, pipeline in _pipelines(X, cardinalidades).items():
+            preprocessor = pipeline["preprocessor"]
+            saida = preprocessor.fit_transform(X)
+
+            casos = {
+                "preprocessamento": {"preparar": lambda _: X, "executar": preprocessor.fit_transform},
+                "pipeline": {"preparar": lambda _: (X, y), "executar": lambda entradas: pipeline.fit(*entradas)},
+            }
+            for etapa, caso in casos.items():
+                tempo, memoria = _medir(caso, n_linhas, repeticoes)
+                resultados.append({
+                    "cenario": cenario,
+                    "modo": modo,
+                    "etapa": etapa,
+                    "tempo_s": tempo,
+                    "memoria_pico_mb": memoria,
+                    "saida": "csr" if hasattr(saida, "nnz") else "densa",
+                    "densidade": _densidade(saida),
+                    "saida_mb": _tamanho_mb(saida),
+                    "n_colunas": saida.shape[1],
+                })
+                print(f"{cenario} / {modo} / {etapa}: {tempo:.3f} s, {memoria:.1f} MB", flush=True)
+
+    return pd.DataFrame(resultados)
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Preprocessamento padrão x esparso=True.")
+    parser.add_argument("--linhas", type=int, default=N_LINHAS, help="Número de clientes gerados")
+    parser.add_argument(
+        "--cardinalidades", nargs="+", metavar="COLUNA=N",
+        help="Colunas categóricas de um único cenário (padrão: cenários 'largo' e 'estreito')",
+    )
+    parser.add_argument("--repeticoes", type=int, default=1, help="Execuções cronometradas por medição")
+    argumentos = parser.parse_args(argumentos)
+
+    cenarios = None
+    if argumentos.cardinalidades:
+        cenarios = {"personalizado": {
+            coluna: int(n) for coluna, n in (item.split("=") for item in argumentos.cardinalidades)
+        }}
+
+    resultados = comparar_denso_esparso(argumentos.linhas, cenarios, argumentos.repeticoes)
+    print(resultados.to_string(index=False, float_format="{:.3f}".format))
+
+
+if __name__ == "__main__":
+    main()
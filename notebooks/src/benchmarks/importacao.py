@@ -0,0 +1,123 @@
+"""Tempo de inicialização de processos que usam o pacote `src`.
+
+Cada cenário roda em um interpretador novo (como um worker de escoragem ou uma CLI), algumas vezes,
+e o resultado mostra o tempo total do processo e quais dependências pesadas foram importadas.
+
+Uso (a partir da pasta `notebooks`):
+
+    python -m src.benchmarks.importacao --repeticoes 5
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+
+PASTA_NOTEBOOKS = Path(__file__).resolve().parents[2]
+
+MODULOS_PESADOS = ["pandas", "scipy", "sklearn", "matplotlib", "seaborn", "joblib"]
+
+# Código executado em cada cenário; `{exportado}` é o caminho de um pipeline exportado temporário
+CENARIOS = {
+    "python (sem imports)": "pass",
+    "import src": "import src",
+    "escoragem: import": "import src.escoragem",
+    "escoragem: 1 registro (exportado)": (
+        "from src.escoragem import carregar_pipeline_exportado, escorar_registro\n"
+        "exportado = carregar_pipeline_exportado(r'{exportado}')\n"
+        "escorar_registro(exportado, {registro})"
+    ),
+    "escoragem: 1 registro (pipeline sklearn)": (
+        "import pandas as pd\n"
+        "from src.escoragem import carregar_modelo, escorar_dataframe\n"
+        "escorar_dataframe(carregar_modelo(), pd.DataFrame([{registro}]))"
+    ),
+    "models: import": "import src.models",
+    "graficos: import": "import src.graficos",
+}
+
+_SUFIXO = (
+    "\nimport json, sys\n"
+    "print(json.dumps([m for m in {pesados!r} if m in sys.modules]))"
+)
+
+
+def _executar(codigo):
+    inicio = time.perf_counter()
+    saida = subprocess.run(
+        [sys.executable, "-c", codigo], cwd=PASTA_NOTEBOOKS, capture_output=True, text=True, check=True
+    )
+    tempo = time.perf_counter() - inicio
+
+    return tempo, json.loads(saida.stdout.strip().splitlines()[-1])
+
+
+def _registro_exemplo():
+    from .. import dados
+
+    registro = dados.ler_csv_etapa("clusterizado").drop(columns=["Response"]).iloc[0].to_dict()
+    return {chave: (valor.item() if hasattr(valor, "item") else valor) for chave, valor in registro.items()}
+
+
+def medir_importacao(cenarios=None, repeticoes=5):
+    """Mede o tempo de inicialização de cada cenário em processos novos.
+
+    Parameters
+    ----------
+    cenarios : List[str], opcional
+        Nomes dos cenários (chaves de `CENARIOS`), por padrão None (todos)
+    repeticoes : int, opcional
+        Número de processos por cenário, por padrão 5
+
+    Returns
+    -------
+    pandas.DataFrame
+        Mediana e mínimo do tempo (s) de cada cenário e as dependências pesadas importadas.
+    """
+    import pandas as pd
+
+    from ..escoragem import carregar_modelo, exportar_pipeline_linear, salvar_pipeline_exportado
+
+    cenarios = list(CENARIOS) if cenarios is None else list(cenarios)
+    resultados = []
+
+    with tempfile.TemporaryDirectory() as pasta:
+        exportado = salvar_pipeline_exportado(
+            exportar_pipeline_linear(carregar_modelo()), Path(pasta) / "pipeline_exportado.joblib"
+        )
+        registro = _registro_exemplo()
+
+        for nome in cenarios:
+            codigo = CENARIOS[nome].format(exportado=exportado, registro=registro)
+            codigo += _SUFIXO.format(pesados=MODULOS_PESADOS)
+
+            _executar(codigo)  # aquece o cache de arquivos do sistema operacional
+            execucoes = [_executar(codigo) for _ in range(repeticoes)]
+            tempos = [tempo for tempo, _ in execucoes]
+
+            resultados.append({
+                "cenario": nome,
+                "mediana_s": statistics.median(tempos),
+                "minimo_s": min(tempos),
+                "modulos_pesados": ", ".join(execucoes[-1][1]) or "-",
+            })
+
+    return pd.DataFrame(resultados).set_index("cenario")
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Tempo de inicialização de processos que usam o pacote src.")
+    parser.add_argument("--cenarios", nargs="+", help="Cenários a medir (padrão: todos)")
+    parser.add_argument("--repeticoes", type=int, default=5, help="Processos por cenário")
+    argumentos = parser.parse_args(argumentos)
+
+    resultados = medir_importacao(argumentos.cenarios, argumentos.repeticoes)
+    print(resultados.to_string(float_format="{:.3f}".format))
+
+
+if __name__ == "__main__":
+    main()
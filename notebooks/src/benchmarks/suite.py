@@ -0,0 +1,389 @@
+"""Tempo e pico de memória das funções de `models`, `graficos` e dos helpers de outliers.
+
+Os clientes são gerados por `dados_sinteticos` (mesmo schema e correlações de
+ml_project1_data.csv) e passam pelas mesmas etapas dos notebooks (features derivadas e
+preprocessamento) antes de cada caso. Cada caso roda em cada tamanho até o seu `tamanho_maximo`.
+
+Uso (a partir da pasta `notebooks`):
+
+    python -m src.benchmarks.suite                            # compara com o baseline salvo
+    python -m src.benchmarks.suite --tamanhos 10000 --funcoes remove_outliers
+    python -m src.benchmarks.suite --salvar-baseline
+
+O baseline fica em `PASTA_BENCHMARKS / "baseline.json"`. Casos cujo tempo ou pico de memória
+passam do baseline por mais que a tolerância são marcados como regressão.
+"""
+import argparse
+import json
+import platform
+import time
+import tracemalloc
+
+from ..config import PASTA_BENCHMARKS, RANDOM_STATE
+from ..preprocessamento import COLUNAS_REMOVIDAS_MODELO
+from .dados_sinteticos import ajustar_copula, gerar_em_chunks
+
+
+ARQUIVO_BASELINE = PASTA_BENCHMARKS / "baseline.json"
+TAMANHOS = [10_000, 1_000_000, 10_000_000]
+TOLERANCIA = 0.2
+
+COLUNAS_NAO_MODELADAS = ["ID", "Year_Birth", "Dt_Customer", "Z_CostContact", "Z_Revenue"]
+COLUNAS_OUTLIERS = ["Income", "MntWines", "MntMeatProducts", "MntGoldProds", "NumWebPurchases"]
+
+
+# ------------------------------------------------------------------------------------------------
+# Dados
+# ------------------------------------------------------------------------------------------------
+
+_COPULA = {}
+_CLIENTES = {}
+
+
+def _tratar_chunk(chunk, colunas):
+    from ..features import calcular_features
+
+    # mesmas etapas do notebook 01: estado civil agrupado e clientes sem renda removidos
+    df = calcular_features(chunk.dropna(subset=["Income"]))
+    df["Marital_Status"] = df["Marital_Status"].isin(["Married", "Together"]).map({True: "Partner", False: "Single"})
+    df = df.drop(columns=COLUNAS_NAO_MODELADAS)
+
+    return df if colunas is None else df[colunas]
+
+
+def clientes(n_linhas, colunas=None):
+    """Clientes sintéticos tratados (com as features derivadas), guardados em memória por tamanho.
+
+    Parameters
+    ----------
+    n_linhas : int
+        Número de clientes gerados (os que não têm renda são removidos depois).
+    colunas : List[str], opcional
+        Colunas mantidas; com poucas colunas a memória não depende das demais, por padrão None (todas)
+
+    Returns
+    -------
+    pandas.DataFrame
+    """
+    import pandas as pd
+
+    chave = (n_linhas, None if colunas is None else tuple(colunas))
+
+    if chave not in _CLIENTES:
+        if "copula" not in _COPULA:
+            _COPULA["copula"] = ajustar_copula()
+
+        chunks = gerar_em_chunks(n_linhas, _COPULA["copula"], random_state=RANDOM_STATE)
+        _CLIENTES[chave] = pd.concat([_tratar_chunk(chunk, colunas) for chunk in chunks], ignore_index=True)
+
+    return _CLIENTES[chave]
+
+
+def _dados_classificacao(n_linhas):
+    from sklearn.model_selection import StratifiedKFold
+
+    from ..preprocessamento import (
+        COLUNAS_ONE_HOT_CLUSTERIZACAO,
+        COLUNAS_STANDARD_CLUSTERIZACAO,
+        colunas_por_transformacao,
+        construir_preprocessamento,
+    )
+
+    df = clientes(n_linhas).drop(columns=COLUNAS_REMOVIDAS_MODELO)
+    X, y = df.drop(columns=["Response"]), df["Response"]
+
+    colunas = colunas_por_transformacao(X.columns, COLUNAS_ONE_HOT_CLUSTERIZACAO, COLUNAS_STANDARD_CLUSTERIZACAO)
+    categorias = {coluna: sorted(X[coluna].unique()) for coluna in colunas["one-hot"]}
+    preprocessor = construir_preprocessamento(colunas, categorias)
+
+    cv = StratifiedKFold(n_splits=3, shuffle=True, random_state=RANDOM_STATE)
+
+    return X, y, cv, preprocessor
+
+
+def _dados_clusterizacao(n_linhas):
+    from ..preprocessamento import (
+        COLUNAS_ONE_HOT_CLUSTERIZACAO,
+        COLUNAS_STANDARD_CLUSTERIZACAO,
+        colunas_por_transformacao,
+        construir_preprocessamento,
+    )
+
+    df = clientes(n_linhas)
+    colunas = colunas_por_transformacao(df.columns, COLUNAS_ONE_HOT_CLUSTERIZACAO, COLUNAS_STANDARD_CLUSTERIZACAO)
+
+    return construir_preprocessamento(colunas).fit_transform(df)
+
+
+# ------------------------------------------------------------------------------------------------
+# Casos: `preparar(n_linhas)` monta as entradas (fora da medição) e `executar(entradas)` é medido
+# ------------------------------------------------------------------------------------------------
+
+def _preparar_treino(n_linhas):
+    from sklearn.linear_model import LogisticRegression
+
+    X, y, cv, preprocessor = _dados_classificacao(n_linhas)
+    classificador = LogisticRegression(class_weight="balanced", max_iter=1000, random_state=RANDOM_STATE)
+
+    return X, y, cv, classificador, preprocessor
+
+
+def _executar_treino(entradas):
+    from ..models import treinar_e_validar_modelo_classificacao
+
+    X, y, cv, classificador, preprocessor = entradas
+    treinar_e_validar_modelo_classificacao(X, y, cv, classificador, preprocessor)
+
+
+def _executar_grid_search(entradas):
+    from ..models import grid_search_cv_classificador
+
+    X, y, cv, classificador, preprocessor = entradas
+    grid_search = grid_search_cv_classificador(
+        classificador, {"clf__C": [0.1, 1.0]}, cv, preprocessor=preprocessor
+    )
+    grid_search.set_params(verbose=0)
+    grid_search.fit(X, y)
+
+
+def _preparar_resultados(n_linhas):
+    import numpy as np
+
+    # saída de cross_validate de 10 modelos; `n_linhas` é o total de linhas do dataframe final
+    rng = np.random.default_rng(RANDOM_STATE)
+    n_folds = max(n_linhas // 10, 1)
+    metricas = ["fit_time", "score_time", "test_accuracy", "test_roc_auc", "test_average_precision"]
+
+    return {f"modelo_{i}": {metrica: rng.random(n_folds) for metrica in metricas} for i in range(10)}
+
+
+def _executar_resultados(resultados):
+    from ..models import organiza_resultados
+
+    # organiza_resultados altera o dicionário recebido (adiciona 'time_seconds')
+    organiza_resultados({nome: dict(metricas) for nome, metricas in resultados.items()})
+
+
+def _executar_elbow_silhouette(X):
+    import matplotlib.pyplot as plt
+
+    from ..graficos import grafico_elbow_silhouette
+
+    grafico_elbow_silhouette(X, random_state=RANDOM_STATE, intervalo_k=(2, 6), n_init=3)
+    plt.close("all")
+
+
+def _preparar_outliers(n_linhas):
+    return clientes(n_linhas, COLUNAS_OUTLIERS)
+
+
+def _executar_limites_outliers(df):
+    from ..funcoes_auxiliares import limites_outliers
+
+    limites_outliers(df, COLUNAS_OUTLIERS)
+
+
+def _executar_inspect_outliers(df):
+    from ..funcoes_auxiliares import inspect_outliers
+
+    inspect_outliers(df, COLUNAS_OUTLIERS)
+
+
+def _executar_remove_outliers(df):
+    from ..funcoes_auxiliares import remove_outliers
+
+    remove_outliers(df, COLUNAS_OUTLIERS)
+
+
+CASOS = {
+    "treinar_e_validar_modelo_classificacao": {
+        "preparar": _preparar_treino, "executar": _executar_treino, "tamanho_maximo": 1_000_000,
+    },
+    "grid_search_cv_classificador": {
+        "preparar": _preparar_treino, "executar": _executar_grid_search, "tamanho_maximo": 1_000_000,
+    },
+    "organiza_resultados": {
+        "preparar": _preparar_resultados, "executar": _executar_resultados, "tamanho_maximo": 10_000_000,
+    },
+    "grafico_elbow_silhouette": {
+        "preparar": _dados_clusterizacao, "executar": _executar_elbow_silhouette, "tamanho_maximo": 1_000_000,
+    },
+    "limites_outliers": {
+        "preparar": _preparar_outliers, "executar": _executar_limites_outliers, "tamanho_maximo": 10_000_000,
+    },
+    "inspect_outliers": {
+        "preparar": _preparar_outliers, "executar": _executar_inspect_outliers, "tamanho_maximo": 10_000_000,
+    },
+    "remove_outliers": {
+        "preparar": _preparar_outliers, "executar": _executar_remove_outliers, "tamanho_maximo": 10_000_000,
+    },
+}
+
+
+# ------------------------------------------------------------------------------------------------
+# Medição e baseline
+# ------------------------------------------------------------------------------------------------
+
+def _medir(caso, n_linhas, repeticoes):
+    import matplotlib
+
+    matplotlib.use("Agg")
+
+    entradas = caso["preparar"](n_linhas)
+
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        caso["executar"](entradas)
+        tempos.append(time.perf_counter() - inicio)
+
+    # execução separada para a memória: o tracemalloc deixa o código mais lento
+    tracemalloc.start()
+    caso["executar"](entradas)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return min(tempos), pico / 2**20
+
+
+def executar_benchmarks(funcoes=None, tamanhos=None, repeticoes=1):
+    """Mede o tempo (melhor de `repeticoes`) e o pico de memória de cada caso em cada tamanho.
+
+    O pico de memória é o das alocações do processo atual rastreadas pelo `tracemalloc` (Python
+    e numpy); workers de outros processos (ex: `n_jobs=-1` do GridSearchCV) não entram na conta.
+
+    Parameters
+    ----------
+    funcoes : List[str], opcional
+        Casos a medir (chaves de `CASOS`), por padrão None (todos)
+    tamanhos : List[int], opcional
+        Número de clientes gerados, por padrão None (10_000, 1_000_000 e 10_000_000)
+    repeticoes : int, opcional
+        Execuções cronometradas de cada caso, por padrão 1
+
+    Returns
+    -------
+    pandas.DataFrame
+        Uma linha por caso e tamanho, com 'tempo_s' e 'memoria_pico_mb'.
+    """
+    import pandas as pd
+
+    funcoes = list(CASOS) if funcoes is None else list(funcoes)
+    tamanhos = TAMANHOS if tamanhos is None else sorted(tamanhos)
+
+    resultados = []
+    for n_linhas in tamanhos:
+        for nome in funcoes:
+            caso = CASOS[nome]
+            if n_linhas > caso["tamanho_maximo"]:
+                continue
+
+            tempo, memoria = _medir(caso, n_linhas, repeticoes)
+            resultados.append({"funcao": nome, "n_linhas": n_linhas, "tempo_s": tempo, "memoria_pico_mb": memoria})
+            print(f"{nome} ({n_linhas:_} linhas): {tempo:.3f} s, {memoria:.1f} MB", flush=True)
+
+        # libera os dados do tamanho atual antes de gerar o próximo
+        _CLIENTES.clear()
+
+    return pd.DataFrame(resultados, columns=["funcao", "n_linhas", "tempo_s", "memoria_pico_mb"])
+
+
+def _ambiente():
+    import numpy as np
+    import pandas as pd
+    import sklearn
+
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "sklearn": sklearn.__version__,
+        "maquina": platform.machine(),
+        "processador": platform.processor(),
+    }
+
+
+def salvar_baseline(resultados, arquivo=ARQUIVO_BASELINE):
+    """Atualiza o baseline com os resultados medidos (os demais casos e tamanhos são mantidos)."""
+    baseline = carregar_baseline(arquivo)
+    medicoes = baseline.get("medicoes", {})
+
+    for linha in resultados.itertuples():
+        medicoes[f"{linha.funcao}|{linha.n_linhas}"] = {
+            "tempo_s": linha.tempo_s, "memoria_pico_mb": linha.memoria_pico_mb
+        }
+
+    arquivo.parent.mkdir(parents=True, exist_ok=True)
+    arquivo.write_text(json.dumps({"ambiente": _ambiente(), "medicoes": medicoes}, indent=2))
+
+    return arquivo
+
+
+def carregar_baseline(arquivo=ARQUIVO_BASELINE):
+    if not arquivo.exists():
+        return {}
+    return json.loads(arquivo.read_text())
+
+
+def comparar_com_baseline(resultados, baseline=None, tolerancia=TOLERANCIA):
+    """Compara os resultados medidos com o baseline.
+
+    Parameters
+    ----------
+    resultados : pandas.DataFrame
+        Saída de `executar_benchmarks`.
+    baseline : dict, opcional
+        Conteúdo do baseline, por padrão None (lê `ARQUIVO_BASELINE`)
+    tolerancia : float, opcional
+        Aumento relativo aceito antes de marcar uma regressão, por padrão 0.2 (20%)
+
+    Returns
+    -------
+    pandas.DataFrame
+        Os resultados com os valores do baseline, as razões medido / baseline e a coluna
+        'regressao' (tempo ou memória acima de 1 + tolerancia).
+    """
+    import pandas as pd
+
+    if baseline is None:
+        baseline = carregar_baseline()
+    medicoes = baseline.get("medicoes", {})
+
+    chaves = resultados["funcao"] + "|" + resultados["n_linhas"].astype(str)
+    referencia = pd.DataFrame([medicoes.get(chave, {}) for chave in chaves], index=resultados.index)
+    referencia = referencia.reindex(columns=["tempo_s", "memoria_pico_mb"])
+
+    comparacao = resultados.assign(
+        tempo_baseline_s=referencia["tempo_s"],
+        memoria_baseline_mb=referencia["memoria_pico_mb"],
+    )
+    comparacao["razao_tempo"] = comparacao["tempo_s"] / comparacao["tempo_baseline_s"]
+    comparacao["razao_memoria"] = comparacao["memoria_pico_mb"] / comparacao["memoria_baseline_mb"]
+    comparacao["regressao"] = (comparacao["razao_tempo"] > 1 + tolerancia) | (
+        comparacao["razao_memoria"] > 1 + tolerancia
+    )
+
+    return comparacao
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Benchmarks de models, graficos e dos helpers de outliers.")
+    parser.add_argument("--funcoes", nargs="+", choices=list(CASOS), help="Casos a medir (padrão: todos)")
+    parser.add_argument("--tamanhos", nargs="+", type=int, help="Número de clientes (padrão: 10k, 1M e 10M)")
+    parser.add_argument("--repeticoes", type=int, default=1, help="Execuções cronometradas por caso")
+    parser.add_argument("--tolerancia", type=float, default=TOLERANCIA, help="Aumento aceito sobre o baseline")
+    parser.add_argument("--salvar-baseline", action="store_true", help="Grava os resultados como baseline")
+    argumentos = parser.parse_args(argumentos)
+
+    resultados = executar_benchmarks(argumentos.funcoes, argumentos.tamanhos, argumentos.repeticoes)
+    comparacao = comparar_com_baseline(resultados, tolerancia=argumentos.tolerancia)
+    print(comparacao.to_string(index=False, float_format="{:.3f}".format))
+
+    if argumentos.salvar_baseline:
+        print(f"Baseline salvo em {salvar_baseline(resultados)}")
+    elif comparacao["regressao"].any():
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,9 @@ from pathlib import Path
 
 PASTA_PROJETO = Path(__file__).resolve().parents[2]
 
+# semente usada nos modelos, amostras e benchmarks
+RANDOM_STATE = 42
+
 PASTA_DADOS = PASTA_PROJETO / "dados"
 
 # coloque abaixo o caminho para os arquivos de dados de seu projeto
@@ -10,7 +13,12 @@ DADOS_ORIGINAIS = PASTA_DADOS / "exemplo.csv"
 
 # coloque abaixo o caminho para os arquivos de modelos de seu projeto
 PASTA_MODELOS = PASTA_PROJETO / "modelos"
+MODELO_CAMPANHA = PASTA_MODELOS / "logistic_regression_marketing_campaign.joblib"
+MODELO_SEGMENTACAO = PASTA_MODELOS / "segmentacao_clientes.joblib"
+PASTA_OOF = PASTA_MODELOS / "oof"
 
 # coloque abaixo outros caminhos que você julgar necessário
 PASTA_RELATORIOS = PASTA_PROJETO / "relatorios"
 PASTA_IMAGENS = PASTA_RELATORIOS / "imagens"
+PASTA_CACHE = PASTA_PROJETO / "cache"
+PASTA_BENCHMARKS = PASTA_RELATORIOS / "benchmarks"
@@ -0,0 +1,210 @@
+import numpy as np
+import pandas as pd
+
+from .config import PASTA_DADOS
+
+
+# Cada etapa do projeto: arquivo CSV de origem e parâmetros de leitura
+ETAPAS_CSV = {
+    "original": {"arquivo": "ml_project1_data.csv", "sep": "\t"},
+    "limpo": {"arquivo": "customers_data_cleaned.csv", "sep": ","},
+    "novas_features": {"arquivo": "customers_new_features_and_drop_dummies.csv", "sep": ","},
+    "clusterizado": {"arquivo": "customers_clustered.csv", "sep": ","},
+}
+
+COMPRESSAO = "zstd"
+
+CATEGORIAS_AGE_GROUP = pd.CategoricalDtype(["18-30", "31-45", "46-60", "61+"], ordered=True)
+
+# Tipos explícitos das colunas (as demais seguem as regras de `tipo_coluna`)
+SCHEMA = {
+    "ID": "int32",
+    "Year_Birth": "int16",
+    "Education": "category",
+    "Marital_Status": "category",
+    "AgeGroup": CATEGORIAS_AGE_GROUP,
+    "Income": "float64",
+    "Dt_Customer": "datetime64[ns]",
+    "Kidhome": "int8",
+    "Teenhome": "int8",
+    "Children": "int8",
+    "HasChildren": "int8",
+    "Recency": "int8",
+    "Complain": "int8",
+    "Response": "int8",
+    "AcceptedCmpTotal": "int8",
+    "HasAcceptedCmp": "int8",
+    "YearsSinceEnrolled": "int8",
+    "DaysSinceEnrolled": "int16",
+    "Age": "int16",
+    "Z_CostContact": "int8",
+    "Z_Revenue": "int8",
+    "cluster": "int8",
+}
+
+# Colunas com o formato dd-mm-yyyy no arquivo original
+FORMATOS_DATA = {"Dt_Customer": "%d-%m-%Y"}
+
+
+def tipo_coluna(coluna):
+    """Retorna o tipo de armazenamento de uma coluna.
+
+    Além das colunas de `SCHEMA`, as contagens 'Num*' e 'AcceptedCmp*' e as dummies das colunas
+    categóricas (ex: 'Education_PhD') usam int8, e os valores 'Mnt*' usam int16.
+    Colunas desconhecidas retornam None (mantêm o tipo inferido pelo pandas).
+
+    Obs: operações entre colunas compactas mantêm o tipo (ex: soma de duas colunas int8). Converta
+    para int64 antes de somar se o resultado puder ultrapassar o limite do tipo.
+    """
+    if coluna in SCHEMA:
+        return SCHEMA[coluna]
+    if coluna.startswith(("Num", "AcceptedCmp")):
+        return "int8"
+    if coluna.startswith("Mnt"):
+        return "int16"
+    if coluna.startswith(("Education_", "Marital_Status_", "AgeGroup_")):
+        return "int8"
+    return None
+
+
+def aplicar_schema(dataframe):
+    """Converte as colunas de um dataframe para os tipos do schema.
+
+    Colunas inteiras são verificadas antes da conversão: se algum valor não couber no tipo
+    compacto (ou houver valores faltantes), é levantado um ValueError em vez de truncar os dados.
+
+    Parameters
+    ----------
+    dataframe : pandas.DataFrame
+        Dados de uma etapa do projeto.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Cópia do dataframe com os tipos do schema.
+    """
+    tipos = {}
+
+    for coluna in dataframe.columns:
+        tipo = tipo_coluna(coluna)
+        if tipo is None or dataframe[coluna].dtype == tipo:
+            continue
+
+        if coluna in FORMATOS_DATA and dataframe[coluna].dtype == object:
+            dataframe = dataframe.assign(
+                **{coluna: pd.to_datetime(dataframe[coluna], format=FORMATOS_DATA[coluna])}
+            )
+            continue
+
+        if isinstance(tipo, str) and tipo.startswith("int"):
+            valores = dataframe[coluna]
+            limites = np.iinfo(tipo)
+            if valores.isna().any() or (valores % 1 != 0).any():
+                raise ValueError(f"A coluna '{coluna}' tem valores faltantes ou não inteiros ({tipo}).")
+            if valores.min() < limites.min or valores.max() > limites.max:
+                raise ValueError(
+                    f"A coluna '{coluna}' tem valores fora do intervalo de {tipo} "
+                    f"[{limites.min}, {limites.max}]."
+                )
+
+        tipos[coluna] = tipo
+
+    return dataframe.astype(tipos)
+
+
+def caminho_etapa(etapa):
+    """Caminho do arquivo Parquet de uma etapa dentro de `PASTA_DADOS`."""
+    return PASTA_DADOS / f"{etapa}.parquet"
+
+
+def salvar_etapa(dataframe, etapa, aplicar_tipos=True):
+    """Salva uma etapa do projeto em Parquet comprimido (zstd) com os tipos do schema.
+
+    O índice do dataframe não é gravado (ele não é uma coluna dos dados).
+
+    Parameters
+    ----------
+    dataframe : pandas.DataFrame
+        Dados da etapa.
+    etapa : str
+        Nome da etapa (ex: 'limpo', 'clusterizado'); o arquivo é `PASTA_DADOS / '<etapa>.parquet'`.
+    aplicar_tipos : bool, opcional
+        Converte as colunas com `aplicar_schema` antes de salvar, por padrão True
+
+    Returns
+    -------
+    pathlib.Path
+        Caminho do arquivo salvo.
+    """
+    if aplicar_tipos:
+        dataframe = aplicar_schema(dataframe)
+
+    caminho = caminho_etapa(etapa)
+    dataframe.to_parquet(caminho, engine="pyarrow", compression=COMPRESSAO, index=False)
+
+    return caminho
+
+
+def carregar_etapa(etapa, colunas=None, memory_map=True):
+    """Carrega uma etapa salva por `salvar_etapa`, lendo apenas as colunas pedidas.
+
+    Parameters
+    ----------
+    etapa : str
+        Nome da etapa (ex: 'limpo', 'clusterizado').
+    colunas : List[str], opcional
+        Colunas a serem lidas (as demais não são lidas do disco), por padrão None (todas)
+    memory_map : bool, opcional
+        Lê o arquivo por memory map em vez de copiá-lo para um buffer, por padrão True
+
+    Returns
+    -------
+    pandas.DataFrame
+        Dados com os tipos do schema (categóricas, int8/int16, datas).
+    """
+    return pd.read_parquet(
+        caminho_etapa(etapa), engine="pyarrow", columns=colunas, memory_map=memory_map
+    )
+
+
+def ler_csv_etapa(etapa):
+    """Lê o CSV de origem de uma etapa (ver `ETAPAS_CSV`), removendo a coluna de índice extra."""
+    parametros = ETAPAS_CSV[etapa]
+    dataframe = pd.read_csv(PASTA_DADOS / parametros["arquivo"], sep=parametros["sep"])
+
+    return dataframe.drop(columns=[coluna for coluna in dataframe.columns if coluna.startswith("Unnamed:")])
+
+
+def migrar_csvs(etapas=None):
+    """Converte os CSVs de `ETAPAS_CSV` para Parquet com o schema.
+
+    Parameters
+    ----------
+    etapas : List[str], opcional
+        Etapas a serem convertidas, por padrão None (todas as que têm CSV em `PASTA_DADOS`)
+
+    Returns
+    -------
+    pandas.DataFrame
+        Tamanho em disco (KB) do CSV e do Parquet e memória (KB) ocupada pelo dataframe de cada etapa
+        lido do CSV e do Parquet.
+    """
+    if etapas is None:
+        etapas = [etapa for etapa, parametros in ETAPAS_CSV.items()
+                  if (PASTA_DADOS / parametros["arquivo"]).exists()]
+
+    resumo = []
+    for etapa in etapas:
+        dataframe_csv = ler_csv_etapa(etapa)
+        caminho = salvar_etapa(dataframe_csv, etapa)
+        dataframe_parquet = carregar_etapa(etapa)
+
+        resumo.append({
+            "etapa": etapa,
+            "csv_kb": (PASTA_DADOS / ETAPAS_CSV[etapa]["arquivo"]).stat().st_size / 1024,
+            "parquet_kb": caminho.stat().st_size / 1024,
+            "memoria_csv_kb": dataframe_csv.memory_usage(deep=True).sum() / 1024,
+            "memoria_parquet_kb": dataframe_parquet.memory_usage(deep=True).sum() / 1024,
+        })
+
+    return pd.DataFrame(resumo).set_index("etapa")
@@ -0,0 +1,468 @@
+import math
+import warnings
+
+import numpy as np
+
+from .config import MODELO_CAMPANHA
+
+# pandas, joblib e sklearn são importados dentro das funções que os usam: um processo que só
+# escora com `escorar_lote`/`escorar_registro` importa apenas o NumPy.
+
+
+TAMANHO_CHUNK = 100_000
+COLUNA_PROBABILIDADE = "probabilidade_resposta"
+
+
+def carregar_modelo(caminho=MODELO_CAMPANHA):
+    """Carrega o pipeline treinado (preprocessor + modelo) salvo com joblib.
+
+    Parameters
+    ----------
+    caminho : str ou pathlib.Path, opcional
+        Caminho do arquivo .joblib, por padrão o modelo da campanha em `PASTA_MODELOS`
+
+    Returns
+    -------
+    sklearn.pipeline.Pipeline
+        Pipeline pronto para `predict_proba`.
+    """
+    from joblib import load
+
+    return load(caminho)
+
+
+def escorar_dataframe(modelo, dataframe):
+    """Calcula a probabilidade de resposta para cada linha de um dataframe.
+
+    Parameters
+    ----------
+    modelo : sklearn.pipeline.Pipeline
+        Pipeline treinado.
+    dataframe : pandas.DataFrame
+        Dataframe com (pelo menos) as colunas usadas no treino do pipeline.
+
+    Returns
+    -------
+    np.ndarray
+        Probabilidade da classe positiva para cada linha.
+    """
+    return modelo.predict_proba(dataframe[modelo.feature_names_in_])[:, 1]
+
+
+def escorar_arquivo_em_chunks(
+    caminho_entrada,
+    caminho_saida,
+    modelo=None,
+    colunas_identificacao=None,
+    tamanho_chunk=TAMANHO_CHUNK,
+    sep=",",
+):
+    """Escora um arquivo CSV de clientes em blocos de tamanho fixo.
+
+    O pipeline é carregado uma única vez e cada bloco passa pelo ColumnTransformer
+    e pelo classificador antes de ser gravado no arquivo de saída. Apenas as colunas
+    usadas pelo modelo (e as de identificação) são lidas, de modo que a memória
+    utilizada depende de `tamanho_chunk` e não do tamanho da base.
+
+    Parameters
+    ----------
+    caminho_entrada : str ou pathlib.Path
+        Arquivo CSV com os clientes a serem escorados.
+    caminho_saida : str ou pathlib.Path
+        Arquivo CSV onde as probabilidades serão gravadas (sobrescrito se existir).
+    modelo : sklearn.pipeline.Pipeline, opcional
+        Pipeline treinado, por padrão carrega `MODELO_CAMPANHA`
+    colunas_identificacao : List[str], opcional
+        Colunas copiadas para a saída junto com a probabilidade (ex: ['ID']), por padrão None
+    tamanho_chunk : int, opcional
+        Número de linhas lidas e escoradas por vez, por padrão 100_000
+    sep : str, opcional
+        Separador do arquivo de entrada, por padrão ","
+
+    Returns
+    -------
+    int
+        Número de linhas escoradas.
+    """
+    import pandas as pd
+
+    if modelo is None:
+        modelo = carregar_modelo()
+
+    colunas_identificacao = list(colunas_identificacao or [])
+    colunas_modelo = list(modelo.feature_names_in_)
+    colunas_leitura = colunas_identificacao + [
+        coluna for coluna in colunas_modelo if coluna not in colunas_identificacao
+    ]
+
+    total_linhas = 0
+
+    leitor = pd.read_csv(caminho_entrada, sep=sep, usecols=colunas_leitura, chunksize=tamanho_chunk)
+
+    for i, chunk in enumerate(leitor):
+        saida = chunk[colunas_identificacao].copy()
+        saida[COLUNA_PROBABILIDADE] = escorar_dataframe(modelo, chunk)
+
+        saida.to_csv(caminho_saida, mode="w" if i == 0 else "a", header=(i == 0), index=False)
+
+        total_linhas += len(chunk)
+
+    return total_linhas
+
+
+# ------------------------------------------------------------------------------------------------
+# Caminho rápido: pipeline linear exportado para vetores NumPy / tabelas de consulta
+# ------------------------------------------------------------------------------------------------
+
+_EPS = np.spacing(1.0)
+
+
+def _resolver_colunas(colunas, nomes_entrada):
+    if isinstance(colunas, str):
+        return [colunas]
+    if isinstance(colunas, slice) or np.asarray(colunas).dtype.kind in "biu":
+        return list(np.asarray(nomes_entrada)[colunas])
+    return list(colunas)
+
+
+def _padronizacao_potencia(transformador, n_colunas):
+    # PowerTransformer e a média e a escala aplicadas depois do Yeo-Johnson/Box-Cox:
+    # (y - m) / e, já compondo a padronização do PowerTransformer e a do StandardScaler seguinte
+    from sklearn.preprocessing import PowerTransformer
+
+    if isinstance(transformador, PowerTransformer):
+        potencia, etapas = transformador, []
+    else:
+        potencia, etapas = transformador[0], [transformador[1]]
+
+    media, escala = np.zeros(n_colunas), np.ones(n_colunas)
+
+    if potencia.standardize:
+        # o sklearn guarda essa padronização no atributo privado `_scaler`
+        scaler = getattr(potencia, "_scaler", None)
+        if scaler is None or getattr(scaler, "scale_", None) is None:
+            raise ValueError(
+                "PowerTransformer(standardize=True) sem o atributo `_scaler` nesta versão do sklearn: "
+                "use PowerTransformer(standardize=False) seguido de StandardScaler."
+            )
+        media, escala = scaler.mean_, scaler.scale_
+
+    for scaler in etapas:
+        m = scaler.mean_ if scaler.with_mean and scaler.mean_ is not None else np.zeros(n_colunas)
+        e = scaler.scale_ if scaler.with_std and scaler.scale_ is not None else np.ones(n_colunas)
+        media, escala = media + m * escala, escala * e
+
+    return potencia, media, escala
+
+
+def exportar_pipeline_linear(pipeline):
+    """Exporta um pipeline (preprocessor + classificador linear) para arrays e tabelas de consulta.
+
+    Todas as etapas lineares (StandardScaler, MinMaxScaler, padronização do PowerTransformer ou
+    StandardScaler depois dele em um Pipeline, passthrough) são incorporadas aos pesos do modelo, e o OneHotEncoder vira uma tabela
+    categoria -> peso por coluna. O resultado é usado por `escorar_lote` e `escorar_registro`,
+    que não dependem do sklearn.
+
+    Parameters
+    ----------
+    pipeline : sklearn.pipeline.Pipeline
+        Pipeline treinado no formato de `construir_pipeline_modelo_classificacao`, com um
+        ColumnTransformer (opcional) e um classificador linear binário (`coef_`, `intercept_`).
+
+    Returns
+    -------
+    dict
+        Dicionário com o intercepto e os parâmetros de cada grupo de colunas.
+    """
+    from sklearn.compose import ColumnTransformer
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import (
+        FunctionTransformer, MinMaxScaler, OneHotEncoder, PowerTransformer, StandardScaler,
+    )
+
+    classificador = pipeline[-1]
+    coeficientes = np.asarray(classificador.coef_, dtype=float)
+
+    if coeficientes.shape[0] != 1:
+        raise ValueError("Apenas classificadores lineares binários podem ser exportados.")
+
+    coeficientes = coeficientes[0]
+    intercepto = float(np.ravel(classificador.intercept_)[0])
+
+    lineares = {}
+    categoricas = {}
+    potencias = []          # (coluna, método, lambda, peso)
+
+    if len(pipeline) == 1:
+        for coluna, peso in zip(classificador.feature_names_in_, coeficientes):
+            lineares[coluna] = lineares.get(coluna, 0.0) + peso
+    elif len(pipeline) == 2 and isinstance(pipeline[0], ColumnTransformer):
+        preprocessor = pipeline[0]
+
+        with warnings.catch_warnings():
+            # o formato das colunas do 'remainder' muda entre versões do sklearn (índices ou nomes)
+            warnings.simplefilter("ignore", FutureWarning)
+            transformadores = [(n, t, list(c) if not isinstance(c, (str, slice)) else c)
+                               for n, t, c in preprocessor.transformers_]
+
+        for nome, transformador, colunas in transformadores:
+            if isinstance(transformador, str) and transformador == "drop":
+                continue
+
+            colunas = _resolver_colunas(colunas, preprocessor.feature_names_in_)
+            pesos = coeficientes[preprocessor.output_indices_[nome]]
+
+            if len(pesos) == 0:
+                continue
+
+            if (isinstance(transformador, str) and transformador == "passthrough") or (
+                isinstance(transformador, FunctionTransformer) and transformador.func is None
+            ):
+                for coluna, peso in zip(colunas, pesos):
+                    lineares[coluna] = lineares.get(coluna, 0.0) + peso
+
+            elif isinstance(transformador, StandardScaler):
+                # com with_mean/with_std=False o sklearn ainda calcula mean_ (e var_), mas não os usa
+                usar_media = transformador.with_mean and transformador.mean_ is not None
+                usar_escala = transformador.with_std and transformador.scale_ is not None
+                media = transformador.mean_ if usar_media else np.zeros(len(colunas))
+                escala = transformador.scale_ if usar_escala else np.ones(len(colunas))
+                for coluna, peso, m, e in zip(colunas, pesos, media, escala):
+                    lineares[coluna] = lineares.get(coluna, 0.0) + peso / e
+                    intercepto -= m * peso / e
+
+            elif isinstance(transformador, MinMaxScaler):
+                if transformador.clip:
+                    raise ValueError("MinMaxScaler com clip=True não é linear e não pode ser exportado.")
+                for coluna, peso, e, m in zip(colunas, pesos, transformador.scale_, transformador.min_):
+                    lineares[coluna] = lineares.get(coluna, 0.0) + peso * e
+                    intercepto += m * peso
+
+            elif isinstance(transformador, PowerTransformer) or (
+                # ex: preprocessamento_de_estatisticas (PowerTransformer(standardize=False) + StandardScaler)
+                isinstance(transformador, Pipeline)
+                and len(transformador) == 2
+                and isinstance(transformador[0], PowerTransformer)
+                and isinstance(transformador[1], StandardScaler)
+            ):
+                potencia, media, escala = _padronizacao_potencia(transformador, len(colunas))
+                for coluna, peso, lmbda, m, e in zip(colunas, pesos, potencia.lambdas_, media, escala):
+                    potencias.append((coluna, potencia.method, float(lmbda), float(peso / e)))
+                    intercepto -= m * peso / e
+
+            elif isinstance(transformador, OneHotEncoder):
+                if transformador.min_frequency is not None or transformador.max_categories is not None:
+                    raise ValueError("OneHotEncoder com categorias infrequentes não é suportado.")
+                if transformador.handle_unknown not in ("error", "ignore"):
+                    raise ValueError(f"handle_unknown='{transformador.handle_unknown}' não é suportado.")
+
+                inicio = 0
+                drop_idx = transformador.drop_idx_
+                for i, (coluna, categorias) in enumerate(zip(colunas, transformador.categories_)):
+                    descartada = None if drop_idx is None else drop_idx[i]
+                    tabela = {}
+                    for j, categoria in enumerate(categorias.tolist()):
+                        if descartada is not None and j == descartada:
+                            tabela[categoria] = 0.0
+                        else:
+                            tabela[categoria] = float(pesos[inicio])
+                            inicio += 1
+                    categoricas.setdefault(coluna, {})
+                    for categoria, peso in tabela.items():
+                        categoricas[coluna][categoria] = categoricas[coluna].get(categoria, 0.0) + peso
+
+            else:
+                raise ValueError(f"Transformador '{nome}' ({type(transformador).__name__}) não é suportado.")
+    else:
+        raise ValueError("O pipeline deve ter no máximo um ColumnTransformer antes do classificador.")
+
+    tabelas_ordenadas = {}
+    for coluna, tabela in categoricas.items():
+        categorias = np.array(list(tabela.keys()), dtype=object)
+        pesos = np.array(list(tabela.values()))
+        ordem = np.argsort(categorias)
+        tabelas_ordenadas[coluna] = (categorias[ordem], pesos[ordem])
+
+    return {
+        "intercepto": float(intercepto),
+        "colunas_lineares": list(lineares.keys()),
+        "pesos_lineares": np.array(list(lineares.values()), dtype=float),
+        "tabelas_categoricas": categoricas,
+        "tabelas_categoricas_ordenadas": tabelas_ordenadas,
+        "ignorar_desconhecidas": all(
+            t.handle_unknown == "ignore"
+            for t in (pipeline[0].named_transformers_.values() if len(pipeline) == 2 else [])
+            if isinstance(t, OneHotEncoder)
+        ),
+        "potencias": potencias,
+        "lineares_registro": [(c, float(p)) for c, p in lineares.items()],
+    }
+
+
+def verificar_exportacao(pipeline, exportado, dataframe, tolerancia=1e-9):
+    """Compara `escorar_lote` com o `predict_proba` do pipeline original em uma amostra.
+
+    Parameters
+    ----------
+    pipeline : sklearn.pipeline.Pipeline
+        Pipeline exportado.
+    exportado : dict
+        Resultado de `exportar_pipeline_linear(pipeline)`.
+    dataframe : pandas.DataFrame
+        Clientes usados na comparação (ex: algumas linhas da base de treino).
+    tolerancia : float, opcional
+        Maior diferença absoluta aceita entre as probabilidades, por padrão 1e-9
+
+    Returns
+    -------
+    float
+        Maior diferença absoluta encontrada.
+
+    Raises
+    ------
+    ValueError
+        Se a diferença passar da tolerância (o pipeline exportado não reproduz o original).
+    """
+    diferenca = float(np.max(np.abs(escorar_lote(exportado, dataframe) - escorar_dataframe(pipeline, dataframe))))
+
+    if diferenca > tolerancia:
+        raise ValueError(f"O pipeline exportado difere do original em até {diferenca:.3g} (tolerância {tolerancia:.3g}).")
+
+    return diferenca
+
+
+def salvar_pipeline_exportado(exportado, caminho):
+    """Salva o resultado de `exportar_pipeline_linear` (apenas arrays e dicionários) com joblib."""
+    from joblib import dump
+
+    dump(exportado, caminho)
+
+    return caminho
+
+
+def carregar_pipeline_exportado(caminho):
+    """Carrega um pipeline salvo por `salvar_pipeline_exportado` sem importar o sklearn.
+
+    Parameters
+    ----------
+    caminho : str ou pathlib.Path
+        Arquivo .joblib com o pipeline exportado.
+
+    Returns
+    -------
+    dict
+        Parâmetros usados por `escorar_lote` e `escorar_registro`.
+    """
+    from joblib import load
+
+    return load(caminho)
+
+
+def _sigmoide(z):
+    return 1.0 / (1.0 + np.exp(-z))
+
+
+def _transformacao_potencia(x, metodo, lmbda):
+    if metodo == "box-cox":
+        return np.log(x) if abs(lmbda) < _EPS else (np.power(x, lmbda) - 1) / lmbda
+
+    saida = np.empty_like(x)
+    positivo = x >= 0
+
+    if abs(lmbda) < _EPS:
+        saida[positivo] = np.log1p(x[positivo])
+    else:
+        saida[positivo] = (np.power(x[positivo] + 1, lmbda) - 1) / lmbda
+
+    if abs(lmbda - 2) > _EPS:
+        saida[~positivo] = -(np.power(-x[~positivo] + 1, 2 - lmbda) - 1) / (2 - lmbda)
+    else:
+        saida[~positivo] = -np.log1p(-x[~positivo])
+
+    return saida
+
+
+def escorar_lote(exportado, dataframe):
+    """Calcula a probabilidade de resposta de um lote de clientes só com NumPy.
+
+    Parameters
+    ----------
+    exportado : dict
+        Resultado de `exportar_pipeline_linear`.
+    dataframe : pandas.DataFrame ou dict
+        Dados dos clientes (colunas acessíveis por nome).
+
+    Returns
+    -------
+    np.ndarray
+        Probabilidade da classe positiva para cada linha.
+    """
+    colunas = exportado["colunas_lineares"]
+    n_linhas = len(dataframe[colunas[0]] if colunas else next(iter(dataframe.values())))
+    z = np.full(n_linhas, exportado["intercepto"])
+
+    if colunas:
+        X = np.column_stack([np.asarray(dataframe[coluna], dtype=float) for coluna in colunas])
+        z += X @ exportado["pesos_lineares"]
+
+    for coluna, metodo, lmbda, peso in exportado["potencias"]:
+        z += peso * _transformacao_potencia(np.asarray(dataframe[coluna], dtype=float), metodo, lmbda)
+
+    for coluna, (categorias, pesos) in exportado["tabelas_categoricas_ordenadas"].items():
+        valores = np.asarray(dataframe[coluna], dtype=object)
+        posicoes = np.searchsorted(categorias, valores).clip(0, len(categorias) - 1)
+        encontradas = categorias[posicoes] == valores
+
+        if not encontradas.all() and not exportado["ignorar_desconhecidas"]:
+            desconhecidas = list(dict.fromkeys(valores[~encontradas]))
+            raise ValueError(f"Categorias desconhecidas na coluna '{coluna}': {desconhecidas}")
+
+        z += np.where(encontradas, pesos[posicoes], 0.0)
+
+    return _sigmoide(z)
+
+
+def escorar_registro(exportado, registro):
+    """Calcula a probabilidade de resposta de um único cliente.
+
+    Usa apenas aritmética do Python (`math`) e consultas em dicionário, evitando o custo
+    fixo de criar arrays para uma única linha.
+
+    Parameters
+    ----------
+    exportado : dict
+        Resultado de `exportar_pipeline_linear`.
+    registro : dict
+        Dados do cliente no formato {coluna: valor}.
+
+    Returns
+    -------
+    float
+        Probabilidade da classe positiva.
+    """
+    z = exportado["intercepto"]
+
+    for coluna, peso in exportado["lineares_registro"]:
+        z += peso * registro[coluna]
+
+    for coluna, metodo, lmbda, peso in exportado["potencias"]:
+        x = float(registro[coluna])
+        if metodo == "box-cox":
+            t = math.log(x) if abs(lmbda) < _EPS else (x ** lmbda - 1) / lmbda
+        elif x >= 0:
+            t = math.log1p(x) if abs(lmbda) < _EPS else ((x + 1) ** lmbda - 1) / lmbda
+        else:
+            t = -math.log1p(-x) if abs(lmbda - 2) <= _EPS else -((1 - x) ** (2 - lmbda) - 1) / (2 - lmbda)
+        z += peso * t
+
+    for coluna, tabela in exportado["tabelas_categoricas"].items():
+        valor = registro[coluna]
+        if valor in tabela:
+            z += tabela[valor]
+        elif not exportado["ignorar_desconhecidas"]:
+            raise ValueError(f"Categoria desconhecida na coluna '{coluna}': {valor!r}")
+
+    if z < -700:
+        return 0.0
+
+    return 1.0 / (1.0 + math.exp(-z))
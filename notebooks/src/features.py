@@ -0,0 +1,234 @@
+import numpy as np
+import pandas as pd
+
+from .dados import CATEGORIAS_AGE_GROUP, FORMATOS_DATA
+
+
+# Data de referência da base original (último cadastro em Dt_Customer)
+DATA_REFERENCIA = pd.Timestamp("2014-06-29")
+
+COLUNAS_MNT = [
+    "MntWines",
+    "MntFruits",
+    "MntMeatProducts",
+    "MntFishProducts",
+    "MntSweetProducts",
+    "MntGoldProds",
+]
+COLUNAS_ACCEPTED_CMP = ["AcceptedCmp1", "AcceptedCmp2", "AcceptedCmp3", "AcceptedCmp4", "AcceptedCmp5"]
+COLUNAS_NUM_COMPRAS = ["NumWebPurchases", "NumCatalogPurchases", "NumStorePurchases"]
+
+
+def _datas(coluna):
+    if coluna.dtype == object:
+        return pd.to_datetime(coluna, format=FORMATOS_DATA["Dt_Customer"])
+    return pd.to_datetime(coluna)
+
+
+def _dias_desde_cadastro(df, data_referencia):
+    return (data_referencia - _datas(df["Dt_Customer"])).dt.days
+
+
+def _anos_desde_cadastro(df, data_referencia):
+    return df["DaysSinceEnrolled"] // 365
+
+
+def _idade(df, data_referencia):
+    return data_referencia.year - df["Year_Birth"]
+
+
+def _faixa_etaria(df, data_referencia):
+    return pd.cut(
+        df["Age"], bins=[-np.inf, 30, 45, 60, np.inf], labels=CATEGORIAS_AGE_GROUP.categories
+    ).astype(CATEGORIAS_AGE_GROUP)
+
+
+def _mnt_total(df, data_referencia):
+    return df[COLUNAS_MNT].sum(axis=1)
+
+
+def _mnt_produtos_regulares(df, data_referencia):
+    return df["MntTotal"] - df["MntGoldProds"]
+
+
+def _filhos(df, data_referencia):
+    return df["Kidhome"] + df["Teenhome"]
+
+
+def _tem_filhos(df, data_referencia):
+    return (df["Children"] > 0).astype(int)
+
+
+def _total_campanhas_aceitas(df, data_referencia):
+    return df[COLUNAS_ACCEPTED_CMP].sum(axis=1)
+
+
+def _aceitou_campanha(df, data_referencia):
+    return (df["AcceptedCmpTotal"] > 0).astype(int)
+
+
+def _total_compras(df, data_referencia):
+    return df[COLUNAS_NUM_COMPRAS].sum(axis=1)
+
+
+# Features derivadas, em ordem de cálculo: colunas de entrada, função (df, data_referencia) e se
+# dependem da data de referência. Features que usam outras features vêm depois delas.
+FEATURES = {
+    "DaysSinceEnrolled": {"entradas": ["Dt_Customer"], "funcao": _dias_desde_cadastro, "temporal": True},
+    "YearsSinceEnrolled": {"entradas": ["DaysSinceEnrolled"], "funcao": _anos_desde_cadastro, "temporal": False},
+    "Age": {"entradas": ["Year_Birth"], "funcao": _idade, "temporal": True},
+    "AgeGroup": {"entradas": ["Age"], "funcao": _faixa_etaria, "temporal": False},
+    "MntTotal": {"entradas": COLUNAS_MNT, "funcao": _mnt_total, "temporal": False},
+    "MntRegularProducts": {
+        "entradas": ["MntTotal", "MntGoldProds"], "funcao": _mnt_produtos_regulares, "temporal": False
+    },
+    "Children": {"entradas": ["Kidhome", "Teenhome"], "funcao": _filhos, "temporal": False},
+    "HasChildren": {"entradas": ["Children"], "funcao": _tem_filhos, "temporal": False},
+    "AcceptedCmpTotal": {"entradas": COLUNAS_ACCEPTED_CMP, "funcao": _total_campanhas_aceitas, "temporal": False},
+    "HasAcceptedCmp": {"entradas": ["AcceptedCmpTotal"], "funcao": _aceitou_campanha, "temporal": False},
+    "NumTotalPurchases": {"entradas": COLUNAS_NUM_COMPRAS, "funcao": _total_compras, "temporal": False},
+}
+
+
+def features_afetadas(colunas_alteradas):
+    """Retorna as features derivadas que dependem (direta ou indiretamente) das colunas alteradas.
+
+    Parameters
+    ----------
+    colunas_alteradas : List[str]
+        Colunas de entrada alteradas (ex: ['Kidhome']).
+
+    Returns
+    -------
+    List[str]
+        Features afetadas, na ordem de cálculo (ex: ['Children', 'HasChildren']).
+    """
+    alteradas = set(colunas_alteradas)
+    afetadas = []
+
+    for nome, feature in FEATURES.items():
+        if alteradas.intersection(feature["entradas"]):
+            afetadas.append(nome)
+            alteradas.add(nome)
+
+    return afetadas
+
+
+def calcular_features(dataframe, data_referencia=DATA_REFERENCIA, features=None):
+    """Calcula as features derivadas de todas as linhas de um dataframe.
+
+    Parameters
+    ----------
+    dataframe : pandas.DataFrame
+        Clientes com as colunas originais (ex: ml_project1_data.csv).
+    data_referencia : pandas.Timestamp, opcional
+        Data usada em DaysSinceEnrolled e Age, por padrão 2014-06-29 (último cadastro da base)
+    features : List[str], opcional
+        Features a serem calculadas, por padrão None (todas as de `FEATURES`)
+
+    Returns
+    -------
+    pandas.DataFrame
+        Cópia do dataframe com as features derivadas.
+    """
+    dataframe = dataframe.copy()
+
+    for nome, feature in FEATURES.items():
+        if features is None or nome in features:
+            dataframe[nome] = feature["funcao"](dataframe, data_referencia)
+
+    dataframe.attrs["data_referencia"] = data_referencia
+
+    return dataframe
+
+
+def atualizar_features(
+    base,
+    alteracoes,
+    coluna_id="ID",
+    data_referencia=DATA_REFERENCIA,
+    data_referencia_base=None,
+):
+    """Atualiza as features derivadas apenas para os clientes novos ou alterados.
+
+    As linhas de `alteracoes` substituem as da base com o mesmo ID (ou são adicionadas, se o ID
+    for novo). Cada feature é recalculada só nas linhas novas e nas linhas em que alguma de suas
+    entradas mudou; features cujo valor não mudou não propagam o recálculo para as que dependem
+    delas. Se a data de referência mudar, as features temporais (e as que dependem delas) são
+    recalculadas para a base inteira.
+
+    Parameters
+    ----------
+    base : pandas.DataFrame
+        Base com as colunas originais e as features derivadas (saída de `calcular_features`).
+    alteracoes : pandas.DataFrame
+        Clientes novos ou alterados, com a coluna de ID e as colunas originais (pode conter apenas
+        as colunas que mudaram, para clientes existentes).
+    coluna_id : str, opcional
+        Coluna que identifica o cliente, por padrão "ID"
+    data_referencia : pandas.Timestamp, opcional
+        Data de referência das features temporais, por padrão 2014-06-29
+    data_referencia_base : pandas.Timestamp, opcional
+        Data de referência usada no cálculo da base, por padrão None (usa `base.attrs`, preenchido
+        por `calcular_features`)
+
+    Returns
+    -------
+    Tuple[pandas.DataFrame, dict]
+        Base atualizada e o número de linhas recalculadas em cada feature.
+    """
+    if data_referencia_base is None:
+        data_referencia_base = base.attrs.get("data_referencia")
+
+    tipos = base.dtypes
+    base = base.set_index(coluna_id)
+    alteracoes = alteracoes.set_index(coluna_id)
+
+    colunas_originais = [coluna for coluna in alteracoes.columns if coluna not in FEATURES]
+    novos = alteracoes.index.difference(base.index)
+    existentes = alteracoes.index.intersection(base.index)
+
+    # clientes alterados em cada coluna de entrada
+    antes = base.loc[existentes, colunas_originais]
+    depois = alteracoes.loc[existentes, colunas_originais]
+    diferentes = ~((antes == depois) | (antes.isna() & depois.isna()))
+    alterados = {coluna: existentes[diferentes[coluna].to_numpy()] for coluna in colunas_originais}
+
+    base.loc[existentes, colunas_originais] = depois
+    base = pd.concat([base, alteracoes.loc[novos, colunas_originais]])
+
+    recalcular_temporais = data_referencia_base != data_referencia
+    resumo = {}
+
+    for nome, feature in FEATURES.items():
+        if feature["temporal"] and recalcular_temporais:
+            linhas = base.index
+        else:
+            linhas = novos
+            for entrada in feature["entradas"]:
+                if entrada in alterados:
+                    linhas = linhas.union(alterados[entrada])
+
+        resumo[nome] = len(linhas)
+        if len(linhas) == 0:
+            continue
+
+        anteriores = base.loc[linhas, nome] if nome in base.columns else pd.Series(np.nan, index=linhas)
+        valores = feature["funcao"](base.loc[linhas], data_referencia)
+
+        if nome in base.columns and isinstance(base[nome].dtype, pd.CategoricalDtype):
+            base[nome] = base[nome].astype(object)
+        base.loc[linhas, nome] = valores
+
+        anteriores, valores = anteriores.astype(object), pd.Series(valores, index=linhas).astype(object)
+        mudou = ~((anteriores == valores) | (anteriores.isna() & valores.isna())).to_numpy()
+        alterados[nome] = linhas[mudou]
+
+    base = base.reset_index()
+    base = base.astype({
+        coluna: tipo for coluna, tipo in tipos.items()
+        if coluna in base.columns and not base[coluna].isna().any()
+    })
+    base.attrs["data_referencia"] = data_referencia
+
+    return base, resumo
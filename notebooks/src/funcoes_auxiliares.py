@@ -1,11 +1,75 @@
 import pandas as pd
-import seaborn as sns
 import numpy as np
-from matplotlib import pyplot as plt
-from matplotlib.ticker import PercentFormatter
-from matplotlib.colors import ListedColormap
 
-RANDOM_STATE = 42
+from .config import RANDOM_STATE
+from .quantis import K_PADRAO, SketchQuantis
+
+TAMANHO_CHUNK = 100_000
+
+
+def _lista_colunas(column):
+    return [column] if isinstance(column, str) else list(column)
+
+
+def limites_outliers(datataframe, columns, whisker_width=1.5):
+    """Calcula os limites do método IQR para várias colunas em uma única operação vetorizada.
+
+    Parameters
+    ----------
+    dataframe : pandas.DataFrame
+        Dataframe com os dados.
+    columns : str ou List[str]
+        Coluna ou lista com o nome das colunas a serem utilizadas.
+    whisker_width : float, opcional
+        Valor considerado para detecção de outliers, por padrão 1.5
+
+    Returns
+    -------
+    pd.DataFrame
+        Limites 'lower_bound' e 'upper_bound' (índice = colunas).
+    """
+    quartis = datataframe[_lista_colunas(columns)].quantile([0.25, 0.75])
+
+    return _limites_iqr(quartis.loc[0.25], quartis.loc[0.75], whisker_width)
+
+
+def _limites_iqr(q1, q3, whisker_width):
+    iqr = q3 - q1
+    # iqr: intervale inter-quartile
+    # whisker_width --> largura do bigode do boxplot (geralmente é 1.5, mas podemos adotar outros valores)
+    return pd.DataFrame({
+        "lower_bound": q1 - whisker_width * iqr,           # intervalo inferior
+        "upper_bound": q3 + whisker_width * iqr,           # intervalo superior
+    })
+
+
+def mascara_outliers(datataframe, limites, remover=False):
+    """Gera uma única máscara booleana com as linhas que são outliers em alguma das colunas.
+
+    Parameters
+    ----------
+    dataframe : pandas.DataFrame
+        Dataframe com os dados.
+    limites : pd.DataFrame
+        Saída de `limites_outliers` (ou de `limites_outliers_em_chunks`).
+    remover : bool, opcional
+        Se False (inspeção), marca valores fora de [lower_bound, upper_bound]. Se True (remoção),
+        marca tudo que não está estritamente dentro de (lower_bound, upper_bound), incluindo valores
+        faltantes, como em `remove_outliers`. Por padrão False
+
+    Returns
+    -------
+    np.ndarray
+        Máscara com True nas linhas outliers.
+    """
+    valores = datataframe[limites.index].to_numpy(dtype=float)
+    inferior = limites["lower_bound"].to_numpy()
+    superior = limites["upper_bound"].to_numpy()
+
+    if remover:
+        return ~((valores > inferior) & (valores < superior)).all(axis=1)
+
+    return ((valores < inferior) | (valores > superior)).any(axis=1)
 
 
 # Fórmula para identificar os outliers automaticamente
@@ -16,8 +80,9 @@ def inspect_outliers(datataframe, column, whisker_width=1.5):
     ----------
     dataframe : pandas.DataFrame
         Dataframe com os dados.
-    column : List[str]
-        Lista com o nome das colunas (strings) a serem utilizadas.
+    column : str ou List[str]
+        Coluna ou lista com o nome das colunas (strings) a serem utilizadas. Com várias colunas,
+        retorna as linhas que são outliers em pelo menos uma delas.
     whisker_width : float, opcional
         Valor considerado para detecção de outliers, por padrão 1.5
 
@@ -26,36 +91,157 @@ def inspect_outliers(datataframe, column, whisker_width=1.5):
     pd.DataFrame
         Dataframe com os outliers.
     """
-    q1 = datataframe[column].quantile(0.25)
-    q3 = datataframe[column].quantile(0.75)
-
-    iqr = q3 - q1                          
-    # iqr: intervale inter-quartile
-    # whisker_width --> largura do bigode do boxplot (geralmente é 1.5, mas podemos adotar outros valores)
-    lower_bound = q1 - whisker_width * iqr           # intervalo inferior
-    upper_bound = q3 + whisker_width * iqr           # intervalo superior
+    limites = limites_outliers(datataframe, column, whisker_width)
 
-    outliers = datataframe[(datataframe[column] < lower_bound) | (datataframe[column] > upper_bound)]
-    
-    return outliers
+    return datataframe[mascara_outliers(datataframe, limites)]
 
 # Fórmula para remover os outliers 
 def remove_outliers(datataframe, column, whisker_width=1.5):
-    q1 = datataframe[column].quantile(0.25)
-    q3 = datataframe[column].quantile(0.75)
+    """Função para remover outliers (mantém as linhas estritamente dentro dos limites de todas as colunas).
 
-    iqr = q3 - q1                          
+    Parameters
+    ----------
+    dataframe : pandas.DataFrame
+        Dataframe com os dados.
+    column : str ou List[str]
+        Coluna ou lista com o nome das colunas (strings) a serem utilizadas. Os limites de todas as
+        colunas são calculados nos dados originais, e não após a remoção de cada coluna.
+    whisker_width : float, opcional
+        Valor considerado para detecção de outliers, por padrão 1.5
 
-    lower_bound = q1 - whisker_width * iqr           # intervalo inferior
-    upper_bound = q3 + whisker_width * iqr           # intervalo superior
+    Returns
+    -------
+    pd.DataFrame
+        Dataframe sem os outliers.
+    """
+    limites = limites_outliers(datataframe, column, whisker_width)
 
-    filtered_dataframe = datataframe[(datataframe[column] > lower_bound) &   (datataframe[column] < upper_bound)]
-    
-    return filtered_dataframe
+    return datataframe[~mascara_outliers(datataframe, limites, remover=True)]
 
 
-def pairplot(dataframe, columns, hue_column=None, alpha=0.5, corner=True):
-    """Função para gerar pairplot.
+def limites_outliers_em_chunks(
+    caminho_entrada,
+    columns,
+    whisker_width=1.5,
+    tamanho_chunk=TAMANHO_CHUNK,
+    sep=",",
+    k=K_PADRAO,
+    random_state=RANDOM_STATE,
+    retornar_mascara=False,
+    remover=False,
+):
+    """Calcula os limites IQR de várias colunas de um CSV lendo o arquivo em blocos.
+
+    Os quartis vêm de um `SketchQuantis` por coluna (exatos enquanto a base couber no sketch,
+    aproximados com erro de rank da ordem de 1/k acima disso), em uma única leitura. Com
+    `retornar_mascara=True`, uma segunda leitura aplica os limites bloco a bloco e guarda apenas a
+    máscara (1 byte por linha). Para gravar as linhas sem outliers, use `remover_outliers_em_chunks`.
+
+    Parameters
+    ----------
+    caminho_entrada : str ou pathlib.Path
+        Arquivo CSV com os dados.
+    columns : str ou List[str]
+        Coluna ou lista com o nome das colunas a serem utilizadas.
+    whisker_width : float, opcional
+        Valor considerado para detecção de outliers, por padrão 1.5
+    tamanho_chunk : int, opcional
+        Número de linhas lidas por vez, por padrão 100_000
+    sep : str, opcional
+        Separador do arquivo, por padrão ","
+    k : int, opcional
+        Tamanho do sketch de cada coluna, por padrão 2000
+    random_state : int, opcional
+        Semente dos sketches, por padrão 42
+    retornar_mascara : bool, opcional
+        Retorna também a máscara de outliers das linhas do arquivo, por padrão False
+    remover : bool, opcional
+        Regra da máscara (ver `mascara_outliers`), por padrão False
+
+    Returns
+    -------
+    pd.DataFrame ou Tuple[pd.DataFrame, np.ndarray]
+        Limites por coluna e, se `retornar_mascara=True`, a máscara (posição da linha no arquivo).
+    """
+    columns = _lista_colunas(columns)
+    sketches = {coluna: SketchQuantis(k=k, random_state=random_state) for coluna in columns}
+
+    for chunk in pd.read_csv(caminho_entrada, sep=sep, usecols=columns, chunksize=tamanho_chunk):
+        for coluna in columns:
+            sketches[coluna].atualizar(chunk[coluna].to_numpy(dtype=float))
+
+    q1 = pd.Series({coluna: sketch.quantil(0.25) for coluna, sketch in sketches.items()})
+    q3 = pd.Series({coluna: sketch.quantil(0.75) for coluna, sketch in sketches.items()})
+    limites = _limites_iqr(q1, q3, whisker_width)
+
+    if not retornar_mascara:
+        return limites
+
+    mascaras = [
+        mascara_outliers(chunk, limites, remover=remover)
+        for chunk in pd.read_csv(caminho_entrada, sep=sep, usecols=columns, chunksize=tamanho_chunk)
+    ]
+
+    return limites, np.concatenate(mascaras) if mascaras else np.zeros(0, dtype=bool)
+
+
+def remover_outliers_em_chunks(
+    caminho_entrada,
+    caminho_saida,
+    columns,
+    whisker_width=1.5,
+    tamanho_chunk=TAMANHO_CHUNK,
+    sep=",",
+    k=K_PADRAO,
+    random_state=RANDOM_STATE,
+):
+    """Grava em outro CSV as linhas sem outliers (mesma regra de `remove_outliers`), em blocos.
+
+    A primeira leitura calcula os limites (`limites_outliers_em_chunks`); a segunda lê todas as
+    colunas bloco a bloco e grava apenas as linhas estritamente dentro dos limites de todas as
+    colunas analisadas. A memória usada é a de um bloco e dos sketches, qualquer que seja o
+    tamanho do arquivo.
+
+    Parameters
+    ----------
+    caminho_entrada : str ou pathlib.Path
+        Arquivo CSV com os dados.
+    caminho_saida : str ou pathlib.Path
+        Arquivo CSV com as linhas mantidas (sobrescrito se existir, com o mesmo separador).
+    columns : str ou List[str]
+        Coluna ou lista com o nome das colunas a serem utilizadas.
+    whisker_width : float, opcional
+        Valor considerado para detecção de outliers, por padrão 1.5
+    tamanho_chunk : int, opcional
+        Número de linhas lidas por vez, por padrão 100_000
+    sep : str, opcional
+        Separador do arquivo, por padrão ","
+    k : int, opcional
+        Tamanho do sketch de cada coluna, por padrão 2000
+    random_state : int, opcional
+        Semente dos sketches, por padrão 42
+
+    Returns
+    -------
+    Tuple[pd.DataFrame, int]
+        Limites por coluna e número de linhas removidas.
+    """
+    limites = limites_outliers_em_chunks(
+        caminho_entrada, columns, whisker_width, tamanho_chunk, sep, k, random_state
+    )
+
+    removidas = 0
+    for i, chunk in enumerate(pd.read_csv(caminho_entrada, sep=sep, chunksize=tamanho_chunk)):
+        mascara = mascara_outliers(chunk, limites, remover=True)
+        chunk[~mascara].to_csv(caminho_saida, sep=sep, mode="w" if i == 0 else "a", header=(i == 0), index=False)
+        removidas += int(mascara.sum())
+
+    return limites, removidas
+
+
+def pairplot(dataframe, columns, hue_column=None, alpha=0.5, corner=True, **kwargs):
+    """Função para gerar pairplot (mesma de `graficos.pairplot`, que amostra os pontos e calcula as
+    KDEs por faixas acima de `max_points` linhas).
 
     Parameters
     ----------
@@ -69,19 +255,12 @@ def pairplot(dataframe, columns, hue_column=None, alpha=0.5, corner=True):
         Valor de alfa para transparência, por padrão 0.5
     corner : bool, opcional
         Se o pairplot terá apenas a diagonal inferior ou será completo, por padrão True
-    palette : str, opcional
-        Paleta a ser utilizada, por padrão "tab10"
+    **kwargs
+        `max_points`, `density` e `random_state` de `graficos.pairplot`.
     """
+    from .graficos import pairplot as _pairplot
 
-    analysis=columns.copy() + [hue_column]
-    
-    sns.pairplot(
-        dataframe[analysis], 
-        diag_kind='kde', 
-        hue=hue_column, 
-        plot_kws=dict(alpha=alpha),
-        corner=corner
-    )
+    _pairplot(dataframe, columns, hue_column, alpha, corner, **kwargs)
 
 
 def plot_columns_percent_by_cluster(
@@ -109,6 +288,9 @@ def plot_columns_percent_by_cluster(
     palette : str, opcional
         Paleta a ser utilizada, por padrão 'tab10'
     """
+    import seaborn as sns
+    from matplotlib import pyplot as plt
+    from matplotlib.ticker import PercentFormatter
 
     fig, axs = plt.subplots(nrows=rows_cols[0], ncols=rows_cols[1], figsize=figsize, sharey=True)
 
@@ -163,7 +345,10 @@ def plot_columns_percent_hue_cluster(
     palette : str, opcional
         Paleta a ser utilizada, por padrão 'tab10'
     """
-    
+    import seaborn as sns
+    from matplotlib import pyplot as plt
+    from matplotlib.ticker import PercentFormatter
+
     fig, axs = plt.subplots(nrows=rows_cols[0], ncols=rows_cols[1], figsize=figsize, sharey=True)
 
     if axs is not isinstance(axs, np.ndarray):  # Verifica se axs é um array numpy ---> método para ser usado caso queiramos gerar apenas 1 gráfico (1,1)
@@ -207,8 +392,10 @@ def plot_clusters_2D(
     show_centroids=True,
     show_points=False,
     column_clusters=None,
+    **kwargs,
 ):
-    """Gerar gráfico 2D com os clusters.
+    """Gerar gráfico 2D com os clusters (mesma de `graficos.plot_clusters_2D`, que desenha os
+    pontos uma única vez e amostra ou agrega por densidade acima de `max_points` linhas).
 
     Parameters
     ----------
@@ -227,38 +414,11 @@ def plot_clusters_2D(
     column_clusters : List[int], opcional
         Coluna com os números dos clusters para colorir os pontos
         (caso mostrar_pontos seja True), por padrão None
+    **kwargs
+        `max_points`, `density` e `random_state` de `graficos.plot_clusters_2D`.
     """
+    from .graficos import plot_clusters_2D as _plot_clusters_2D
 
-    fig = plt.figure()
-
-    ax = fig.add_subplot(111)
-
-    cores = plt.cm.tab10.colors[:n_colors]
-    cores = ListedColormap(cores)
-
-    x = dataframe[columns[0]]
-    y = dataframe[columns[1]]
-
-    ligar_centroids = show_centroids
-    ligar_pontos = show_points
-
-    for i, centroid in enumerate(centroids):
-        if ligar_centroids:
-            ax.scatter(*centroid, s=500, alpha=0.5)
-            ax.text(
-                *centroid,
-                f"{i}",
-                fontsize=20,
-                horizontalalignment="center",
-                verticalalignment="center",
-            )
-
-        if ligar_pontos:
-            s = ax.scatter(x, y, c=column_clusters, cmap=cores)
-            ax.legend(*s.legend_elements(), bbox_to_anchor=(1.3, 1))
-
-    ax.set_xlabel(columns[0])
-    ax.set_ylabel(columns[1])
-    ax.set_title("Clusters")
-
-    plt.show()
\ No newline at end of file
+    _plot_clusters_2D(
+        dataframe, columns, n_colors, centroids, show_centroids, show_points, column_clusters, **kwargs
+    )
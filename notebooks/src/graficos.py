@@ -1,23 +1,175 @@
 import os
-os.environ["OMP_NUM_THREADS"] = "1"
 
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
-from sklearn.cluster import KMeans
-from sklearn.metrics import silhouette_score
+from joblib import Parallel, delayed, effective_n_jobs
 
-from matplotlib.colors import ListedColormap
+from matplotlib.colors import ListedColormap, Normalize
 from matplotlib.ticker import PercentFormatter
 
 
 PALETTE = "coolwarm"
 SCATTER_ALPHA = 0.2
 
+# Acima de LIMITE_PONTOS linhas, os gráficos de clusters e o pairplot desenham uma amostra
+# estratificada por cluster (ou a densidade de todos os pontos, em faixas) e as KDEs da diagonal
+# do pairplot são calculadas a partir das contagens de N_FAIXAS_KDE faixas
+LIMITE_PONTOS = 50_000
+N_FAIXAS_KDE = 512
+N_FAIXAS_DENSIDADE = 200
 
 
-def grafico_elbow_silhouette(X, random_state=42, intervalo_k=(2, 11)):
+
+def _ajustar_kmeans(X, k, random_state, n_init, init="k-means++", threads=1):
+    # threads: limite explícito do OpenMP/BLAS para este ajuste (em vez de OMP_NUM_THREADS global)
+    from sklearn.cluster import KMeans
+    from threadpoolctl import threadpool_limits
+
+    with threadpool_limits(limits=threads):
+        kmeans = KMeans(n_clusters=k, n_init=n_init, init=init, random_state=random_state).fit(X)
+
+    return kmeans.inertia_, kmeans.labels_, kmeans.cluster_centers_
+
+
+def _proximo_centroide(X, centroides, rng, tamanho_amostra=100_000):
+    # Sorteia o novo centroide com probabilidade proporcional à distância² ao centroide mais próximo (k-means++)
+    amostra = X[rng.choice(len(X), size=min(len(X), tamanho_amostra), replace=False)]
+    distancias = ((amostra[:, None, :] - centroides[None, :, :]) ** 2).sum(axis=2).min(axis=1)
+
+    return amostra[rng.choice(len(amostra), p=distancias / distancias.sum())]
+
+
+def silhouette_amostral(X, labels, tamanho_amostra=10_000, random_state=42, confianca=0.95):
+    """Calcula o silhouette score em uma amostra dos dados, com intervalo de confiança.
+
+    O silhouette exato precisa das distâncias entre todos os pares de pontos (O(n²)). Acima de
+    `tamanho_amostra` linhas, o score é estimado pela média do silhouette de uma amostra aleatória,
+    e o intervalo de confiança vem do erro padrão dessa média.
+
+    Parameters
+    ----------
+    X : np.ndarray
+        Dados (já preprocessados) usados no agrupamento.
+    labels : np.ndarray
+        Cluster de cada linha.
+    tamanho_amostra : int, opcional
+        Número máximo de linhas usadas no cálculo, por padrão 10_000. Use None para o cálculo exato.
+    random_state : int, opcional
+        Semente da amostragem, por padrão 42
+    confianca : float, opcional
+        Nível de confiança do intervalo, por padrão 0.95
+
+    Returns
+    -------
+    Tuple[float, float, float]
+        (silhouette, limite inferior, limite superior). Sem amostragem, os limites são iguais ao score.
+    """
+    from scipy.stats import norm
+    from sklearn.metrics import silhouette_samples
+
+    X = np.asarray(X)
+    labels = np.asarray(labels)
+
+    if tamanho_amostra is None or len(labels) <= tamanho_amostra:
+        media = silhouette_samples(X, labels).mean()
+        return media, media, media
+
+    rng = np.random.default_rng(random_state)
+    indices = rng.choice(len(labels), size=tamanho_amostra, replace=False)
+    valores = silhouette_samples(X[indices], labels[indices])
+
+    media = valores.mean()
+    margem = norm.ppf(0.5 + confianca / 2) * valores.std(ddof=1) / np.sqrt(len(valores))
+
+    return media, media - margem, media + margem
+
+
+def varredura_kmeans(
+    X,
+    intervalo_k=(2, 11),
+    random_state=42,
+    n_init=10,
+    n_jobs=-1,
+    tamanho_amostra_silhouette=10_000,
+    warm_start=False,
+):
+    """Ajusta um KMeans para cada k e calcula a inércia e o silhouette (amostral) de cada um.
+
+    Parameters
+    ----------
+    X : pandas.DataFrame ou np.ndarray
+        Dados numéricos (já preprocessados).
+    intervalo_k : tuple, opcional
+        Intervalo de valores de cluster, por padrão (2, 11)
+    random_state : int, opcional
+        Valor para fixar o estado aleatório para reprodutibilidade, por padrão 42
+    n_init : int, opcional
+        Número de inicializações de cada KMeans, por padrão 10
+    n_jobs : int, opcional
+        Número de processos para ajustar os valores de k em paralelo, por padrão -1 (todos os núcleos).
+        As threads de cada ajuste são limitadas para não ultrapassar o número de núcleos.
+    tamanho_amostra_silhouette : int, opcional
+        Linhas usadas no silhouette (ver `silhouette_amostral`), por padrão 10_000
+    warm_start : bool, opcional
+        Se True, ajusta os k em sequência e inicializa k+1 com os centroides de k mais um novo
+        centroide sorteado como no k-means++ (n_init=1), por padrão False
+
+    Returns
+    -------
+    pandas.DataFrame
+        Colunas 'k', 'inertia', 'silhouette', 'silhouette_inf' e 'silhouette_sup'.
+    """
+    X = np.ascontiguousarray(X, dtype=float)
+    k_range = range(*intervalo_k)
+
+    if warm_start:
+        rng = np.random.default_rng(random_state)
+        ajustes = []
+        centroides = None
+
+        for k in k_range:
+            if centroides is None:
+                ajuste = _ajustar_kmeans(X, k, random_state, n_init, threads=None)
+            else:
+                init = np.vstack([centroides, _proximo_centroide(X, centroides, rng)])
+                ajuste = _ajustar_kmeans(X, k, random_state, 1, init=init, threads=None)
+            centroides = ajuste[2]
+            ajustes.append(ajuste)
+    else:
+        n_processos = min(len(k_range), effective_n_jobs(n_jobs))
+        threads = max(1, os.cpu_count() // n_processos)
+
+        ajustes = Parallel(n_jobs=n_processos)(
+            delayed(_ajustar_kmeans)(X, k, random_state, n_init, threads=threads) for k in k_range
+        )
+
+    resultados = []
+    for k, (inercia, labels, _) in zip(k_range, ajustes):
+        silhouette, inferior, superior = silhouette_amostral(
+            X, labels, tamanho_amostra=tamanho_amostra_silhouette, random_state=random_state
+        )
+        resultados.append({
+            "k": k,
+            "inertia": inercia,
+            "silhouette": silhouette,
+            "silhouette_inf": inferior,
+            "silhouette_sup": superior,
+        })
+
+    return pd.DataFrame(resultados)
+
+
+def grafico_elbow_silhouette(
+    X,
+    random_state=42,
+    intervalo_k=(2, 11),
+    n_jobs=-1,
+    tamanho_amostra_silhouette=10_000,
+    warm_start=False,
+    n_init=10,
+):
     """Gera os gráficos para os métodos Elbow e Silhouette.
 
     Parameters
@@ -28,36 +180,41 @@ def grafico_elbow_silhouette(X, random_state=42, intervalo_k=(2, 11)):
         Valor para fixar o estado aleatório para reprodutibilidade, por padrão 42
     range_k : tuple, opcional
         Intervalo de valores de cluster, por padrão (2, 11)
+    n_jobs : int, opcional
+        Número de processos para ajustar os valores de k em paralelo, por padrão -1
+    tamanho_amostra_silhouette : int, opcional
+        Linhas usadas no silhouette; acima disso o score é amostral e o gráfico mostra o intervalo
+        de confiança, por padrão 10_000
+    warm_start : bool, opcional
+        Inicializa o KMeans de k+1 a partir dos centroides de k, por padrão False
+    n_init : int, opcional
+        Número de inicializações de cada KMeans, por padrão 10
     """
     
     # OBS: O "X" precisa ser um dataframe só com valores numéricos, colunas categóricas precisam ter passado por preprocessamento.
 
     fig, ax = plt.subplots(nrows=1, ncols=2, figsize=(15,5), tight_layout=True)
 
-    elbow = {}
-    silhouette = []
-
-    k_range = range(*intervalo_k)
-
-    for numero in k_range:
-        kmeans = KMeans(n_clusters=numero, n_init= 10, random_state=random_state)
-        kmeans.fit(X)         
-
-        elbow[numero] = kmeans.inertia_      # inertia_ : soma da distância quadrada de cada ponto para o centroide de seu cluster
-        labels = kmeans.labels_              # labels_: nome de cada cluster
-        
-        silhouette.append(silhouette_score(X, labels))       
-        # silhouete_score: dentro de cada cluster ele calcula a distância média de cada ponto, e compara com a distânia do ponto pro cluster mais próximo que ele não pertence
-        # silhouete_score: varia de -1 a 1, quanto maior melhor, mais bem dividido estão os clusters. Valor igual a 0 quer dizer que o ponto está na distancia igual entre o centro de 2 cluster
-        # silhouette_score(kmeans.transform(X)): pra calcular esse score o X precisa estar transformado pelas etapas de preprocessamento do kmeans 
+    resultados = varredura_kmeans(
+        X,
+        intervalo_k=intervalo_k,
+        random_state=random_state,
+        n_init=n_init,
+        n_jobs=n_jobs,
+        tamanho_amostra_silhouette=tamanho_amostra_silhouette,
+        warm_start=warm_start,
+    )
+    # inertia : soma da distância quadrada de cada ponto para o centroide de seu cluster
+    # silhouete_score: dentro de cada cluster ele calcula a distância média de cada ponto, e compara com a distânia do ponto pro cluster mais próximo que ele não pertence
+    # silhouete_score: varia de -1 a 1, quanto maior melhor, mais bem dividido estão os clusters. Valor igual a 0 quer dizer que o ponto está na distancia igual entre o centro de 2 cluster
 
-    # OBS: lineplot precisa dos valores em formato de lista
-    sns.lineplot( x = list(elbow.keys()), y = list(elbow.values()), ax=ax[0], marker='o')
+    sns.lineplot(x="k", y="inertia", data=resultados, ax=ax[0], marker='o')
     ax[0].set_title('Elbow Method')
     ax[0].set_xlabel('K')
     ax[0].set_ylabel('Inertia')
 
-    sns.lineplot( x = list(k_range), y = silhouette, ax=ax[1], marker='o')
+    sns.lineplot(x="k", y="silhouette", data=resultados, ax=ax[1], marker='o')
+    ax[1].fill_between(resultados["k"], resultados["silhouette_inf"], resultados["silhouette_sup"], alpha=0.2)
     ax[1].set_title('Silhouette Method')
     ax[1].set_xlabel('K')
     ax[1].set_ylabel('Silhouette Score')
@@ -68,9 +225,132 @@ def grafico_elbow_silhouette(X, random_state=42, intervalo_k=(2, 11)):
 
 
 
-def pairplot(dataframe, columns, hue_column=None, alpha=0.5, corner=True):
+def amostra_estratificada(rotulos, tamanho, random_state=42, n_linhas=None):
+    """Posições de uma amostra com a mesma proporção de cada cluster.
+
+    Cada cluster recebe vagas proporcionais ao seu tamanho, com um mínimo (até 1% da amostra)
+    para que clusters pequenos continuem visíveis nos gráficos.
+
+    Parameters
+    ----------
+    rotulos : array-like ou None
+        Cluster de cada linha; None faz uma amostra aleatória simples de `n_linhas` linhas.
+    tamanho : int
+        Tamanho da amostra (se houver menos linhas, todas são mantidas).
+    random_state : int, opcional
+        Semente do sorteio, por padrão 42
+    n_linhas : int, opcional
+        Número de linhas quando `rotulos` é None, por padrão None
+
+    Returns
+    -------
+    np.ndarray
+        Posições sorteadas, em ordem crescente.
+    """
+    n_linhas = len(rotulos) if rotulos is not None else n_linhas
+    if n_linhas <= tamanho:
+        return np.arange(n_linhas)
+
+    rng = np.random.default_rng(random_state)
+    if rotulos is None:
+        return np.sort(rng.choice(n_linhas, size=tamanho, replace=False))
+
+    codigos, _ = pd.factorize(np.asarray(rotulos), use_na_sentinel=False)
+    contagens = np.bincount(codigos)
+    vagas = np.round(contagens * tamanho / n_linhas).astype(np.int64)
+    minimo = min(tamanho // 100, tamanho // len(contagens))
+    vagas = np.minimum(np.maximum(vagas, minimo), contagens)
+
+    # permutação aleatória agrupada por cluster: as primeiras `vagas` posições de cada grupo
+    permutacao = rng.permutation(n_linhas)
+    agrupada = permutacao[np.argsort(codigos[permutacao], kind="stable")]
+    inicios = np.concatenate([[0], np.cumsum(contagens)[:-1]])
+
+    return np.sort(np.concatenate([agrupada[inicio:inicio + n] for inicio, n in zip(inicios, vagas)]))
+
+
+def kde_por_faixas(valores, n_faixas=N_FAIXAS_KDE, cut=3):
+    """KDE gaussiana (banda de Scott, como o seaborn) calculada sobre as contagens em faixas.
+
+    Os valores são contados em `n_faixas` faixas e as contagens são suavizadas pelo kernel: o
+    custo é O(n) para contar e O(n_faixas²) para suavizar, em vez de O(n x pontos da curva).
+
+    Returns
+    -------
+    Tuple[np.ndarray, np.ndarray] ou None
+        Centros das faixas e densidade; None com menos de 2 valores ou variância zero.
+    """
+    valores = np.asarray(valores, dtype=float)
+    valores = valores[~np.isnan(valores)]
+    if len(valores) < 2 or np.ptp(valores) == 0:
+        return None
+
+    banda = valores.std(ddof=1) * len(valores) ** (-1 / 5)
+    contagens, bordas = np.histogram(
+        valores, bins=n_faixas, range=(valores.min() - cut * banda, valores.max() + cut * banda)
+    )
+    largura = bordas[1] - bordas[0]
+    centros = bordas[:-1] + largura / 2
+
+    raio = min(int(np.ceil(4 * banda / largura)), n_faixas - 1)
+    kernel = np.exp(-0.5 * (np.arange(-raio, raio + 1) * largura / banda) ** 2)
+    densidade = np.convolve(contagens, kernel)[raio:raio + n_faixas] / (len(valores) * banda * np.sqrt(2 * np.pi))
+
+    return centros, densidade
+
+
+def _desenhar_densidade(ax, x, y, cores=None, rotulos=None, norm=None, n_faixas=N_FAIXAS_DENSIDADE):
+    # Sem clusters: hexbin com escala log. Com clusters: uma imagem com a cor do cluster mais
+    # frequente em cada faixa 2D e transparência proporcional ao log da contagem
+    if rotulos is None:
+        return ax.hexbin(x, y, gridsize=n_faixas // 2, bins="log", mincnt=1, cmap="Greys")
+
+    x, y, rotulos = np.asarray(x, dtype=float), np.asarray(y, dtype=float), np.asarray(rotulos)
+    niveis, codigos = np.unique(rotulos, return_inverse=True)
+    limites = [(valores.min(), valores.max()) for valores in (x, y)]
+
+    faixas = [
+        np.clip(((valores - inicio) / ((fim - inicio) or 1) * n_faixas).astype(np.int64), 0, n_faixas - 1)
+        for valores, (inicio, fim) in zip((x, y), limites)
+    ]
+    contagens = np.bincount(
+        (codigos * n_faixas + faixas[1]) * n_faixas + faixas[0], minlength=len(niveis) * n_faixas**2
+    ).reshape(len(niveis), n_faixas, n_faixas)
+
+    total = contagens.sum(axis=0)
+    cores_niveis = np.asarray(cores(norm(niveis)))
+    imagem = cores_niveis[contagens.argmax(axis=0)]
+    imagem[..., 3] = np.log1p(total) / np.log1p(total.max())
+
+    ax.imshow(
+        imagem, origin="lower", aspect="auto", interpolation="nearest",
+        extent=(*limites[0], *limites[1]),
+    )
+    handles = [
+        plt.Line2D([], [], marker="o", linestyle="", color=cor, label=str(nivel))
+        for nivel, cor in zip(niveis, cores_niveis)
+    ]
+
+    return handles
+
+
+def pairplot(
+    dataframe,
+    columns,
+    hue_column=None,
+    alpha=0.5,
+    corner=True,
+    max_points=LIMITE_PONTOS,
+    density=False,
+    random_state=42,
+):
     """Função para gerar pairplot.
 
+    Até `max_points` linhas, é o `sns.pairplot` com KDE na diagonal. Acima disso, os gráficos
+    de dispersão usam uma amostra estratificada pela coluna de hue (ou, com `density=True`, a
+    densidade de todos os pontos) e as KDEs da diagonal são calculadas com todos os dados a
+    partir das contagens em faixas (`kde_por_faixas`).
+
     Parameters
     ----------
     dataframe : pandas.DataFrame
@@ -83,20 +363,148 @@ def pairplot(dataframe, columns, hue_column=None, alpha=0.5, corner=True):
         Valor de alfa para transparência, por padrão 0.5
     corner : bool, opcional
         Se o pairplot terá apenas a diagonal inferior ou será completo, por padrão True
-    palette : str, opcional
-        Paleta a ser utilizada, por padrão "tab10"
+    max_points : int, opcional
+        Número de linhas a partir do qual os pontos são amostrados, por padrão 50_000
+    density : bool, opcional
+        Acima de `max_points`, desenha a densidade de todos os pontos em vez da amostra,
+        por padrão False
+    random_state : int, opcional
+        Semente da amostra, por padrão 42
     """
 
-    analysis=columns.copy() + [hue_column]
-    
-    sns.pairplot(
-        dataframe[analysis], 
-        diag_kind='kde', 
-        hue=hue_column, 
-        plot_kws=dict(alpha=alpha),
-        corner=corner
+    analysis = columns.copy() + ([hue_column] if hue_column is not None else [])
+
+    if len(dataframe) <= max_points:
+        sns.pairplot(
+            dataframe[analysis],
+            diag_kind='kde',
+            hue=hue_column,
+            plot_kws=dict(alpha=alpha),
+            corner=corner
+        )
+        return
+
+    dados = dataframe[analysis]
+    rotulos = dados[hue_column] if hue_column is not None else None
+    posicoes = amostra_estratificada(rotulos, max_points, random_state, n_linhas=len(dados))
+
+    grid = sns.PairGrid(dados.iloc[posicoes], vars=columns, hue=hue_column, corner=corner)
+    niveis = grid.hue_names if hue_column is not None else [None]
+    proporcoes = dados[hue_column].value_counts(normalize=True) if hue_column is not None else None
+
+    def kde_diagonal(x, label=None, color=None, **kwargs):
+        # `x` é a coluna da amostra: a KDE usa a mesma coluna em todas as linhas do nível
+        valores = dados[x.name] if label is None or hue_column is None else dados.loc[rotulos == label, x.name]
+        curva = kde_por_faixas(valores)
+        if curva is None:
+            return
+        centros, densidade = curva
+        if proporcoes is not None:
+            # common_norm do seaborn: as curvas somam 1 entre os níveis
+            densidade = densidade * proporcoes.get(label, 0)
+        plt.plot(centros, densidade, color=color, label=label)
+        plt.fill_between(centros, densidade, color=color, alpha=0.25, linewidth=0)
+
+    grid.map_diag(kde_diagonal)
+
+    if density:
+        cores = ListedColormap(grid.palette) if hue_column is not None else None
+        norm = pd.Index(niveis).get_indexer if hue_column is not None else None
+        for i, linha in enumerate(columns):
+            for j, coluna in enumerate(columns):
+                ax = grid.axes[i, j]
+                if ax is None or i == j or (corner and j > i):
+                    continue
+                _desenhar_densidade(ax, dados[coluna], dados[linha], cores, rotulos, norm)
+        if hue_column is not None:
+            # a partir dos níveis do grid: com uma única coluna não há gráfico fora da diagonal
+            grid.add_legend(legend_data={
+                str(nivel): plt.Line2D([], [], marker="o", linestyle="", color=cor, label=str(nivel))
+                for nivel, cor in zip(grid.hue_names, grid.palette)
+            })
+    else:
+        # plt.scatter uma vez por nível de hue (mais rápido que sns.scatterplot)
+        desenhar = grid.map_lower if corner else grid.map_offdiag
+        desenhar(plt.scatter, alpha=alpha, edgecolor="white", linewidth=0.5)
+        if hue_column is not None:
+            grid.add_legend()
+
+
+def _ordem_niveis(serie):
+    # mesma ordem do seaborn: categorias para colunas categóricas, valores ordenados para colunas
+    # numéricas e ordem de aparição para as demais
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        return serie.cat.categories
+    if pd.api.types.is_numeric_dtype(serie.dtype):
+        return pd.Index(np.sort(serie.dropna().unique()))
+    return pd.Index(serie.dropna().unique())
+
+
+def _contagens_coluna(serie, niveis_cluster, codigos_cluster):
+    niveis = _ordem_niveis(serie)
+    codigos = niveis.get_indexer(serie)
+
+    validos = (codigos >= 0) & (codigos_cluster >= 0)
+    contagens = np.bincount(
+        codigos[validos] * len(niveis_cluster) + codigos_cluster[validos],
+        minlength=len(niveis) * len(niveis_cluster),
+    ).reshape(len(niveis), len(niveis_cluster))
+
+    return pd.DataFrame(contagens, index=niveis, columns=niveis_cluster)
+
+
+def tabela_contagens_cluster(dataframe, columns, column_cluster='cluster', n_jobs=-1):
+    """Conta as linhas de cada valor de cada coluna dentro de cada cluster, em uma única tabela.
+
+    As colunas são contadas em paralelo (threads) com `np.bincount` sobre os códigos dos valores,
+    sem copiar o dataframe. Tabelas de partes diferentes dos dados (ex: blocos de um arquivo)
+    podem ser somadas com `pd.concat([...]).groupby(level=[0, 1]).sum()`.
+
+    Parameters
+    ----------
+    dataframe : pandas.DataFrame
+        Dataframe com os dados.
+    columns : List[str]
+        Lista com o nome das colunas (strings) a serem utilizadas.
+    column_cluster : str, opcional
+        Coluna utilizada para cluster, por padrão 'cluster'
+    n_jobs : int, opcional
+        Número de threads, por padrão -1 (todos os núcleos)
+
+    Returns
+    -------
+    pd.DataFrame
+        Contagens com índice (coluna, valor) e uma coluna por cluster.
+    """
+    niveis_cluster = _ordem_niveis(dataframe[column_cluster])
+    codigos_cluster = niveis_cluster.get_indexer(dataframe[column_cluster])
+
+    tabelas = Parallel(n_jobs=n_jobs, prefer="threads")(
+        delayed(_contagens_coluna)(dataframe[coluna], niveis_cluster, codigos_cluster) for coluna in columns
     )
 
+    tabela = pd.concat(tabelas, keys=list(columns), names=["coluna", "valor"])
+    tabela.columns.name = column_cluster
+
+    return tabela
+
+
+def _barras_empilhadas(ax, proporcoes, palette):
+    # Desenha barras 100% empilhadas (uma barra por linha de `proporcoes`, uma cor por coluna),
+    # com o primeiro nível no topo, como o sns.histplot(multiple='fill')
+    cores = sns.color_palette(palette, proporcoes.shape[1])
+    posicoes = np.arange(proporcoes.shape[0])
+    base = proporcoes.iloc[:, ::-1].cumsum(axis=1).iloc[:, ::-1].shift(-1, axis=1).fillna(0)
+
+    for nivel, cor in zip(proporcoes.columns, cores):
+        alturas = proporcoes[nivel].to_numpy()
+        barras = ax.bar(posicoes, alturas, bottom=base[nivel].to_numpy(), width=0.8, color=cor, linewidth=0, label=str(nivel))
+        ax.bar_label(barras, label_type='center', labels=[f'{h:.1%}' if h > 0 else '' for h in alturas], color='white', weight='bold', fontsize=10)
+
+    ax.set_xticks(posicoes, [str(valor) for valor in proporcoes.index])
+    ax.set_ylim(0, 1)
+    ax.yaxis.set_major_formatter(PercentFormatter(1))      # Formata o eixo Y para mostrar porcentagens de 0 a 1
+    ax.tick_params(axis='both', which='both', length=0)    # Remove os ticks dos eixos X e Y para deixar o gráfico mais limpo
 
 
 def plot_columns_percent_by_cluster(
@@ -105,7 +513,9 @@ def plot_columns_percent_by_cluster(
         column_cluster='cluster',
         rows_cols=(2,3),
         figsize=(15, 8),
-        palette='tab10'
+        palette='tab10',
+        tabela=None,
+        n_jobs=-1,
 ):
     """Função para plotar como está a distribuição percentual das variáveis de cada feature dentro de cada cluster.
 
@@ -123,7 +533,13 @@ def plot_columns_percent_by_cluster(
         Tamanho da figura, por padrão (15, 8)
     palette : str, opcional
         Paleta a ser utilizada, por padrão 'tab10'
+    tabela : pd.DataFrame, opcional
+        Contagens já calculadas com `tabela_contagens_cluster` (o dataframe não é usado), por padrão None
+    n_jobs : int, opcional
+        Número de threads para as contagens, por padrão -1
     """
+    if tabela is None:
+        tabela = tabela_contagens_cluster(dataframe, columns, column_cluster, n_jobs=n_jobs)
 
     fig, axs = plt.subplots(nrows=rows_cols[0], ncols=rows_cols[1], figsize=figsize, sharey=True)
 
@@ -131,27 +547,15 @@ def plot_columns_percent_by_cluster(
         axs = np.array(axs)                     # Se não for, converte para um array numpy de um único elemento 
 
     for ax, coluna in zip(axs.flatten(), columns):
-        h = sns.histplot(x=column_cluster, hue=coluna, data=dataframe, ax=ax, multiple='fill', stat='percent', discrete=True, shrink=0.8, palette=palette)
-
-        n_clusters = dataframe[column_cluster].nunique()      # Pra pegar automaticamente uma lista com o número dos clusters
-        h.set_xticks(range(n_clusters))                       # Define os ticks do eixo X como o número de clusters (para não ficar com valores float, como 0.5, 1.0, 1.5 ...)
-        h.yaxis.set_major_formatter(PercentFormatter(1))      # Formata o eixo Y para mostrar porcentagens de 0 a 1
-        h.set_ylabel("")                                      # Remove o rótulo do eixo Y, pois já está formatado como porcentagem
-        h.tick_params(axis='both', which='both', length=0)    # Remove os ticks dos eixos X e Y para deixar o gráfico mais limpo
+        contagens = tabela.loc[coluna].T                       # linhas = clusters, colunas = valores da feature
+        proporcoes = contagens.div(contagens.sum(axis=1), axis=0).fillna(0)
 
-        for bars in h.containers:
-            h.bar_label(bars, label_type='center', labels=[f'{b.get_height():.1%}' for b in bars], color='white', weight='bold', fontsize=10)
-
-        for bar in h.patches:                                 # Remove as bordas das barras para deixar o gráfico mais limpo
-            bar.set_linewidth(0)
+        _barras_empilhadas(ax, proporcoes, palette)
+        ax.set_xlabel(column_cluster)
+        ax.legend(title=coluna)
 
     plt.subplots_adjust(wspace=0.25)                          # Para controlar o espaçamento entre os gráficos (mas precisa tirar o tight_layout)
 
-    # multiple = 'fill' para mostrar as barras empilhadas,
-    # stat='percent' para mostrar a porcentagem de cada categoria dentro de cada barra
-    # discrete=True para as barras sem interpolações (o que acaba unindo elas se não não usarmos shrink)
-    # shrink=0.8 para dar um pequeno espaçamento entre uma barra e outras
-
 
 
 def plot_columns_percent_hue_cluster(
@@ -160,7 +564,9 @@ def plot_columns_percent_hue_cluster(
         column_cluster='cluster',
         rows_cols=(2,3),
         figsize=(15, 8),
-        palette='tab10'
+        palette='tab10',
+        tabela=None,
+        n_jobs=-1,
 ):
     """Função para plotar o percentual de cada cluster para as variáveis de cada features em análise.
 
@@ -178,42 +584,43 @@ def plot_columns_percent_hue_cluster(
         Tamanho da figura, por padrão (15, 8)
     palette : str, opcional
         Paleta a ser utilizada, por padrão 'tab10'
+    tabela : pd.DataFrame, opcional
+        Contagens já calculadas com `tabela_contagens_cluster` (o dataframe não é usado), por padrão None
+    n_jobs : int, opcional
+        Número de threads para as contagens, por padrão -1
     """
-    
+    if tabela is None:
+        tabela = tabela_contagens_cluster(dataframe, columns, column_cluster, n_jobs=n_jobs)
+
     fig, axs = plt.subplots(nrows=rows_cols[0], ncols=rows_cols[1], figsize=figsize, sharey=True)
 
     if axs is not isinstance(axs, np.ndarray):  # Verifica se axs é um array numpy ---> método para ser usado caso queiramos gerar apenas 1 gráfico (1,1)
         axs = np.array(axs)                     # Se não for, converte para um array numpy de um único elemento 
 
     for ax, coluna in zip(axs.flatten(), columns):
-        h = sns.histplot(x=coluna, hue=column_cluster, data=dataframe, ax=ax, multiple='fill', stat='percent', discrete=True, shrink=0.8, palette=palette)
-
-        if dataframe[coluna].dtype != 'object':
-            h.set_xticks(range(dataframe[coluna].nunique()))  # Define os ticks do eixo X conforme as entradas unicas da coluna
+        contagens = tabela.loc[coluna]                         # linhas = valores da feature, colunas = clusters
+        proporcoes = contagens.div(contagens.sum(axis=1), axis=0).fillna(0)
 
-        h.yaxis.set_major_formatter(PercentFormatter(1))         # Formata o eixo Y para mostrar porcentagens de 0 a 1
-        h.set_ylabel("")                                         # Remove o rótulo do eixo Y, pois já está formatado como porcentagem
-        h.tick_params(axis='both', which='both', length=0)       # Remove os ticks dos eixos X e Y para deixar o gráfico mais limpo
+        _barras_empilhadas(ax, proporcoes, palette)
+        ax.set_xlabel(coluna)
 
-        for bars in h.containers:
-            h.bar_label(bars, label_type='center', labels=[f'{b.get_height():.1%}' for b in bars], color='white', weight='bold', fontsize=10)
+    handles, labels = axs.flatten()[0].get_legend_handles_labels()
+    fig.legend(handles=handles, labels=labels, loc='upper center', ncol=tabela.shape[1], title='Clusters')  # Adicionando a legenda no gráfico
 
-        for bar in h.patches:                                   # Remove as bordas das barras para deixar o gráfico mais limpo
-            bar.set_linewidth(0)
-
-        legend = h.get_legend()                                 # Pegando a legenda do gráfico
-        legend.remove()                                         # Removendo a legenda de cada gráfico
+    plt.subplots_adjust(wspace=0.25, hspace=0.25)                        # Para controlar o espaçamento entre os gráficos (mas precisa tirar o tight_layout)
 
-    labels = [text.get_text() for text in legend.get_texts()]      # Para pegar os textos da legenda e atribuindo a variável labels
-    fig.legend(handles=legend.legend_handles, labels=labels, loc='upper center', ncol=dataframe[column_cluster].nunique(), title='Clusters')  # Adicionando a legenda no gráfico
 
-    plt.subplots_adjust(wspace=0.25, hspace=0.25)                        # Para controlar o espaçamento entre os gráficos (mas precisa tirar o tight_layout)
 
-    # multiple = 'fill' para mostrar as barras empilhadas,
-    # stat='percent' para mostrar a porcentagem de cada categoria dentro de cada barra
-    # discrete=True para as barras sem interpolações (o que acaba unindo elas se não não usarmos shrink)
-    # shrink=0.8 para dar um pequeno espaçamento entre uma barra e outras
+def _desenhar_centroides(ax, centroids):
+    # todos os centroides em uma única chamada, com as cores do ciclo padrão (C0, C1, ...);
+    # chamada depois dos pontos e com zorder maior para ficar por cima deles
+    centroids = np.asarray(centroids)
+    ax.scatter(*centroids.T, s=500, alpha=0.5, c=[f"C{i}" for i in range(len(centroids))], zorder=3)
 
+    for i, centroid in enumerate(centroids):
+        ax.text(
+            *centroid, f"{i}", fontsize=20, horizontalalignment="center", verticalalignment="center", zorder=4
+        )
 
 
 def visualizar_clusters_3d(
@@ -224,30 +631,29 @@ def visualizar_clusters_3d(
     mostrar_centroids=True, 
     mostrar_pontos=False,            # Se for usado o parametro igual a True, precisa ser fornecido a 'coluna_cluster' abaixo
     coluna_clusters=None,            # Esse dataframe['coluna_cluster'] não precisa ser o mesmo df_preprocessado do 1º parametro, pode ser o df_clustered['cluster']
+    max_pontos=LIMITE_PONTOS,        # Acima desse número de linhas, desenha uma amostra estratificada por cluster
+    random_state=42,
 ):
 
     fig = plt.figure()
     
-    ax = fig.add_subplot(111, projection="3d")
+    # computed_zorder=False: a ordem de desenho (e o zorder) vale também no 3D
+    ax = fig.add_subplot(111, projection="3d", computed_zorder=False)
     
     cores = plt.cm.tab10.colors[:quantidade_cores_clusters]
     cores = ListedColormap(cores)
-    
-    x = dataframe[colunas[0]]
-    y = dataframe[colunas[1]]
-    z = dataframe[colunas[2]]
-    
-    ligar_centroids = mostrar_centroids
-    ligar_pontos = mostrar_pontos
-    
-    for i, centroid in enumerate(centroids):
-        if ligar_centroids: 
-            ax.scatter(*centroid, s=500, alpha=0.5)
-            ax.text(*centroid, f"{i}", fontsize=20, horizontalalignment="center", verticalalignment="center")
-    
-        if ligar_pontos:
-            s = ax.scatter(x, y, z, c=coluna_clusters, cmap=cores)
-            ax.legend(*s.legend_elements(), bbox_to_anchor=(1.3, 1))
+
+    if mostrar_pontos:
+        # os pontos são desenhados uma única vez (não um scatter por centroide)
+        rotulos = None if coluna_clusters is None else np.asarray(coluna_clusters)
+        posicoes = amostra_estratificada(rotulos, max_pontos, random_state, n_linhas=len(dataframe))
+        x, y, z = (dataframe[coluna].to_numpy()[posicoes] for coluna in colunas[:3])
+
+        s = ax.scatter(x, y, z, c=None if rotulos is None else rotulos[posicoes], cmap=cores)
+        ax.legend(*s.legend_elements(), bbox_to_anchor=(1.3, 1))
+
+    if mostrar_centroids:
+        _desenhar_centroides(ax, centroids)
     
     ax.set_xlabel(colunas[0])
     ax.set_ylabel(colunas[1])
@@ -265,6 +671,9 @@ def plot_clusters_2D(
     show_centroids=True,
     show_points=False,
     column_clusters=None,
+    max_points=LIMITE_PONTOS,
+    density=False,
+    random_state=42,
 ):
     """Gerar gráfico 2D com os clusters.
 
@@ -285,6 +694,14 @@ def plot_clusters_2D(
     column_clusters : List[int], opcional
         Coluna com os números dos clusters para colorir os pontos
         (caso mostrar_pontos seja True), por padrão None
+    max_points : int, opcional
+        Número de linhas a partir do qual os pontos são amostrados (estratificando por
+        cluster), por padrão 50_000
+    density : bool, opcional
+        Acima de `max_points`, desenha a densidade de todos os pontos (cor do cluster mais
+        frequente em cada faixa) em vez da amostra, por padrão False
+    random_state : int, opcional
+        Semente da amostra, por padrão 42
     """
 
     fig = plt.figure()
@@ -294,27 +711,27 @@ def plot_clusters_2D(
     cores = plt.cm.tab10.colors[:n_colors]
     cores = ListedColormap(cores)
 
-    x = dataframe[columns[0]]
-    y = dataframe[columns[1]]
-
-    ligar_centroids = show_centroids
-    ligar_pontos = show_points
-
-    for i, centroid in enumerate(centroids):
-        if ligar_centroids:
-            ax.scatter(*centroid, s=500, alpha=0.5)
-            ax.text(
-                *centroid,
-                f"{i}",
-                fontsize=20,
-                horizontalalignment="center",
-                verticalalignment="center",
-            )
-
-        if ligar_pontos:
-            s = ax.scatter(x, y, c=column_clusters, cmap=cores)
+    x = dataframe[columns[0]].to_numpy()
+    y = dataframe[columns[1]].to_numpy()
+
+    if show_points:
+        rotulos = None if column_clusters is None else np.asarray(column_clusters)
+
+        if density and len(x) > max_points and rotulos is None:
+            _desenhar_densidade(ax, x, y)
+        elif density and len(x) > max_points:
+            # mesma correspondência valor -> cor do scatter (do menor ao maior cluster)
+            norm = Normalize(vmin=rotulos.min(), vmax=rotulos.max())
+            handles = _desenhar_densidade(ax, x, y, cores, rotulos, norm)
+            ax.legend(handles=handles, bbox_to_anchor=(1.3, 1))
+        else:
+            posicoes = amostra_estratificada(rotulos, max_points, random_state, n_linhas=len(x))
+            s = ax.scatter(x[posicoes], y[posicoes], c=None if rotulos is None else rotulos[posicoes], cmap=cores)
             ax.legend(*s.legend_elements(), bbox_to_anchor=(1.3, 1))
 
+    if show_centroids:
+        _desenhar_centroides(ax, centroids)
+
     ax.set_xlabel(columns[0])
     ax.set_ylabel(columns[1])
     ax.set_title("Clusters")
@@ -373,3 +790,93 @@ def plot_comparar_metricas_modelos(df_resultados):
     plt.tight_layout()
 
     plt.show()
+
+
+def plot_tempos_etapas(df_resultados, incluir_internas=False):
+    """Tempo, pico de memória e tamanho da saída de cada etapa dos pipelines, por modelo.
+
+    Usa as colunas 'etapa:<nome>:<medida>' geradas com `instrumentar=True` em
+    `treinar_e_validar_modelo_classificacao` ou `comparar_modelos_classificacao` (média dos folds).
+
+    Parameters
+    ----------
+    df_resultados : pandas.DataFrame
+        Saída de `organiza_resultados` (uma linha por modelo e fold).
+    incluir_internas : bool, opcional
+        Mostra também as etapas internas do preprocessamento (ex: 'preprocessor/power'). O tempo
+        delas já está contido no da etapa de fora, por padrão False
+    """
+    colunas = [coluna for coluna in df_resultados.columns if str(coluna).startswith("etapa:")]
+    if not colunas:
+        raise ValueError("df_resultados não tem colunas de etapas; valide os modelos com instrumentar=True.")
+
+    medicoes = (
+        df_resultados.groupby("model", sort=False)[colunas].mean()
+        .melt(ignore_index=False, var_name="coluna", value_name="valor")
+        .reset_index()
+        .dropna(subset=["valor"])
+    )
+    medicoes[["etapa", "medida"]] = medicoes["coluna"].str.split(":", expand=True)[[1, 2]]
+
+    if not incluir_internas:
+        medicoes = medicoes[~medicoes["etapa"].str.contains("/")]
+
+    tempos = medicoes[medicoes["medida"].str.endswith("_s")].copy()
+    tempos["etapa"] = tempos["etapa"] + " (" + tempos["medida"].str.removesuffix("_s") + ")"
+
+    paineis = [
+        (tempos, "Tempo (s)"),
+        (medicoes[medicoes["medida"] == "memoria_pico_mb"], "Pico de memória (MB)"),
+        (medicoes[medicoes["medida"] == "saida_mb"], "Saída do fit (MB)"),
+    ]
+
+    fig, axs = plt.subplots(1, 3, figsize=(15, max(4, 1.5 * medicoes["model"].nunique())), sharey=True)
+
+    for ax, (dados, titulo) in zip(axs, paineis):
+        if dados.empty:
+            ax.set_visible(False)
+            continue
+
+        sns.barplot(data=dados, x="valor", y="model", hue="etapa", ax=ax)
+        ax.set_title(titulo)
+        ax.set_xlabel(titulo)
+        ax.set_ylabel("")
+        ax.legend(fontsize="small")
+
+    plt.tight_layout()
+
+    plt.show()
+
+
+def plot_diagnosticos_oof(oof, display_labels=("Não Respondeu", "Respondeu")):
+    """Curva Precision-Recall, curva ROC e matriz de confusão a partir das previsões out-of-fold.
+
+    Substitui os `cross_val_predict` e o `ConfusionMatrixDisplay.from_estimator` do notebook 03:
+    tudo vem das previsões gravadas durante a validação cruzada, sem ajustar o modelo de novo.
+
+    Parameters
+    ----------
+    oof : pandas.DataFrame
+        Saída de `src.oof.carregar_oof` (colunas 'y_true', 'y_score' e 'y_pred').
+    display_labels : Tuple[str, str], opcional
+        Nomes das classes na matriz de confusão, por padrão ("Não Respondeu", "Respondeu")
+    """
+    from sklearn.metrics import ConfusionMatrixDisplay, PrecisionRecallDisplay, RocCurveDisplay
+
+    fig, axs = plt.subplots(1, 3, figsize=(15, 5))
+
+    PrecisionRecallDisplay.from_predictions(oof["y_true"], oof["y_score"], ax=axs[0], plot_chance_level=True)
+    axs[0].set_title("Precision-Recall (out-of-fold)")
+
+    RocCurveDisplay.from_predictions(oof["y_true"], oof["y_score"], ax=axs[1], plot_chance_level=True)
+    axs[1].set_title("ROC (out-of-fold)")
+
+    ConfusionMatrixDisplay.from_predictions(
+        oof["y_true"], oof["y_pred"], display_labels=list(display_labels), ax=axs[2], colorbar=False
+    )
+    axs[2].grid(False)
+    axs[2].set_title("Matriz de confusão (out-of-fold)")
+
+    plt.tight_layout()
+
+    plt.show()
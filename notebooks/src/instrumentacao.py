@@ -0,0 +1,235 @@
+"""Tempo, pico de memória e tamanho da saída de cada etapa de um Pipeline.
+
+`instrumentar` envolve cada etapa (e os transformadores de um ColumnTransformer) em uma
+`EtapaInstrumentada`, que mede fit, transform e predict sem alterar o resultado. Depois do ajuste e
+da avaliação de um fold, `medicoes_pipeline` devolve as medições em colunas planas
+('etapa:<nome>:<medida>'), que entram no dataframe de `organiza_resultados`.
+"""
+import time
+import tracemalloc
+
+import numpy as np
+from sklearn.base import BaseEstimator, clone
+from sklearn.compose import ColumnTransformer
+from sklearn.pipeline import Pipeline
+from sklearn.utils.metaestimators import available_if
+
+
+PREFIXO = "etapa"
+
+# Medições abertas (etapas aninhadas, ex: o PowerTransformer dentro do ColumnTransformer). O pico
+# do tracemalloc é único no processo: cada medição zera o pico ao começar e, ao terminar, repassa
+# o pico que viu para a medição de fora.
+_PILHA_MEMORIA = []
+
+
+class _Medicao:
+    def __init__(self, memoria):
+        self.memoria = memoria
+
+    def __enter__(self):
+        if self.memoria:
+            self._iniciou = not tracemalloc.is_tracing()
+            if self._iniciou:
+                tracemalloc.start()
+
+            atual, pico = tracemalloc.get_traced_memory()
+            if _PILHA_MEMORIA:
+                _PILHA_MEMORIA[-1]["pico"] = max(_PILHA_MEMORIA[-1]["pico"], pico)
+            tracemalloc.reset_peak()
+            _PILHA_MEMORIA.append({"base": atual, "pico": atual})
+
+        self._inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.tempo = time.perf_counter() - self._inicio
+        self.pico_mb = np.nan
+
+        if self.memoria:
+            _, pico = tracemalloc.get_traced_memory()
+            medicao = _PILHA_MEMORIA.pop()
+            pico = max(medicao["pico"], pico)
+            self.pico_mb = (pico - medicao["base"]) / 2**20
+
+            if _PILHA_MEMORIA:
+                _PILHA_MEMORIA[-1]["pico"] = max(_PILHA_MEMORIA[-1]["pico"], pico)
+            if self._iniciou:
+                tracemalloc.stop()
+
+        return False
+
+
+def _tamanho_mb(matriz):
+    if hasattr(matriz, "memory_usage"):
+        return matriz.memory_usage(index=False).sum() / 2**20
+    if hasattr(matriz, "indptr"):
+        return (matriz.data.nbytes + matriz.indices.nbytes + matriz.indptr.nbytes) / 2**20
+    return np.asarray(matriz).nbytes / 2**20
+
+
+def _tem_metodo(metodo):
+    return lambda self: hasattr(self.estimador, metodo)
+
+
+class EtapaInstrumentada(BaseEstimator):
+    """Envolve um transformador ou estimador e mede cada chamada de fit, transform e predict.
+
+    As medições ficam em `medicoes_` ({operação: {'tempo_s', 'memoria_pico_mb', 'chamadas'}}),
+    com os tempos somados e o maior pico entre as chamadas da mesma operação. `saida_mb` guarda o
+    tamanho da matriz gerada no ajuste (fit_transform). Os hiperparâmetros do estimador envolvido
+    ficam sob `estimador__` (ex: `clf__estimador__C` em vez de `clf__C`).
+
+    Parameters
+    ----------
+    estimador : estimador do sklearn
+        Etapa a ser medida (é clonada no fit).
+    memoria : bool, opcional
+        Mede o pico de memória com o `tracemalloc`, que deixa as etapas mais lentas, por padrão True
+    """
+
+    def __init__(self, estimador, memoria=True):
+        self.estimador = estimador
+        self.memoria = memoria
+
+    def __sklearn_tags__(self):
+        return self.estimador.__sklearn_tags__()
+
+    def _registrar(self, operacao, medicao):
+        registro = self.medicoes_.setdefault(operacao, {"tempo_s": 0.0, "memoria_pico_mb": np.nan, "chamadas": 0})
+        registro["tempo_s"] += medicao.tempo
+        registro["memoria_pico_mb"] = np.fmax(registro["memoria_pico_mb"], medicao.pico_mb)
+        registro["chamadas"] += 1
+
+    def _chamar(self, operacao, metodo, *args, **kwargs):
+        with _Medicao(self.memoria) as medicao:
+            saida = getattr(self.estimador_, metodo)(*args, **kwargs)
+        self._registrar(operacao, medicao)
+        return saida
+
+    def fit(self, X, y=None, **fit_params):
+        self.estimador_ = clone(self.estimador)
+        self.medicoes_ = {}
+        self._chamar("fit", "fit", X, y, **fit_params)
+        return self
+
+    @available_if(_tem_metodo("transform"))
+    def fit_transform(self, X, y=None, **fit_params):
+        self.estimador_ = clone(self.estimador)
+        self.medicoes_ = {}
+
+        if hasattr(self.estimador_, "fit_transform"):
+            saida = self._chamar("fit", "fit_transform", X, y, **fit_params)
+        else:
+            saida = self._chamar("fit", "fit", X, y, **fit_params).transform(X)
+
+        self.saida_mb_ = _tamanho_mb(saida)
+        return saida
+
+    @available_if(_tem_metodo("transform"))
+    def transform(self, X):
+        return self._chamar("transform", "transform", X)
+
+    @available_if(_tem_metodo("predict"))
+    def predict(self, X):
+        return self._chamar("predict", "predict", X)
+
+    @available_if(_tem_metodo("predict_proba"))
+    def predict_proba(self, X):
+        return self._chamar("predict", "predict_proba", X)
+
+    @available_if(_tem_metodo("decision_function"))
+    def decision_function(self, X):
+        return self._chamar("predict", "decision_function", X)
+
+    @available_if(_tem_metodo("get_feature_names_out"))
+    def get_feature_names_out(self, input_features=None):
+        return self.estimador_.get_feature_names_out(input_features)
+
+    @property
+    def classes_(self):
+        return self.estimador_.classes_
+
+    @property
+    def n_features_in_(self):
+        return self.estimador_.n_features_in_
+
+
+def instrumentar(estimador, memoria=True):
+    """Envolve as etapas de um Pipeline (e de ColumnTransformers) em `EtapaInstrumentada`.
+
+    Parameters
+    ----------
+    estimador : Pipeline, ColumnTransformer ou estimador do sklearn
+        Objeto não ajustado.
+    memoria : bool, opcional
+        Mede também o pico de memória de cada etapa, por padrão True
+
+    Returns
+    -------
+    Pipeline, ColumnTransformer ou EtapaInstrumentada
+        Cópia com as etapas envolvidas.
+    """
+    if isinstance(estimador, Pipeline):
+        return Pipeline([(nome, instrumentar(etapa, memoria)) for nome, etapa in estimador.steps])
+
+    if isinstance(estimador, ColumnTransformer):
+        estimador = clone(estimador).set_params(transformers=[
+            (nome, etapa if etapa in ("drop", "passthrough") else instrumentar(etapa, memoria), colunas)
+            for nome, etapa, colunas in estimador.transformers
+        ])
+
+    return EtapaInstrumentada(estimador, memoria)
+
+
+def _etapas_ajustadas(estimador, nome):
+    if isinstance(estimador, Pipeline):
+        for nome_etapa, etapa in estimador.steps:
+            yield from _etapas_ajustadas(etapa, nome_etapa if nome is None else f"{nome}/{nome_etapa}")
+
+    elif isinstance(estimador, EtapaInstrumentada) and hasattr(estimador, "medicoes_"):
+        yield nome, estimador
+        yield from _etapas_ajustadas(estimador.estimador_, nome)
+
+    elif isinstance(estimador, ColumnTransformer) and hasattr(estimador, "transformers_"):
+        for nome_etapa, etapa, _ in estimador.transformers_:
+            yield from _etapas_ajustadas(etapa, f"{nome}/{nome_etapa}")
+
+
+def medicoes_pipeline(pipeline):
+    """Medições de um pipeline instrumentado e ajustado, em colunas planas.
+
+    Parameters
+    ----------
+    pipeline : Pipeline
+        Saída de `instrumentar` após o fit (e, se for o caso, a avaliação no fold de teste).
+
+    Returns
+    -------
+    dict
+        Chaves 'etapa:<nome>:<operacao>_s', 'etapa:<nome>:memoria_pico_mb' e
+        'etapa:<nome>:saida_mb'. Etapas internas de um ColumnTransformer aparecem como
+        '<pipeline>/<transformador>' (ex: 'etapa:preprocessor/power:fit_s').
+    """
+    medicoes = {}
+
+    for nome, etapa in _etapas_ajustadas(pipeline, None):
+        for operacao, registro in etapa.medicoes_.items():
+            medicoes[f"{PREFIXO}:{nome}:{operacao}_s"] = registro["tempo_s"]
+
+        picos = [registro["memoria_pico_mb"] for registro in etapa.medicoes_.values()]
+        medicoes[f"{PREFIXO}:{nome}:memoria_pico_mb"] = np.fmax.reduce(picos) if picos else np.nan
+
+        if hasattr(etapa, "saida_mb_"):
+            medicoes[f"{PREFIXO}:{nome}:saida_mb"] = etapa.saida_mb_
+
+    return medicoes
+
+
+def colunas_etapas(colunas):
+    """Separa as colunas de medição ('etapa:<nome>:<medida>') em (coluna, etapa, medida)."""
+    return [
+        tuple([coluna] + coluna.split(":")[1:])
+        for coluna in colunas
+        if isinstance(coluna, str) and coluna.startswith(f"{PREFIXO}:")
+    ]
@@ -0,0 +1,189 @@
+import numpy as np
+import pandas as pd
+
+
+# Custo por contato e receita por cliente que responde (colunas Z_CostContact e Z_Revenue de
+# ml_project1_data.csv, iguais para todos os clientes)
+CUSTO_CONTATO = 3
+RECEITA_RESPOSTA = 11
+
+
+def _por_cliente(valor, n):
+    # valor único (float) ou um valor por cliente (ex: a coluna Z_CostContact)
+    valor = np.asarray(valor, dtype=float)
+    return np.broadcast_to(valor, (n,)) if valor.ndim == 0 else valor
+
+
+def _acumulados_ordenados(y_score, y_true, custo, receita):
+    # uma ordenação decrescente dos scores; acumulados no último cliente de cada score distinto
+    ordem = np.argsort(y_score, kind="stable")[::-1]
+    scores = y_score[ordem]
+
+    ultimos = np.r_[np.flatnonzero(np.diff(scores)), len(scores) - 1]
+
+    contatados = ultimos + 1
+    respostas = np.cumsum(y_true[ordem])[ultimos]
+    custos = np.cumsum(custo[ordem])[ultimos]
+    receitas = np.cumsum((y_true * receita)[ordem])[ultimos]
+
+    return scores[ultimos], contatados, respostas, custos, receitas
+
+
+def _acumulados_por_faixa(y_score, y_true, custo, receita, n_faixas):
+    # sem ordenação: os scores (entre 0 e 1) são agrupados em faixas de mesma largura, contadas
+    # com np.bincount e acumuladas da faixa mais alta para a mais baixa. A faixa vem das próprias
+    # bordas (e não de score * n_faixas, que leva 0.57 para a faixa 56 com 100 faixas), para que
+    # a linha de cada limiar conte exatamente os clientes com score >= limiar
+    bordas = np.arange(n_faixas) / n_faixas
+    faixas = np.searchsorted(bordas, np.clip(y_score, 0, 1), side="right") - 1
+
+    def acumular(pesos):
+        return np.cumsum(np.bincount(faixas, weights=pesos, minlength=n_faixas)[::-1])
+
+    limiares = bordas[::-1]
+    contatados = acumular(None)
+    respostas = acumular(y_true)
+    custos = acumular(custo)
+    receitas = acumular(y_true * receita)
+
+    presentes = np.r_[True, np.diff(contatados) > 0] & (contatados > 0)
+    return limiares[presentes], contatados[presentes], respostas[presentes], custos[presentes], receitas[presentes]
+
+
+def curva_lucro(y_score, y_true=None, custo=CUSTO_CONTATO, receita=RECEITA_RESPOSTA, n_faixas=None):
+    """Custo, receita, lucro e ROI da campanha para todos os limiares de score.
+
+    Contatar os clientes com score >= limiar custa a soma dos custos de contato e gera a receita
+    dos que respondem. Todos os limiares saem de uma única passagem acumulada sobre os clientes
+    ordenados pelo score (ou agrupados em faixas, com `n_faixas`, sem ordenar).
+
+    Parameters
+    ----------
+    y_score : array-like
+        Scores dos clientes (ex: probabilidades out-of-fold do modelo).
+    y_true : array-like, opcional
+        Resposta observada (0/1). Se None, os scores são tratados como probabilidades calibradas
+        e a receita é a esperada (score * receita), por padrão None
+    custo : float ou array-like, opcional
+        Custo de contato (único ou por cliente, ex: `df['Z_CostContact']`), por padrão 3
+    receita : float ou array-like, opcional
+        Receita por cliente que responde (única ou por cliente, ex: `df['Z_Revenue']`), por padrão 11
+    n_faixas : int, opcional
+        Agrupa os scores (entre 0 e 1) em faixas de mesma largura em vez de ordenar, por padrão
+        None (um limiar por score distinto). Use com dezenas de milhões de clientes.
+
+    Returns
+    -------
+    pd.DataFrame
+        Uma linha por limiar (do maior para o menor): 'limiar', 'contatados', 'respostas',
+        'custo', 'receita', 'lucro', 'roi', 'precisao' e 'recall'.
+    """
+    y_score = np.asarray(y_score, dtype=float)
+    n = len(y_score)
+    y_true = y_score if y_true is None else np.asarray(y_true, dtype=float)
+    custo = _por_cliente(custo, n)
+    receita = _por_cliente(receita, n)
+
+    if n_faixas is None:
+        acumulados = _acumulados_ordenados(y_score, y_true, custo, receita)
+    else:
+        acumulados = _acumulados_por_faixa(y_score, y_true, custo, receita, n_faixas)
+
+    limiares, contatados, respostas, custos, receitas = acumulados
+    total_respostas = y_true.sum()
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        curva = pd.DataFrame({
+            "limiar": limiares,
+            "contatados": contatados,
+            "respostas": respostas,
+            "custo": custos,
+            "receita": receitas,
+            "lucro": receitas - custos,
+            "roi": np.where(custos > 0, (receitas - custos) / custos, np.nan),
+            "precisao": respostas / contatados,
+            "recall": respostas / total_respostas if total_respostas else np.nan,
+        })
+
+    return curva
+
+
+def limiar_otimo(curva):
+    """Linha da curva (ver `curva_lucro`) com o maior lucro.
+
+    Returns
+    -------
+    pd.Series
+        Limiar, contatados, custo, receita, lucro, ROI, precisão e recall do limiar ótimo.
+    """
+    return curva.loc[curva["lucro"].idxmax()]
+
+
+def selecionar_clientes_orcamento(
+    y_score,
+    orcamento,
+    custo=CUSTO_CONTATO,
+    receita=RECEITA_RESPOSTA,
+    somente_lucrativos=True,
+):
+    """Seleciona os clientes a contatar com um orçamento fixo de campanha.
+
+    O lucro esperado de cada cliente é `score * receita - custo` (score = probabilidade de resposta).
+    Os clientes são escolhidos pelo lucro esperado por unidade de custo até o orçamento acabar. Só
+    os candidatos que cabem no orçamento são ordenados: um `np.argpartition` (O(n)) separa o maior
+    número de clientes que o orçamento consegue pagar, e a ordenação é feita apenas nesse grupo.
+
+    Parameters
+    ----------
+    y_score : array-like
+        Probabilidade de resposta de cada cliente.
+    orcamento : float
+        Valor máximo gasto com contatos.
+    custo : float ou array-like, opcional
+        Custo de contato (único ou por cliente), por padrão 3
+    receita : float ou array-like, opcional
+        Receita por cliente que responde (única ou por cliente), por padrão 11
+    somente_lucrativos : bool, opcional
+        Descarta clientes com lucro esperado <= 0 mesmo que haja orçamento, por padrão True
+
+    Returns
+    -------
+    Tuple[np.ndarray, dict]
+        Posições dos clientes selecionados (do maior para o menor lucro esperado por custo) e
+        o resumo com 'contatados', 'custo', 'receita_esperada', 'lucro_esperado' e 'roi_esperado'.
+    """
+    y_score = np.asarray(y_score, dtype=float)
+    n = len(y_score)
+    custo = _por_cliente(custo, n)
+    receita = _por_cliente(receita, n)
+
+    lucro = y_score * receita - custo
+    with np.errstate(divide="ignore", invalid="ignore"):
+        prioridade = np.where(custo > 0, lucro / custo, np.inf)
+
+    candidatos = np.arange(n)
+    if somente_lucrativos:
+        candidatos = candidatos[lucro > 0]
+
+    # o orçamento paga no máximo `k` clientes (todos com o menor custo entre os candidatos)
+    custo_minimo = custo[candidatos].min() if len(candidatos) else 0.0
+    k = len(candidatos) if custo_minimo <= 0 else int(min(len(candidatos), orcamento // custo_minimo))
+
+    if 0 < k < len(candidatos):
+        candidatos = candidatos[np.argpartition(-prioridade[candidatos], k - 1)[:k]]
+
+    candidatos = candidatos[np.argsort(-prioridade[candidatos], kind="stable")]
+    selecionados = candidatos[np.cumsum(custo[candidatos]) <= orcamento]
+
+    custo_total = float(custo[selecionados].sum())
+    receita_esperada = float((y_score * receita)[selecionados].sum())
+
+    resumo = {
+        "contatados": len(selecionados),
+        "custo": custo_total,
+        "receita_esperada": receita_esperada,
+        "lucro_esperado": receita_esperada - custo_total,
+        "roi_esperado": (receita_esperada - custo_total) / custo_total if custo_total else np.nan,
+    }
+
+    return selecionados, resumo
@@ -0,0 +1,138 @@
+import numpy as np
+
+
+def metricas_curva(tps, fps):
+    """Calcula ROC-AUC e average precision a partir das contagens acumuladas por limiar.
+
+    Parameters
+    ----------
+    tps : np.ndarray
+        Verdadeiros positivos acumulados em cada limiar distinto, do maior para o menor score.
+    fps : np.ndarray
+        Falsos positivos acumulados nos mesmos limiares.
+
+    Returns
+    -------
+    Tuple[float, float]
+        (roc_auc, average_precision). O ROC-AUC é NaN se houver apenas uma classe.
+    """
+    positivos, negativos = tps[-1], fps[-1]
+
+    if positivos == 0 or negativos == 0:
+        roc_auc = np.nan
+    else:
+        tpr = np.r_[0.0, tps / positivos]
+        fpr = np.r_[0.0, fps / negativos]
+        roc_auc = float(np.sum(np.diff(fpr) * (tpr[1:] + tpr[:-1]) / 2))
+
+    if positivos == 0:
+        average_precision = 0.0
+    else:
+        precisao = tps / np.maximum(tps + fps, 1)
+        average_precision = float(np.sum(np.diff(np.r_[0.0, tps]) / positivos * precisao))
+
+    return roc_auc, average_precision
+
+
+def metricas_confusao(tp, fp, fn, tn):
+    """Calcula as métricas baseadas na matriz de confusão (zero_division=0, como no sklearn).
+
+    Returns
+    -------
+    dict
+        accuracy, balanced_accuracy, f1, precision e recall.
+    """
+    total = tp + fp + fn + tn
+    precision = tp / (tp + fp) if tp + fp else 0.0
+    recall = tp / (tp + fn) if tp + fn else 0.0
+    f1 = 2 * tp / (2 * tp + fp + fn) if tp + fp + fn else 0.0
+
+    # média do recall de cada classe presente no y verdadeiro
+    recalls_classes = []
+    if tp + fn:
+        recalls_classes.append(recall)
+    if tn + fp:
+        recalls_classes.append(tn / (tn + fp))
+    balanced_accuracy = float(np.mean(recalls_classes)) if recalls_classes else 0.0
+
+    return {
+        "accuracy": (tp + tn) / total if total else 0.0,
+        "balanced_accuracy": balanced_accuracy,
+        "f1": f1,
+        "precision": precision,
+        "recall": recall,
+    }
+
+
+def calcular_metricas_classificacao(y_true, y_score, y_pred):
+    """Calcula as sete métricas de `METRICAS` com uma única ordenação dos scores.
+
+    Parameters
+    ----------
+    y_true : array-like
+        Target binário (True/1 para a classe positiva).
+    y_score : array-like
+        Score contínuo da classe positiva (decision_function ou probabilidade).
+    y_pred : array-like
+        Classe prevista (True/1 para a classe positiva).
+
+    Returns
+    -------
+    dict
+        accuracy, balanced_accuracy, f1, precision, recall, roc_auc e average_precision.
+    """
+    y_true = np.asarray(y_true).astype(bool)
+    y_score = np.asarray(y_score, dtype=float)
+    y_pred = np.asarray(y_pred).astype(bool)
+
+    tp = int(np.count_nonzero(y_true & y_pred))
+    fp = int(np.count_nonzero(~y_true & y_pred))
+    fn = int(np.count_nonzero(y_true & ~y_pred))
+    tn = len(y_true) - tp - fp - fn
+
+    metricas = metricas_confusao(tp, fp, fn, tn)
+
+    ordem = np.argsort(y_score, kind="mergesort")[::-1]
+    score_ordenado = y_score[ordem]
+    indices_limiares = np.r_[np.flatnonzero(np.diff(score_ordenado)), len(y_true) - 1]
+
+    tps = np.cumsum(y_true[ordem])[indices_limiares]
+    fps = 1 + indices_limiares - tps
+
+    metricas["roc_auc"], metricas["average_precision"] = metricas_curva(tps, fps)
+
+    return metricas
+
+
+def scores_e_previsoes(estimator, X):
+    """Obtém, com uma única chamada ao modelo, o score contínuo e a classe prevista (positiva = True).
+
+    Usa `decision_function` quando disponível (como os scorers de ROC-AUC e average precision
+    do sklearn) e, caso contrário, `predict_proba`. A classe prevista segue a regra do `predict`
+    desses estimadores: decision_function > 0 ou probabilidade > 0.5.
+    """
+    if len(estimator.classes_) != 2:
+        raise ValueError("O pontuador multimétrica só suporta classificação binária.")
+
+    if hasattr(estimator, "decision_function"):
+        y_score = np.ravel(estimator.decision_function(X))
+        y_pred = y_score > 0
+    else:
+        y_score = estimator.predict_proba(X)[:, 1]
+        y_pred = y_score > 0.5
+
+    return y_score, y_pred
+
+
+def pontuador_multimetrica(estimator, X, y):
+    """Scorer do sklearn que calcula as sete métricas a partir de uma única previsão por fold.
+
+    Pode ser passado como `scoring` para `cross_validate` e `GridSearchCV` (o `refit` continua
+    sendo o nome de uma das métricas, ex: 'roc_auc').
+
+    Obs: para classificadores em que `predict` não é derivado de `predict_proba`
+    (ex: DummyClassifier(strategy='stratified')), a classe prevista vem das probabilidades.
+    """
+    y_score, y_pred = scores_e_previsoes(estimator, X)
+
+    return calcular_metricas_classificacao(np.asarray(y) == estimator.classes_[1], y_score, y_pred)
@@ -1,13 +1,52 @@
+import time
+import warnings
+from pathlib import Path
+
+import numpy as np
 import pandas as pd
 
-from sklearn.model_selection import cross_validate, GridSearchCV
-from sklearn.pipeline import Pipeline
+from joblib import Parallel, delayed, dump, hash as joblib_hash, load
+
+from .config import PASTA_CACHE, RANDOM_STATE
+from .metricas import pontuador_multimetrica
+
+
+METRICAS = [
+    "accuracy",
+    "balanced_accuracy",
+    "f1",
+    "precision",
+    "recall",
+    "roc_auc",
+    "average_precision",
+]
+
+
+def _scoring(pontuacao_vetorizada):
+    # pontuador_multimetrica calcula as mesmas METRICAS com uma única previsão por fold
+    return pontuador_multimetrica if pontuacao_vetorizada else METRICAS
+
+
+def construir_pipeline_modelo_classificacao(classificador, preprocessor=None, instrumentar=False, esparso=False):
+    """Pipeline com as etapas 'preprocessor' (se houver) e 'clf'.
+
+    Com `esparso=True`, o ColumnTransformer (de `construir_preprocessamento` ou
+    `construir_preprocessamento_arvore`) passa a devolver sempre uma matriz CSR, e o
+    classificador recebe os dados esparsos (LogisticRegression, árvores, XGBoost e LightGBM
+    aceitam CSR; SVC e KNeighborsClassifier também, mas sem ganho de tempo).
+    """
+    from sklearn.pipeline import Pipeline
 
+    if esparso and preprocessor is not None:
+        from sklearn.base import clone
+        from sklearn.compose import ColumnTransformer
 
-RANDOM_STATE = 42
+        from .preprocessamento import SPARSE_THRESHOLD_ESPARSO
 
+        if not isinstance(preprocessor, ColumnTransformer):
+            raise ValueError("esparso=True requer um ColumnTransformer como preprocessor.")
+        preprocessor = clone(preprocessor).set_params(sparse_threshold=SPARSE_THRESHOLD_ESPARSO)
 
-def construir_pipeline_modelo_classificacao(classificador, preprocessor=None):
     if preprocessor is not None:
         pipeline = Pipeline([("preprocessor", preprocessor), ("clf", classificador)])
     else:
@@ -15,6 +54,12 @@ def construir_pipeline_modelo_classificacao(classificador, preprocessor=None):
 
     model = pipeline
 
+    if instrumentar:
+        # mede tempo, pico de memória e tamanho da saída de cada etapa (ver src.instrumentacao)
+        from .instrumentacao import instrumentar as instrumentar_pipeline
+
+        model = instrumentar_pipeline(pipeline)
+
     return model
 
 
@@ -24,11 +69,43 @@ def treinar_e_validar_modelo_classificacao(
     cv,
     classificador,
     preprocessor=None,
+    pontuacao_vetorizada=True,
+    instrumentar=False,
+    nome_oof=None,
 ):
+    """Validação cruzada do pipeline (preprocessamento + classificador).
+
+    Parameters
+    ----------
+    X : pandas.DataFrame
+        Dataframe com as features.
+    y : pandas.Series
+        Target.
+    cv : int ou objeto de validação cruzada
+        Estratégia de folds (ex: StratifiedKFold).
+    classificador : estimador do sklearn
+        Classificador não ajustado.
+    preprocessor : estimador do sklearn, opcional
+        Preprocessamento aplicado antes do classificador, por padrão None
+    pontuacao_vetorizada : bool, opcional
+        Se True usa `pontuador_multimetrica` (uma previsão por fold), por padrão True
+    instrumentar : bool, opcional
+        Adiciona as medições de cada etapa do pipeline ('etapa:<nome>:<medida>'), por padrão False
+    nome_oof : str, opcional
+        Se informado, as previsões dos pipelines de cada fold no fold de teste são gravadas em
+        `PASTA_OOF / '<nome_oof>.parquet'` (ver `src.oof.carregar_oof`), por padrão None
+
+    Returns
+    -------
+    dict
+        Saída de `cross_validate` (um valor por fold).
+    """
+    from sklearn.model_selection import cross_validate
 
     model = construir_pipeline_modelo_classificacao(
         classificador,
         preprocessor,
+        instrumentar=instrumentar,
     )
 
     scores = cross_validate(
@@ -36,16 +113,25 @@ def treinar_e_validar_modelo_classificacao(
         X,
         y,
         cv=cv,
-        scoring=[
-            "accuracy",
-            "balanced_accuracy",
-            "f1",
-            "precision",
-            "recall",
-            "roc_auc",
-            "average_precision",
-        ],
+        scoring=_scoring(pontuacao_vetorizada),
+        return_estimator=instrumentar or nome_oof is not None,
+        return_indices=nome_oof is not None,
     )
+    estimadores = scores.pop("estimator", None)
+
+    if nome_oof is not None:
+        # previsões dos pipelines já ajustados em cada fold, sem novo ajuste
+        from .oof import previsoes_oof, salvar_oof
+
+        salvar_oof(previsoes_oof(estimadores, scores.pop("indices")["test"], X, y), nome_oof)
+
+    if instrumentar:
+        # uma coluna por etapa e medida ('etapa:<nome>:<medida>'), um valor por fold
+        from .instrumentacao import medicoes_pipeline
+
+        medicoes = [medicoes_pipeline(estimador) for estimador in estimadores]
+        for chave in medicoes[0]:
+            scores[chave] = np.array([medicao.get(chave, np.nan) for medicao in medicoes])
 
     return scores
 
@@ -57,22 +143,49 @@ def grid_search_cv_classificador(
     preprocessor=None,
     return_train_score=False,
     refit_metric="roc_auc",
+    preprocessamento_por_fold=False,
+    busca="grid",
+    fator_halving=3,
+    pontuacao_vetorizada=True,
 ):
+    from sklearn.model_selection import GridSearchCV
+
+    if busca == "halving":
+        return BuscaHalvingClassificador(
+            classificador,
+            param_grid,
+            cv,
+            preprocessor=preprocessor,
+            return_train_score=return_train_score,
+            refit_metric=refit_metric,
+            preprocessamento_por_fold=preprocessamento_por_fold,
+            fator=fator_halving,
+            pontuacao_vetorizada=pontuacao_vetorizada,
+        )
+
+    if busca != "grid":
+        raise ValueError(f"busca deve ser 'grid' ou 'halving', recebido '{busca}'.")
+
+    if preprocessamento_por_fold and preprocessor is not None:
+        return GridSearchPreprocessamentoPorFold(
+            classificador,
+            preprocessor,
+            param_grid=param_grid,
+            cv=cv,
+            scoring=_scoring(pontuacao_vetorizada),
+            refit=refit_metric,
+            n_jobs=-1,
+            return_train_score=return_train_score,
+            verbose=1,
+        )
+
     model = construir_pipeline_modelo_classificacao(classificador, preprocessor)
 
     grid_search = GridSearchCV(
         model,
         cv=cv,
         param_grid=param_grid,
-        scoring=[
-            "accuracy",
-            "balanced_accuracy",
-            "f1",
-            "precision",
-            "recall",
-            "roc_auc",
-            "average_precision",
-        ],
+        scoring=_scoring(pontuacao_vetorizada),
         refit=refit_metric,
         n_jobs=-1,
         return_train_score=return_train_score,
@@ -82,6 +195,557 @@ def grid_search_cv_classificador(
     return grid_search
 
 
+# Combinações solver x penalty aceitas pela LogisticRegression
+PENALIDADES_POR_SOLVER = {
+    "lbfgs": {"l2", None},
+    "liblinear": {"l1", "l2"},
+    "newton-cg": {"l2", None},
+    "newton-cholesky": {"l2", None},
+    "sag": {"l2", None},
+    "saga": {"l1", "l2", "elasticnet", None},
+}
+
+
+def combinacoes_validas(param_grid, classificador=None):
+    """Expande a grade de parâmetros removendo combinações inválidas ou redundantes da LogisticRegression.
+
+    Quando `classificador` é uma LogisticRegression, descarta pares solver/penalty que ela rejeita
+    (ex: 'lbfgs' com 'l1'), remove o `l1_ratio` dos candidatos cuja penalidade não é 'elasticnet'
+    e o `C` dos candidatos sem penalidade (penalty=None), já que nesses casos eles são ignorados e
+    só geram candidatos repetidos. Os valores que não estão na grade
+    vêm do próprio classificador (`get_params`). Para os demais classificadores (ex: SGDClassifier,
+    LinearSVC), a grade é apenas expandida, sem remover candidatos.
+
+    Parameters
+    ----------
+    param_grid : dict ou List[dict]
+        Grade no formato do GridSearchCV (ex: {'clf__penalty': [...], 'clf__solver': [...]}).
+    classificador : estimador do sklearn, opcional
+        Classificador da grade, por padrão None (nenhum candidato é filtrado)
+
+    Returns
+    -------
+    List[dict]
+        Lista de candidatos no formato do GridSearchCV ({parâmetro: [valor]}).
+    """
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.model_selection import ParameterGrid
+
+    filtrar = isinstance(classificador, LogisticRegression)
+    padrao = classificador.get_params() if filtrar else {}
+
+    candidatos = []
+    vistos = set()
+
+    for candidato in ParameterGrid(param_grid):
+        if filtrar:
+            nomes = {nome.rsplit("__", 1)[-1]: nome for nome in candidato}
+
+            penalty = candidato.get(nomes.get("penalty"), padrao["penalty"])
+            solver = candidato.get(nomes.get("solver"), padrao["solver"])
+
+            if solver in PENALIDADES_POR_SOLVER and penalty not in PENALIDADES_POR_SOLVER[solver]:
+                continue
+
+            ignorados = set()
+            if "l1_ratio" in nomes and penalty != "elasticnet":
+                ignorados.add(nomes["l1_ratio"])
+            if "C" in nomes and penalty is None:
+                ignorados.add(nomes["C"])
+            candidato = {nome: valor for nome, valor in candidato.items() if nome not in ignorados}
+
+        chave = repr(sorted(candidato.items(), key=lambda item: item[0]))
+        if chave in vistos:
+            continue
+        vistos.add(chave)
+
+        candidatos.append({nome: [valor] for nome, valor in candidato.items()})
+
+    return candidatos
+
+
+class BuscaHalvingClassificador:
+    """Busca de hiperparâmetros por successive halving com saída no formato do GridSearchCV.
+
+    1. A grade é filtrada com `combinacoes_validas` (para LogisticRegression), sem avaliar
+       combinações inválidas;
+    2. Um HalvingGridSearchCV avalia todos os candidatos em amostras pequenas dos dados e só os
+       melhores (pela `refit_metric`) seguem para rodadas com mais linhas;
+    3. Os finalistas são avaliados com todos os dados e todas as métricas (`METRICAS`) por
+       `grid_search_cv_classificador`, que gera `cv_results_`, `best_params_` e `best_estimator_`.
+
+    Os atributos da busca final ficam acessíveis diretamente neste objeto, e o histórico das rodadas
+    de eliminação fica em `halving_`.
+    """
+
+    def __init__(
+        self,
+        classificador,
+        param_grid,
+        cv,
+        preprocessor=None,
+        return_train_score=False,
+        refit_metric="roc_auc",
+        preprocessamento_por_fold=False,
+        fator=3,
+        recursos_minimos=None,
+        pontuacao_vetorizada=True,
+    ):
+        self.classificador = classificador
+        self.param_grid = param_grid
+        self.cv = cv
+        self.preprocessor = preprocessor
+        self.return_train_score = return_train_score
+        self.refit_metric = refit_metric
+        self.preprocessamento_por_fold = preprocessamento_por_fold
+        self.fator = fator
+        self.recursos_minimos = recursos_minimos
+        self.pontuacao_vetorizada = pontuacao_vetorizada
+
+    def fit(self, X, y):
+        from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+        from sklearn.model_selection import HalvingGridSearchCV, check_cv
+
+        candidatos = combinacoes_validas(self.param_grid, self.classificador)
+        cv = check_cv(self.cv, y, classifier=True)
+
+        recursos_minimos = self.recursos_minimos
+        if recursos_minimos is None:
+            # amostras muito pequenas deixam poucos positivos por fold e tornam a eliminação ruidosa
+            recursos_minimos = min(len(y), max(len(y) // self.fator**2, 50 * cv.get_n_splits()))
+
+        self.halving_ = HalvingGridSearchCV(
+            construir_pipeline_modelo_classificacao(self.classificador, self.preprocessor),
+            candidatos,
+            cv=cv,
+            scoring=self.refit_metric,
+            factor=self.fator,
+            min_resources=recursos_minimos,
+            aggressive_elimination=True,
+            refit=False,
+            n_jobs=-1,
+            random_state=RANDOM_STATE,
+        ).fit(X, y)
+
+        resultados = self.halving_.cv_results_
+        ultima_rodada = resultados["iter"] == resultados["iter"].max()
+        finalistas = [
+            {nome: [valor] for nome, valor in parametros.items()}
+            for parametros, final in zip(resultados["params"], ultima_rodada)
+            if final
+        ]
+
+        self.busca_final_ = grid_search_cv_classificador(
+            self.classificador,
+            finalistas,
+            cv,
+            preprocessor=self.preprocessor,
+            return_train_score=self.return_train_score,
+            refit_metric=self.refit_metric,
+            preprocessamento_por_fold=self.preprocessamento_por_fold,
+            pontuacao_vetorizada=self.pontuacao_vetorizada,
+        )
+        self.busca_final_.verbose = 0
+        self.busca_final_.fit(X, y)
+
+        return self
+
+    def __getattr__(self, nome):
+        busca_final = self.__dict__.get("busca_final_")
+        if busca_final is None or nome.startswith("__"):
+            raise AttributeError(nome)
+        return getattr(busca_final, nome)
+
+
+def _indexar(dados, indices):
+    return dados.iloc[indices] if hasattr(dados, "iloc") else dados[indices]
+
+
+def _transformar_fold(preprocessor, X, y, indices_treino, indices_teste):
+    from sklearn.base import clone
+
+    preprocessor = clone(preprocessor)
+    X_treino = preprocessor.fit_transform(_indexar(X, indices_treino), _indexar(y, indices_treino))
+    X_teste = preprocessor.transform(_indexar(X, indices_teste))
+
+    return X_treino, np.asarray(_indexar(y, indices_treino)), X_teste, np.asarray(_indexar(y, indices_teste))
+
+
+def _avaliar_candidato(classificador, parametros, matrizes_folds, scoring, return_train_score):
+    from sklearn.base import clone
+    from sklearn.metrics import check_scoring
+
+    resultados = []
+
+    for X_treino, y_treino, X_teste, y_teste in matrizes_folds:
+        modelo = clone(classificador).set_params(**parametros)
+        resultado = {"fit_error": None, "n_test_samples": len(y_teste)}
+
+        inicio = time.perf_counter()
+        try:
+            modelo.fit(X_treino, y_treino)
+        except Exception as erro:
+            resultado["fit_time"] = time.perf_counter() - inicio
+            resultado["score_time"] = 0.0
+            resultado["fit_error"] = f"{type(erro).__name__}: {erro}"
+            resultados.append(resultado)
+            continue
+        resultado["fit_time"] = time.perf_counter() - inicio
+
+        scorer = check_scoring(modelo, scoring=scoring)
+
+        inicio = time.perf_counter()
+        resultado["test_scores"] = scorer(modelo, X_teste, y_teste)
+        resultado["score_time"] = time.perf_counter() - inicio
+
+        if return_train_score:
+            resultado["train_scores"] = scorer(modelo, X_treino, y_treino)
+
+        resultados.append(resultado)
+
+    return resultados
+
+
+class GridSearchPreprocessamentoPorFold:
+    """Busca em grade que ajusta o preprocessor uma única vez por fold.
+
+    Equivalente a `GridSearchCV(Pipeline([("preprocessor", ...), ("clf", ...)]))`, mas as matrizes
+    transformadas de treino e teste de cada fold são calculadas uma vez e reutilizadas por todos os
+    candidatos da grade, que só variam os hiperparâmetros do classificador. As métricas em
+    `cv_results_` são as mesmas do GridSearchCV; apenas os tempos mudam.
+
+    Os parâmetros da grade seguem os nomes do pipeline (ex: 'clf__C'), e `best_estimator_` é o
+    pipeline completo reajustado com todos os dados.
+    """
+
+    def __init__(
+        self,
+        classificador,
+        preprocessor,
+        param_grid,
+        cv,
+        scoring=METRICAS,
+        refit="roc_auc",
+        n_jobs=-1,
+        return_train_score=False,
+        verbose=0,
+    ):
+        self.classificador = classificador
+        self.preprocessor = preprocessor
+        self.param_grid = param_grid
+        self.cv = cv
+        self.scoring = scoring
+        self.refit = refit
+        self.n_jobs = n_jobs
+        self.return_train_score = return_train_score
+        self.verbose = verbose
+
+    def _candidatos(self):
+        from sklearn.model_selection import ParameterGrid
+
+        candidatos = list(ParameterGrid(self.param_grid))
+
+        parametros_classificador = []
+        for candidato in candidatos:
+            parametros = {}
+            for nome, valor in candidato.items():
+                etapa, _, parametro = nome.partition("__")
+                if etapa != "clf" or not parametro:
+                    raise ValueError(
+                        f"'{nome}': com preprocessamento por fold a grade só pode variar parâmetros do "
+                        "classificador (prefixo 'clf__')."
+                    )
+                parametros[parametro] = valor
+            parametros_classificador.append(parametros)
+
+        return candidatos, parametros_classificador
+
+    def fit(self, X, y):
+        from sklearn.base import clone
+        from sklearn.model_selection import check_cv
+
+        cv = check_cv(self.cv, y, classifier=True)
+        folds = list(cv.split(X, y))
+        candidatos, parametros_classificador = self._candidatos()
+
+        self.n_splits_ = len(folds)
+
+        if self.verbose > 0:
+            print(
+                f"Fitting {self.n_splits_} folds for each of {len(candidatos)} candidates, "
+                f"totalling {self.n_splits_ * len(candidatos)} fits "
+                f"(preprocessor fitted {self.n_splits_} times)"
+            )
+
+        paralelo = Parallel(n_jobs=self.n_jobs)
+
+        matrizes_folds = paralelo(
+            delayed(_transformar_fold)(self.preprocessor, X, y, indices_treino, indices_teste)
+            for indices_treino, indices_teste in folds
+        )
+
+        saidas = paralelo(
+            delayed(_avaliar_candidato)(
+                self.classificador, parametros, matrizes_folds, self.scoring, self.return_train_score
+            )
+            for parametros in parametros_classificador
+        )
+
+        self.multimetric_ = not (self.scoring is None or isinstance(self.scoring, str))
+        self.cv_results_ = self._formatar_resultados(candidatos, saidas)
+
+        if self.refit:
+            metrica_refit = self.refit if self.multimetric_ else "score"
+            self.best_index_ = int(self.cv_results_[f"rank_test_{metrica_refit}"].argmin())
+            self.best_score_ = self.cv_results_[f"mean_test_{metrica_refit}"][self.best_index_]
+            self.best_params_ = candidatos[self.best_index_]
+
+            self.best_estimator_ = construir_pipeline_modelo_classificacao(
+                clone(self.classificador).set_params(**parametros_classificador[self.best_index_]),
+                clone(self.preprocessor),
+            )
+
+            inicio = time.perf_counter()
+            self.best_estimator_.fit(X, y)
+            self.refit_time_ = time.perf_counter() - inicio
+
+        return self
+
+    def _formatar_resultados(self, candidatos, saidas):
+        from scipy.stats import rankdata
+        from sklearn.exceptions import FitFailedWarning
+
+        n_candidatos, n_splits = len(candidatos), self.n_splits_
+        resultados = {}
+
+        falhas = [s["fit_error"] for saida in saidas for s in saida if s["fit_error"] is not None]
+        if falhas:
+            warnings.warn(
+                f"\n{len(falhas)} fits failed out of a total of {n_candidatos * n_splits}.\n"
+                f"The score on these train-test partitions for these parameters will be set to nan.\n"
+                f"Exemplo de erro: {falhas[0]}",
+                FitFailedWarning,
+            )
+
+        for chave in ("fit_time", "score_time"):
+            valores = np.array([[s[chave] for s in saida] for saida in saidas])
+            resultados[f"mean_{chave}"] = valores.mean(axis=1)
+            resultados[f"std_{chave}"] = valores.std(axis=1)
+
+        for nome in sorted({nome for candidato in candidatos for nome in candidato}):
+            mascara = [nome not in candidato for candidato in candidatos]
+            valores = [candidato.get(nome) for candidato in candidatos]
+            resultados[f"param_{nome}"] = np.ma.MaskedArray(np.array(valores, dtype=object), mask=mascara)
+
+        resultados["params"] = candidatos
+
+        if self.multimetric_:
+            sucessos = [s["test_scores"] for saida in saidas for s in saida if "test_scores" in s]
+            if sucessos:
+                metricas = list(sucessos[0])
+            elif callable(self.scoring):
+                metricas = METRICAS
+            else:
+                metricas = list(self.scoring)
+        else:
+            metricas = ["score"]
+
+        conjuntos = ["test", "train"] if self.return_train_score else ["test"]
+
+        for metrica in metricas:
+            for conjunto in conjuntos:
+                valores = np.array([
+                    [_valor_score(s.get(f"{conjunto}_scores"), metrica) for s in saida]
+                    for saida in saidas
+                ])
+
+                for i in range(n_splits):
+                    resultados[f"split{i}_{conjunto}_{metrica}"] = valores[:, i]
+
+                medias = valores.mean(axis=1)
+                resultados[f"mean_{conjunto}_{metrica}"] = medias
+                resultados[f"std_{conjunto}_{metrica}"] = valores.std(axis=1)
+
+                if conjunto == "test":
+                    if np.isnan(medias).all():
+                        ranks = np.ones_like(medias, dtype=np.int32)
+                    else:
+                        medias = np.nan_to_num(medias, nan=np.nanmin(medias) - 1)
+                        ranks = rankdata(-medias, method="min").astype(np.int32, copy=False)
+                    resultados[f"rank_test_{metrica}"] = ranks
+
+        return resultados
+
+    def predict(self, X):
+        return self.best_estimator_.predict(X)
+
+    def predict_proba(self, X):
+        return self.best_estimator_.predict_proba(X)
+
+    def decision_function(self, X):
+        return self.best_estimator_.decision_function(X)
+
+    def score(self, X, y):
+        from sklearn.metrics import check_scoring
+
+        scorer = check_scoring(self.best_estimator_, scoring=self.refit if self.multimetric_ else self.scoring)
+        return scorer(self.best_estimator_, X, y)
+
+
+def _valor_score(scores, metrica):
+    if scores is None:
+        return np.nan
+    if isinstance(scores, dict):
+        return scores[metrica]
+    return scores
+
+
+def _avaliar_fold(modelo, X, y, indices_treino, indices_teste, scoring, instrumentar=False, fold_oof=None):
+    from sklearn.base import clone
+    from sklearn.metrics import check_scoring
+
+    modelo = clone(modelo)
+
+    inicio = time.perf_counter()
+    modelo.fit(_indexar(X, indices_treino), _indexar(y, indices_treino))
+    fit_time = time.perf_counter() - inicio
+
+    scorer = check_scoring(modelo, scoring=scoring)
+
+    inicio = time.perf_counter()
+    scores = scorer(modelo, _indexar(X, indices_teste), _indexar(y, indices_teste))
+    score_time = time.perf_counter() - inicio
+
+    resultado = {"fit_time": fit_time, "score_time": score_time}
+    resultado.update({f"test_{metrica}": valor for metrica, valor in scores.items()})
+
+    if instrumentar:
+        from .instrumentacao import medicoes_pipeline
+
+        resultado.update(medicoes_pipeline(modelo))
+
+    if fold_oof is not None:
+        from .oof import previsoes_fold
+
+        resultado["oof"] = previsoes_fold(
+            modelo, _indexar(X, indices_teste), _indexar(y, indices_teste), indices_teste, fold_oof
+        )
+
+    return resultado
+
+
+def comparar_modelos_classificacao(
+    X,
+    y,
+    cv,
+    modelos,
+    n_jobs=-1,
+    pasta_cache=PASTA_CACHE,
+    pontuacao_vetorizada=True,
+    instrumentar=False,
+    salvar_oof=False,
+):
+    """Valida vários modelos em paralelo, com cache em disco por fold.
+
+    Cada par (modelo, fold) vira uma tarefa independente executada num pool de processos.
+    O resultado de cada fold é salvo em `pasta_cache` com uma chave formada pelos parâmetros
+    do pipeline, pelo hash dos dados e pelo índice do fold, de modo que uma nova execução só
+    recalcula os modelos (ou folds) que mudaram.
+
+    Parameters
+    ----------
+    X : pandas.DataFrame
+        Dataframe com as features.
+    y : pandas.Series
+        Target.
+    cv : int ou objeto de validação cruzada
+        Estratégia de folds (ex: StratifiedKFold).
+    modelos : dict
+        Dicionário {nome: classificador} ou {nome: (classificador, preprocessor)}.
+    n_jobs : int, opcional
+        Número de processos, por padrão -1 (todos os núcleos)
+    pasta_cache : str ou pathlib.Path, opcional
+        Pasta do cache por fold, por padrão `PASTA_CACHE`. Use None para desativar o cache.
+    pontuacao_vetorizada : bool, opcional
+        Se True usa `pontuador_multimetrica` (uma previsão por fold), por padrão True
+    instrumentar : bool, opcional
+        Adiciona o tempo de fit/transform/predict, o pico de memória e o tamanho da saída de cada
+        etapa dos pipelines (colunas 'etapa:<nome>:<medida>', ver `plot_tempos_etapas`), por padrão False
+    salvar_oof : bool, opcional
+        Grava as previsões de cada modelo nos folds de teste em `PASTA_OOF / '<nome>.parquet'`
+        (ver `src.oof.carregar_oof`), por padrão False
+
+    Returns
+    -------
+    pandas.DataFrame
+        Resultados expandidos (uma linha por modelo e fold), no formato de `organiza_resultados`.
+    """
+    from sklearn.model_selection import check_cv
+
+    cv = check_cv(cv, y, classifier=True)
+    folds = list(cv.split(X, y))
+    scoring = _scoring(pontuacao_vetorizada)
+
+    pipelines = {
+        nome: construir_pipeline_modelo_classificacao(
+            *(valor if isinstance(valor, tuple) else (valor,)), instrumentar=instrumentar
+        )
+        for nome, valor in modelos.items()
+    }
+
+    if pasta_cache is not None:
+        pasta_cache = Path(pasta_cache)
+        pasta_cache.mkdir(parents=True, exist_ok=True)
+        hash_dados = joblib_hash((X, y))
+
+    resultados_folds = {}
+    pendentes = []
+
+    for nome, pipeline in pipelines.items():
+        hash_modelo = joblib_hash((pipeline, scoring, "oof") if salvar_oof else (pipeline, scoring))
+
+        for i, (indices_treino, indices_teste) in enumerate(folds):
+            arquivo = None
+            if pasta_cache is not None:
+                chave = joblib_hash((hash_modelo, hash_dados, i, indices_teste))
+                arquivo = pasta_cache / f"fold_{chave}.joblib"
+
+                if arquivo.exists():
+                    resultados_folds[(nome, i)] = load(arquivo)
+                    continue
+
+            pendentes.append((nome, i, arquivo))
+
+    novos_resultados = Parallel(n_jobs=n_jobs)(
+        delayed(_avaliar_fold)(pipelines[nome], X, y, *folds[i], scoring, instrumentar, i if salvar_oof else None)
+        for nome, i, _ in pendentes
+    )
+
+    for (nome, i, arquivo), resultado in zip(pendentes, novos_resultados):
+        resultados_folds[(nome, i)] = resultado
+        if arquivo is not None:
+            dump(resultado, arquivo)
+
+    resultados = {}
+    for nome in pipelines:
+        por_fold = [dict(resultados_folds[(nome, i)]) for i in range(len(folds))]
+
+        if salvar_oof:
+            from .oof import juntar_folds, salvar_oof as salvar_previsoes_oof
+
+            salvar_previsoes_oof(juntar_folds([r.pop("oof") for r in por_fold], getattr(X, "index", None)), nome)
+
+        resultados[nome] = {chave: np.array([r.get(chave, np.nan) for r in por_fold]) for chave in por_fold[0]}
+
+    # com `instrumentar`, cada pipeline tem as colunas das suas etapas: as que faltam ficam NaN
+    chaves = list(dict.fromkeys(chave for resultado in resultados.values() for chave in resultado))
+    for resultado in resultados.values():
+        for chave in chaves:
+            resultado.setdefault(chave, np.full(len(folds), np.nan))
+
+    return organiza_resultados(resultados)
+
+
 def organiza_resultados(resultados):
 
     for chave, valor in resultados.items():
@@ -120,3 +784,493 @@ def dataframe_coeficientes(coefs, colunas):
         by="coeficiente"
     )
 
+
+
+# ------------------------------------------------------------------------------------------------
+# Permutation importance com o preprocessamento aplicado uma única vez
+# ------------------------------------------------------------------------------------------------
+
+def _colunas_transformador(colunas, nomes_entrada):
+    if isinstance(colunas, str):
+        return [colunas]
+    if isinstance(colunas, slice) or np.asarray(colunas).dtype.kind in "biu":
+        return list(np.asarray(nomes_entrada)[colunas])
+    return list(colunas)
+
+
+def _saidas_one_hot(encoder):
+    # número de colunas de saída de cada coluna de entrada do OneHotEncoder (None se não der para saber)
+    if encoder.min_frequency is not None or encoder.max_categories is not None:
+        return None
+
+    tamanhos = [len(categorias) for categorias in encoder.categories_]
+    if encoder.drop_idx_ is not None:
+        tamanhos = [t - (d is not None) for t, d in zip(tamanhos, encoder.drop_idx_)]
+
+    return tamanhos
+
+
+def _mapear_saidas(preprocessor):
+    """Mapeia cada coluna de entrada do ColumnTransformer para as colunas de saída que ela gera.
+
+    Returns
+    -------
+    Tuple[dict, dict]
+        coluna -> índices de saída (transformadores coluna a coluna, one-hot e passthrough) e
+        nome -> (transformador, colunas de entrada) dos que precisam ser reaplicados (demais tipos).
+    """
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import (
+        FunctionTransformer, MinMaxScaler, OneHotEncoder, PowerTransformer, StandardScaler,
+    )
+
+    coluna_a_coluna = (StandardScaler, MinMaxScaler, PowerTransformer)
+    indices = {}
+    reaplicar = {}
+
+    with warnings.catch_warnings():
+        # o formato das colunas do 'remainder' muda entre versões do sklearn (índices ou nomes)
+        warnings.simplefilter("ignore", FutureWarning)
+        transformadores = [(n, t, list(c) if not isinstance(c, (str, slice)) else c)
+                           for n, t, c in preprocessor.transformers_]
+
+    for nome, transformador, colunas in transformadores:
+        if isinstance(transformador, str) and transformador == "drop":
+            continue
+
+        colunas = _colunas_transformador(colunas, preprocessor.feature_names_in_)
+        bloco = preprocessor.output_indices_[nome]
+        saidas = np.arange(bloco.start, bloco.stop)
+
+        if isinstance(transformador, str) and transformador == "passthrough":
+            transformador = FunctionTransformer()
+
+        tamanhos = None
+        # transformadores que tratam cada coluna de forma independente (1 coluna de entrada -> 1 de saída)
+        if (
+            isinstance(transformador, coluna_a_coluna)
+            or (isinstance(transformador, FunctionTransformer) and transformador.func is None)
+            or (
+                # ex: PowerTransformer + StandardScaler de `preprocessamento_de_estatisticas`
+                isinstance(transformador, Pipeline)
+                and all(isinstance(etapa, coluna_a_coluna) for _, etapa in transformador.steps)
+            )
+        ):
+            tamanhos = [1] * len(colunas)
+        elif isinstance(transformador, OneHotEncoder):
+            tamanhos = _saidas_one_hot(transformador)
+
+        if tamanhos is not None and sum(tamanhos) == len(saidas):
+            for coluna, inicio, tamanho in zip(colunas, np.cumsum([0] + tamanhos[:-1]), tamanhos):
+                indices[coluna] = np.concatenate([indices.get(coluna, []), saidas[inicio:inicio + tamanho]]).astype(int)
+        else:
+            reaplicar[nome] = (transformador, colunas)
+
+    return indices, reaplicar
+
+
+def _entrada_modelo(modelo, Xt):
+    # modelos treinados com DataFrame (pipeline sem preprocessor) recebem os mesmos nomes de colunas
+    if hasattr(modelo, "feature_names_in_"):
+        return pd.DataFrame(Xt, columns=modelo.feature_names_in_)
+    return Xt
+
+
+def _pontuacoes_permutadas(
+    modelo, preprocessor, X, Xt, y, grupo, indices, reaplicar, random_seed, n_repeats, scorer
+):
+    from scipy import sparse
+    from sklearn.utils import check_random_state
+
+    random_state = check_random_state(random_seed)
+
+    saidas = np.unique(np.concatenate([indices[c] for c in grupo if c in indices] + [np.empty(0, dtype=int)]))
+    transformadores = {
+        nome: (transformador, colunas) for nome, (transformador, colunas) in reaplicar.items()
+        if set(grupo).intersection(colunas)
+    }
+
+    Xt_permutado = Xt.copy()
+    permutacao = np.arange(Xt.shape[0])
+    embaralhamento = np.arange(Xt.shape[0])
+
+    pontuacoes = []
+    for _ in range(n_repeats):
+        # mesma sequência de permutações (acumuladas) do sklearn.inspection.permutation_importance
+        random_state.shuffle(embaralhamento)
+        permutacao = permutacao[embaralhamento]
+
+        Xt_permutado[:, saidas] = Xt[permutacao[:, None], saidas]
+
+        for nome, (transformador, colunas) in transformadores.items():
+            entrada = X[colunas].copy()
+            for coluna in set(grupo).intersection(colunas):
+                entrada[coluna] = X[coluna].to_numpy()[permutacao]
+
+            saida = transformador.transform(entrada)
+            Xt_permutado[:, preprocessor.output_indices_[nome]] = saida.toarray() if sparse.issparse(saida) else saida
+
+        pontuacoes.append(scorer(modelo, _entrada_modelo(modelo, Xt_permutado), y))
+
+    return np.array(pontuacoes)
+
+
+def importancia_permutacao(
+    pipeline,
+    X,
+    y,
+    scoring=None,
+    n_repeats=5,
+    random_state=None,
+    grupos=None,
+    n_jobs=None,
+):
+    """Permutation importance de um pipeline (preprocessor + modelo) aplicando o preprocessamento uma vez.
+
+    Equivalente a `sklearn.inspection.permutation_importance(pipeline, X, y, ...)`, com as mesmas
+    permutações para o mesmo `random_state`, mas o ColumnTransformer transforma X uma única vez:
+    como os transformadores usados no projeto (scalers, PowerTransformer, OneHotEncoder e
+    passthrough) tratam cada linha e cada coluna separadamente, permutar uma coluna de entrada é o
+    mesmo que permutar as linhas do bloco de saída que ela gera (ex: todas as colunas one-hot de
+    'Education'). Transformadores de outros tipos são reaplicados apenas no seu próprio bloco.
+
+    Parameters
+    ----------
+    pipeline : sklearn.pipeline.Pipeline
+        Pipeline treinado com um ColumnTransformer (opcional) seguido do modelo.
+    X : pandas.DataFrame
+        Dados de entrada do pipeline.
+    y : array-like
+        Target.
+    scoring : str ou callable, opcional
+        Métrica (ex: 'recall'), por padrão None (score padrão do modelo)
+    n_repeats : int, opcional
+        Número de permutações de cada grupo, por padrão 5
+    random_state : int, opcional
+        Valor para fixar o estado aleatório para reprodutibilidade, por padrão None
+    grupos : dict, opcional
+        Nome do grupo -> lista de colunas de X permutadas juntas (a mesma permutação em todas as
+        colunas do grupo). Por padrão None (cada coluna de X é um grupo, como no sklearn).
+    n_jobs : int, opcional
+        Número de processos (um grupo por tarefa), por padrão None
+
+    Returns
+    -------
+    sklearn.utils.Bunch
+        importances_mean, importances_std, importances (grupos x repetições) e feature_names,
+        no mesmo formato do sklearn (usado no boxplot do notebook 03).
+    """
+    from scipy import sparse
+    from sklearn.compose import ColumnTransformer
+    from sklearn.metrics import check_scoring
+    from sklearn.utils import Bunch, check_random_state
+
+    if grupos is None:
+        grupos = {coluna: [coluna] for coluna in X.columns}
+
+    modelo = pipeline[-1]
+    preprocessor = pipeline[0] if len(pipeline) == 2 else None
+
+    if len(pipeline) > 2 or (preprocessor is not None and not isinstance(preprocessor, ColumnTransformer)):
+        raise ValueError("O pipeline deve ter apenas um ColumnTransformer seguido do modelo.")
+
+    if preprocessor is None:
+        Xt = X.to_numpy()
+        indices = {coluna: np.array([i]) for i, coluna in enumerate(X.columns)}
+        reaplicar = {}
+    else:
+        Xt = preprocessor.transform(X)
+        indices, reaplicar = _mapear_saidas(preprocessor)
+
+    if sparse.issparse(Xt):
+        Xt = Xt.toarray()
+    Xt = np.asarray(Xt)
+
+    random_seed = check_random_state(random_state).randint(np.iinfo(np.int32).max + 1)
+
+    scorer = check_scoring(modelo, scoring=scoring)
+    pontuacao_base = scorer(modelo, _entrada_modelo(modelo, Xt), y)
+
+    pontuacoes = Parallel(n_jobs=n_jobs)(
+        delayed(_pontuacoes_permutadas)(
+            modelo, preprocessor, X, Xt, y, grupo, indices, reaplicar, random_seed, n_repeats, scorer
+        )
+        for grupo in grupos.values()
+    )
+
+    importancias = pontuacao_base - np.array(pontuacoes)
+
+    return Bunch(
+        importances_mean=np.mean(importancias, axis=1),
+        importances_std=np.std(importancias, axis=1),
+        importances=importancias,
+        feature_names=np.array(list(grupos)),
+    )
+
+
+def dataframe_importancias(importancias):
+    """Dataframe com a importância média de cada grupo, no formato de `dataframe_coeficientes`
+    (pode ser usado em `plot_coeficientes`)."""
+    return pd.DataFrame(
+        data=importancias.importances_mean, index=importancias.feature_names, columns=["importancia"]
+    ).sort_values(by="importancia")
+
+
+# ------------------------------------------------------------------------------------------------
+# Treino incremental (out-of-core): dados lidos do disco em blocos
+# ------------------------------------------------------------------------------------------------
+
+TAMANHO_CHUNK_INCREMENTAL = 100_000
+N_FAIXAS_METRICAS = 10_000
+
+
+def _ler_chunks(fonte, tamanho_chunk, sep=",", colunas=None):
+    # fonte: CSV, Parquet ou uma função sem argumentos que devolve um iterável de DataFrames
+    if callable(fonte):
+        for chunk in fonte():
+            yield chunk if colunas is None else chunk[colunas]
+        return
+
+    if str(fonte).endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        for lote in pq.ParquetFile(fonte).iter_batches(batch_size=tamanho_chunk, columns=colunas):
+            yield lote.to_pandas()
+        return
+
+    yield from pd.read_csv(fonte, sep=sep, usecols=colunas, chunksize=tamanho_chunk)
+
+
+def _folds_chunk(y, n_folds, random_state, indice_chunk):
+    # fold de cada linha, estratificado dentro do bloco e igual em todas as leituras do arquivo
+    rng = np.random.default_rng([random_state, indice_chunk])
+    folds = np.empty(len(y), dtype=np.int16)
+
+    for classe in np.unique(y):
+        posicoes = rng.permutation(np.flatnonzero(y == classe))
+        folds[posicoes] = (np.arange(len(posicoes)) + rng.integers(n_folds)) % n_folds
+
+    return folds
+
+
+def _metricas_faixas(positivos, negativos, tp, fp, fn, tn):
+    from .metricas import metricas_confusao, metricas_curva
+
+    # contagens acumuladas da faixa de maior probabilidade para a de menor
+    tps = np.cumsum(positivos[::-1])
+    fps = np.cumsum(negativos[::-1])
+    presentes = np.r_[True, np.diff(tps + fps) > 0] & (tps + fps > 0)
+
+    metricas = metricas_confusao(tp, fp, fn, tn)
+    metricas["roc_auc"], metricas["average_precision"] = metricas_curva(tps[presentes], fps[presentes])
+
+    return metricas
+
+
+def treinar_modelo_incremental(
+    fonte,
+    coluna_target,
+    colunas_transformacao,
+    classificador=None,
+    n_folds=5,
+    n_epocas=5,
+    tamanho_chunk=TAMANHO_CHUNK_INCREMENTAL,
+    sep=",",
+    random_state=RANDOM_STATE,
+    refinar_lambda=True,
+    n_faixas=N_FAIXAS_METRICAS,
+):
+    """Treina e valida o modelo da campanha lendo os dados do disco em blocos.
+
+    Nenhuma etapa precisa dos dados inteiros em memória:
+
+    1. Uma leitura acumula, separadamente para cada fold, as estatísticas do preprocessamento
+       (`EstatisticasPreprocessamento`: categorias, média/variância, mínimo/máximo e a
+       verossimilhança do Yeo-Johnson em uma grade de lambdas) e a contagem das classes. Com
+       `refinar_lambda`, uma segunda leitura (só das colunas power) avalia uma grade fina em volta
+       do melhor lambda;
+    2. O preprocessamento de cada fold usa as estatísticas dos demais folds, e o do modelo final
+       usa as de todos (`preprocessamento_de_estatisticas`, o mesmo ColumnTransformer de
+       `construir_preprocessamento`);
+    3. Em cada época, cada bloco (em ordem aleatória dentro do bloco) atualiza com `partial_fit`
+       o classificador de cada fold (linhas fora do fold) e o final (todas as linhas). O peso de
+       cada classe é n / (2 * n_classe), calculado com as contagens de treino do modelo, como
+       `class_weight='balanced'`;
+    4. Uma última leitura escora as linhas de cada fold com o classificador que não as viu e
+       acumula a matriz de confusão e histogramas das probabilidades (`n_faixas` faixas), de onde
+       saem as sete métricas de `METRICAS` (ROC-AUC e average precision aproximadas pelas faixas).
+
+    Os folds são estratificados dentro de cada bloco e não dependem da ordem de leitura. O
+    resultado é um Pipeline comum (`preprocessor` + `clf`): os coeficientes vão direto para
+    `dataframe_coeficientes(pipeline['clf'].coef_[0], pipeline['preprocessor'].get_feature_names_out())`.
+
+    Parameters
+    ----------
+    fonte : str, pathlib.Path ou Callable
+        Arquivo CSV ou Parquet, ou função sem argumentos que devolve um iterável de DataFrames
+        (chamada uma vez por leitura, sempre com os blocos na mesma ordem).
+    coluna_target : str
+        Coluna com o target binário (ex: 'Response').
+    colunas_transformacao : dict
+        Saída de `colunas_por_transformacao` (apenas essas colunas são lidas).
+    classificador : estimador do sklearn com `partial_fit`, opcional
+        Classificador linear com `predict_proba`, usado como está, por padrão None:
+        SGDClassifier(loss='log_loss') com a regularização de LogisticRegression(C=1)
+        (alpha = 1 / n_treino de cada modelo), passo constante (eta0=0.05) e average=True
+    n_folds : int, opcional
+        Folds da validação; 0 ou None treina apenas o modelo final, por padrão 5
+    n_epocas : int, opcional
+        Leituras completas do arquivo no treino, por padrão 5
+    tamanho_chunk : int, opcional
+        Linhas por bloco, por padrão 100_000
+    sep : str, opcional
+        Separador do CSV, por padrão ","
+    random_state : int, opcional
+        Semente dos folds, da ordem das linhas e do classificador, por padrão 42
+    refinar_lambda : bool, opcional
+        Faz a segunda leitura com a grade fina de lambdas, por padrão True
+    n_faixas : int, opcional
+        Faixas de probabilidade usadas no ROC-AUC e no average precision, por padrão 10_000
+
+    Returns
+    -------
+    Tuple[sklearn.pipeline.Pipeline, dict]
+        Pipeline final ajustado e os resultados por fold no formato de `cross_validate`
+        ('fit_time', 'score_time' e 'test_<métrica>'), que podem ir para `organiza_resultados`.
+    """
+    from sklearn.base import clone
+    from sklearn.linear_model import SGDClassifier
+
+    from .preprocessamento import EstatisticasPreprocessamento, preprocessamento_de_estatisticas
+
+    regularizar = classificador is None
+    if regularizar:
+        classificador = SGDClassifier(
+            loss="log_loss", learning_rate="constant", eta0=0.05, average=True, random_state=random_state
+        )
+
+    validar = bool(n_folds)
+    n_partes = n_folds if validar else 1
+    colunas = [coluna for bloco in colunas_transformacao.values() for coluna in bloco]
+    leitura = dict(tamanho_chunk=tamanho_chunk, sep=sep, colunas=colunas + [coluna_target])
+
+    def blocos(colunas_lidas=None):
+        parametros = dict(leitura, colunas=colunas_lidas or leitura["colunas"])
+        for indice, chunk in enumerate(_ler_chunks(fonte, **parametros)):
+            y = chunk[coluna_target].to_numpy()
+            folds = _folds_chunk(y, n_folds, random_state, indice) if validar else np.zeros(len(y), dtype=np.int16)
+            yield indice, chunk.drop(columns=[coluna_target]), y, folds
+
+    # 1. estatísticas por fold
+    partes = [EstatisticasPreprocessamento(colunas_transformacao) for _ in range(n_partes)]
+    contagens = [{} for _ in range(n_partes)]
+    amostra = None
+
+    for _, X, y, folds in blocos():
+        if amostra is None:
+            amostra = X.head(1000)
+        for parte in range(n_partes):
+            linhas = folds == parte
+            partes[parte].atualizar(X[linhas])
+            for classe, n in zip(*np.unique(y[linhas], return_counts=True)):
+                contagens[parte][classe] = contagens[parte].get(classe, 0) + n
+
+    classes = np.array(sorted(set().union(*contagens)))
+    if len(classes) != 2:
+        raise ValueError(f"O target deve ter duas classes, encontradas: {classes.tolist()}")
+
+    # modelos 0..n_folds-1: um por fold (treinados sem o fold); o último é o final (todos os dados)
+    grupos = [[p for p in range(n_partes) if p != fold] for fold in range(n_folds if validar else 0)]
+    grupos.append(list(range(n_partes)))
+
+    def juntar(lista, grupo):
+        estatisticas = EstatisticasPreprocessamento(lista[0].colunas_transformacao, lista[0].grades_lambda)
+        for parte in grupo:
+            estatisticas.juntar(lista[parte])
+        return estatisticas
+
+    estatisticas = [juntar(partes, grupo) for grupo in grupos]
+
+    # 2. grade fina de lambdas (a mesma grade, união das de todos os modelos, em todas as partes)
+    estatisticas_potencias = [None] * len(grupos)
+    if refinar_lambda and colunas_transformacao["power"]:
+        grades = {
+            coluna: np.unique(np.concatenate([e.grades_refinadas()[coluna] for e in estatisticas]))
+            for coluna in colunas_transformacao["power"]
+        }
+        colunas_power = {"one-hot": [], "standard": [], "minmax": [], "power": colunas_transformacao["power"]}
+        partes_refinadas = [EstatisticasPreprocessamento(colunas_power, grades) for _ in range(n_partes)]
+
+        for _, X, _, folds in blocos(colunas_transformacao["power"] + [coluna_target]):
+            for parte in range(n_partes):
+                partes_refinadas[parte].atualizar(X[folds == parte])
+
+        estatisticas_potencias = [juntar(partes_refinadas, grupo) for grupo in grupos]
+
+    preprocessadores = [
+        preprocessamento_de_estatisticas(colunas_transformacao, e, amostra, ep)
+        for e, ep in zip(estatisticas, estatisticas_potencias)
+    ]
+
+    # pesos equivalentes a class_weight='balanced' com as contagens de treino de cada modelo
+    classificadores = []
+    for grupo in grupos:
+        n_classe = {classe: sum(contagens[parte].get(classe, 0) for parte in grupo) for classe in classes}
+        total = sum(n_classe.values())
+        pesos = {classe: total / (len(classes) * n) for classe, n in n_classe.items() if n}
+        modelo = clone(classificador).set_params(class_weight=pesos)
+        if regularizar:
+            # objetivo do SGD = perda média + alpha * ||w||² / 2, o da LogisticRegression(C=1) dividido por n
+            modelo.set_params(alpha=1 / total)
+        classificadores.append(modelo)
+
+    # 3. épocas de partial_fit
+    fit_time = np.zeros(len(grupos))
+    for epoca in range(n_epocas):
+        for indice, X, y, folds in blocos():
+            ordem = np.random.default_rng([random_state, epoca, indice]).permutation(len(y))
+            for modelo, (preprocessor, clf) in enumerate(zip(preprocessadores, classificadores)):
+                inicio = time.perf_counter()
+                linhas = ordem if modelo == n_partes or not validar else ordem[folds[ordem] != modelo]
+                if len(linhas):
+                    clf.partial_fit(preprocessor.transform(X.iloc[linhas]), y[linhas], classes=classes)
+                fit_time[modelo] += time.perf_counter() - inicio
+
+    pipeline = construir_pipeline_modelo_classificacao(classificadores[-1], preprocessadores[-1])
+    if not validar:
+        return pipeline, {"fit_time": fit_time[-1:]}
+
+    # 4. validação: cada fold escorado pelo modelo que não o viu
+    pipelines_folds = [
+        construir_pipeline_modelo_classificacao(clf, preprocessor)
+        for preprocessor, clf in zip(preprocessadores[:-1], classificadores[:-1])
+    ]
+    positivos = np.zeros((n_folds, n_faixas))
+    negativos = np.zeros((n_folds, n_faixas))
+    confusao = np.zeros((n_folds, 4), dtype=np.int64)
+    score_time = np.zeros(n_folds)
+
+    for _, X, y, folds in blocos():
+        for fold, modelo in enumerate(pipelines_folds):
+            inicio = time.perf_counter()
+            linhas = folds == fold
+            if linhas.any():
+                verdadeiro = y[linhas] == classes[1]
+                probabilidade = modelo.predict_proba(X[linhas])[:, 1]
+                previsto = probabilidade > 0.5
+
+                faixas = np.minimum((probabilidade * n_faixas).astype(np.int64), n_faixas - 1)
+                positivos[fold] += np.bincount(faixas[verdadeiro], minlength=n_faixas)
+                negativos[fold] += np.bincount(faixas[~verdadeiro], minlength=n_faixas)
+                confusao[fold] += np.bincount(2 * verdadeiro + previsto, minlength=4)
+            score_time[fold] += time.perf_counter() - inicio
+
+    por_fold = [
+        _metricas_faixas(positivos[fold], negativos[fold], tp=c[3], fp=c[1], fn=c[2], tn=c[0])
+        for fold, c in enumerate(confusao)
+    ]
+
+    scores = {"fit_time": fit_time[:-1], "score_time": score_time}
+    scores.update({f"test_{metrica}": np.array([m[metrica] for m in por_fold]) for metrica in METRICAS})
+
+    return pipeline, scores
@@ -0,0 +1,174 @@
+"""Previsões out-of-fold (OOF) guardadas junto dos modelos.
+
+A validação cruzada (`treinar_e_validar_modelo_classificacao` com `nome_oof`, ou
+`comparar_modelos_classificacao` com `salvar_oof=True`) já ajusta um pipeline por fold; as
+previsões desses pipelines no fold de teste são gravadas em `PASTA_OOF`. As curvas PR e ROC, a
+matriz de confusão e a análise de ROI leem esse arquivo, sem ajustar o modelo de novo.
+"""
+import numpy as np
+import pandas as pd
+
+from .config import MODELO_CAMPANHA, PASTA_OOF
+from .dados import COMPRESSAO
+from .metricas import scores_e_previsoes
+
+
+def previsoes_fold(estimador, X_teste, y_teste, indices_teste, fold):
+    """Previsões de um pipeline ajustado no fold de teste.
+
+    Parameters
+    ----------
+    estimador : estimador do sklearn
+        Pipeline ajustado no fold de treino.
+    X_teste, y_teste : pandas.DataFrame, pandas.Series
+        Dados do fold de teste.
+    indices_teste : np.ndarray
+        Posições das linhas de teste em X.
+    fold : int
+        Número do fold.
+
+    Returns
+    -------
+    pd.DataFrame
+        Colunas 'posicao', 'fold', 'y_true', 'y_score' (decision_function ou probabilidade, como nas
+        métricas), 'y_proba' (probabilidade da classe positiva, se o modelo tiver predict_proba)
+        e 'y_pred'.
+    """
+    y_score, y_pred = scores_e_previsoes(estimador, X_teste)
+
+    if not hasattr(estimador, "decision_function"):
+        # sem decision_function o score já é a probabilidade
+        y_proba = y_score
+    elif hasattr(estimador, "predict_proba"):
+        y_proba = estimador.predict_proba(X_teste)[:, 1]
+    else:
+        y_proba = np.full(len(y_score), np.nan)
+
+    return pd.DataFrame({
+        "posicao": indices_teste,
+        "fold": np.full(len(indices_teste), fold, dtype=np.int16),
+        "y_true": (np.asarray(y_teste) == estimador.classes_[1]).astype(np.int8),
+        "y_score": y_score,
+        "y_proba": y_proba,
+        "y_pred": y_pred.astype(np.int8),
+    })
+
+
+def previsoes_oof(estimadores, indices_teste, X, y):
+    """Junta as previsões de todos os folds, na ordem das linhas de X.
+
+    Parameters
+    ----------
+    estimadores : List
+        Pipelines ajustados de cada fold (ex: `cross_validate(..., return_estimator=True)`).
+    indices_teste : List[np.ndarray]
+        Posições de teste de cada fold (ex: `cross_validate(..., return_indices=True)`).
+    X : pandas.DataFrame
+        Features.
+    y : pandas.Series
+        Target.
+
+    Returns
+    -------
+    pd.DataFrame
+        Uma linha por cliente (ver `previsoes_fold`), com o índice de X.
+    """
+    partes = [
+        previsoes_fold(estimador, X.iloc[indices], y.iloc[indices], indices, fold)
+        for fold, (estimador, indices) in enumerate(zip(estimadores, indices_teste))
+    ]
+
+    return juntar_folds(partes, X.index)
+
+
+def juntar_folds(partes, indice=None):
+    """Concatena previsões de folds (ver `previsoes_fold`) e ordena pelas posições das linhas.
+
+    Com `indice` (ex: `X.index`), as linhas recebem o índice original dos clientes.
+    """
+    oof = pd.concat(partes, ignore_index=True).sort_values("posicao", kind="stable")
+    oof.index = oof["posicao"].to_numpy() if indice is None else indice[oof["posicao"].to_numpy()]
+
+    return oof
+
+
+def caminho_oof(nome, pasta=PASTA_OOF):
+    """Caminho do arquivo Parquet com as previsões OOF de um modelo."""
+    return pasta / f"{nome}.parquet"
+
+
+def salvar_oof(oof, nome, pasta=PASTA_OOF):
+    """Grava as previsões OOF em `pasta / '<nome>.parquet'` (o índice dos clientes é mantido).
+
+    Returns
+    -------
+    pathlib.Path
+        Caminho do arquivo salvo.
+    """
+    caminho = caminho_oof(nome, pasta)
+    caminho.parent.mkdir(parents=True, exist_ok=True)
+    oof.to_parquet(caminho, engine="pyarrow", compression=COMPRESSAO)
+
+    return caminho
+
+
+def carregar_oof(nome=MODELO_CAMPANHA.stem, pasta=PASTA_OOF):
+    """Carrega as previsões OOF salvas por `salvar_oof`.
+
+    Parameters
+    ----------
+    nome : str, opcional
+        Nome do arquivo sem extensão, por padrão o do modelo da campanha
+        ('logistic_regression_marketing_campaign')
+    pasta : pathlib.Path, opcional
+        Pasta das previsões, por padrão `PASTA_OOF`
+
+    Returns
+    -------
+    pd.DataFrame
+    """
+    return pd.read_parquet(caminho_oof(nome, pasta), engine="pyarrow")
+
+
+def matriz_confusao_oof(oof):
+    """Matriz de confusão das previsões OOF ([[TN, FP], [FN, TP]], como `confusion_matrix`)."""
+    contagens = np.bincount(2 * oof["y_true"].to_numpy() + oof["y_pred"].to_numpy(), minlength=4)
+    return contagens.reshape(2, 2)
+
+
+def resumo_roi_oof(oof, custo_por_cliente, receita_por_cliente):
+    """Custo, receita, lucro e ROI de contatar os clientes que o modelo prevê como positivos.
+
+    Mesma conta do notebook 03 (custo por contato x (TP + FP) e receita por resposta x TP), feita
+    com as previsões OOF em vez das previsões do modelo final nos próprios dados de treino. Para
+    todos os limiares de score, use `lucro.curva_lucro(oof['y_score'], oof['y_true'], ...)`.
+
+    Parameters
+    ----------
+    oof : pd.DataFrame
+        Saída de `carregar_oof`.
+    custo_por_cliente : float
+        Custo de cada contato.
+    receita_por_cliente : float
+        Receita de cada cliente que responde.
+
+    Returns
+    -------
+    pd.Series
+        'TP', 'FP', 'FN', 'TN', 'custo', 'receita', 'lucro' e 'roi'.
+    """
+    (tn, fp), (fn, tp) = matriz_confusao_oof(oof)
+
+    custo = custo_por_cliente * (tp + fp)
+    receita = receita_por_cliente * tp
+
+    return pd.Series({
+        "TP": tp,
+        "FP": fp,
+        "FN": fn,
+        "TN": tn,
+        "custo": custo,
+        "receita": receita,
+        "lucro": receita - custo,
+        "roi": (receita - custo) / custo if custo else np.nan,
+    })
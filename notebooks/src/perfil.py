@@ -0,0 +1,627 @@
+"""Perfil dos dados em uma única leitura, em blocos (substitui o ydata-profiling do notebook 01).
+
+Cada bloco do arquivo gera um `PerfilDados` com resumos combináveis de cada coluna: contagens e
+nulos, momentos (média, variância, assimetria e curtose), `SketchQuantis` (quantis e histograma),
+categorias mais frequentes e a correlação de Pearson com 'Response'. Os perfis dos blocos podem
+ser calculados em paralelo e combinados com `juntar`; `relatorio_html` gera um relatório leve
+(HTML com tabelas e histogramas em SVG, sem JavaScript).
+
+Uso (a partir da pasta `notebooks`):
+
+    python -m src.perfil                                       # ml_project1_data.csv
+    python -m src.perfil --arquivo extrato.csv --sep , --n-jobs 4
+"""
+import argparse
+import html
+import time
+
+import numpy as np
+import pandas as pd
+
+from .config import PASTA_DADOS, PASTA_RELATORIOS, RANDOM_STATE
+from .dados import ETAPAS_CSV
+from .quantis import K_PADRAO, SketchQuantis
+
+
+ARQUIVO_ORIGINAL = PASTA_DADOS / ETAPAS_CSV["original"]["arquivo"]
+RELATORIO_PERFIL = PASTA_RELATORIOS / "EDA_Case_iFood_perfil.html"
+COLUNA_ALVO = "Response"
+TAMANHO_CHUNK = 100_000
+
+# Valores distintos guardados por coluna; acima disso ficam os mais frequentes, e as contagens
+# passam a ter um erro máximo conhecido (ver `PerfilDados.top_categorias`)
+LIMITE_CATEGORIAS = 1_000
+N_TOP = 10
+N_FAIXAS_HISTOGRAMA = 40
+
+
+def _momentos_chunk(X):
+    # n, média e somas dos desvios^2, ^3 e ^4 de cada coluna, ignorando NaN
+    validos = ~np.isnan(X)
+    n = validos.sum(axis=0).astype(float)
+    soma = np.where(validos, X, 0).sum(axis=0)
+    media = np.divide(soma, n, out=np.zeros_like(soma), where=n > 0)
+
+    desvios = np.where(validos, X - media, 0)
+    quadrados = desvios * desvios
+
+    return (
+        n,
+        media,
+        np.einsum("ij->j", quadrados),
+        np.einsum("ij,ij->j", quadrados, desvios),
+        np.einsum("ij,ij->j", quadrados, quadrados),
+    )
+
+
+def _juntar_momentos(a, b):
+    # combinação de momentos centrais de duas partes (Pébay, 2008)
+    n_a, media_a, m2_a, m3_a, m4_a = a
+    n_b, media_b, m2_b, m3_b, m4_b = b
+
+    n = n_a + n_b
+    delta = media_b - media_a
+    delta_n = np.divide(delta, n, out=np.zeros_like(delta), where=n > 0)
+
+    media = media_a + n_b * delta_n
+    m2 = m2_a + m2_b + delta * delta_n * n_a * n_b
+    m3 = (
+        m3_a + m3_b
+        + delta * delta_n**2 * n_a * n_b * (n_a - n_b)
+        + 3 * delta_n * (n_a * m2_b - n_b * m2_a)
+    )
+    m4 = (
+        m4_a + m4_b
+        + delta * delta_n**3 * n_a * n_b * (n_a**2 - n_a * n_b + n_b**2)
+        + 6 * delta_n**2 * (n_a**2 * m2_b + n_b**2 * m2_a)
+        + 4 * delta_n * (n_a * m3_b - n_b * m3_a)
+    )
+
+    return n, media, m2, m3, m4
+
+
+def _comomentos_chunk(X, y):
+    # por coluna, nas linhas em que a coluna e o alvo existem: n, médias e somas de produtos
+    # (produtos de matrizes em vez de uma matriz mascarada do alvo por coluna)
+    com_alvo = ~np.isnan(y)
+    if not com_alvo.all():
+        X, y = X[com_alvo], y[com_alvo]
+
+    validos = ~np.isnan(X)
+    pesos = validos.astype(float)
+    n = pesos.sum(axis=0)
+    media_x = np.divide(np.where(validos, X, 0).sum(axis=0), n, out=np.zeros(X.shape[1]), where=n > 0)
+    desvios = np.where(validos, X - media_x, 0)
+
+    # alvo centrado na média do bloco para reduzir o erro de arredondamento de syy
+    centro = y.mean() if len(y) else 0.0
+    y = y - centro
+    media_y = np.divide(pesos.T @ y, n, out=np.zeros(X.shape[1]), where=n > 0)
+    syy = np.maximum(pesos.T @ (y * y) - n * media_y**2, 0)
+
+    return (
+        n,
+        media_x,
+        media_y + centro,
+        np.einsum("ij,ij->j", desvios, desvios),
+        syy,
+        desvios.T @ y,
+    )
+
+
+def _juntar_comomentos(a, b):
+    n_a, mx_a, my_a, sxx_a, syy_a, sxy_a = a
+    n_b, mx_b, my_b, sxx_b, syy_b, sxy_b = b
+
+    n = n_a + n_b
+    peso = np.divide(n_a * n_b, n, out=np.zeros_like(n), where=n > 0)
+    dx = mx_b - mx_a
+    dy = my_b - my_a
+    fracao_b = np.divide(n_b, n, out=np.zeros_like(n), where=n > 0)
+
+    return (
+        n,
+        mx_a + dx * fracao_b,
+        my_a + dy * fracao_b,
+        sxx_a + sxx_b + dx * dx * peso,
+        syy_a + syy_b + dy * dy * peso,
+        sxy_a + sxy_b + dx * dy * peso,
+    )
+
+
+def _juntar_contagens(a, b, limite):
+    # retorna as contagens somadas (no máximo `limite` valores) e a maior contagem descartada
+    contagens = a.add(b, fill_value=0) if len(a) else b
+    if len(contagens) <= limite:
+        return contagens, 0
+
+    contagens = contagens.sort_values(ascending=False, kind="stable")
+    return contagens.iloc[:limite], contagens.iloc[limite]
+
+
+def tipos_colunas(dataframe):
+    """Separa as colunas em numéricas (inclusive booleanas) e categóricas (as demais).
+
+    Returns
+    -------
+    Tuple[List[str], List[str]]
+    """
+    numericas = [
+        coluna for coluna in dataframe.columns if pd.api.types.is_numeric_dtype(dataframe[coluna].dtype)
+    ]
+    return numericas, [coluna for coluna in dataframe.columns if coluna not in numericas]
+
+
+class PerfilDados:
+    """Resumos combináveis de cada coluna de um conjunto de dados lido em blocos.
+
+    `atualizar` acrescenta um bloco e `juntar` combina o perfil de outra parte dos dados. O
+    resultado não depende da divisão em blocos, exceto nos quantis (`SketchQuantis`, com erro de
+    rank da ordem de 1/k) e nas contagens das colunas com mais de `limite_categorias` valores
+    distintos.
+
+    Parameters
+    ----------
+    colunas_numericas : List[str]
+        Colunas com momentos, quantis, histograma e correlação com o alvo (valores que não são
+        números nos blocos seguintes contam como nulos).
+    colunas_categoricas : List[str]
+        Colunas com apenas contagens.
+    coluna_alvo : str, opcional
+        Coluna numérica usada nas correlações de Pearson, por padrão 'Response' (None desliga)
+    k : int, opcional
+        Parâmetro dos sketches de quantis, por padrão 2000
+    limite_categorias : int, opcional
+        Valores distintos guardados por coluna, por padrão 1_000
+    random_state : int ou List[int], opcional
+        Semente dos sketches, por padrão None
+    """
+
+    def __init__(
+        self,
+        colunas_numericas,
+        colunas_categoricas,
+        coluna_alvo=COLUNA_ALVO,
+        k=K_PADRAO,
+        limite_categorias=LIMITE_CATEGORIAS,
+        random_state=None,
+    ):
+        self.colunas_numericas = list(colunas_numericas)
+        self.colunas_categoricas = list(colunas_categoricas)
+        self.coluna_alvo = coluna_alvo if coluna_alvo in self.colunas_numericas else None
+        self.k = k
+        self.limite_categorias = limite_categorias
+
+        n_numericas = len(self.colunas_numericas)
+        self.n_linhas = 0
+        self.nulos = pd.Series(0, index=self.colunas, dtype=np.int64)
+        self.zeros = np.zeros(n_numericas, dtype=np.int64)
+        self.minimos = np.full(n_numericas, np.inf)
+        self.maximos = np.full(n_numericas, -np.inf)
+        self.momentos = tuple(np.zeros(n_numericas) for _ in range(5))
+        self.comomentos = tuple(np.zeros(n_numericas) for _ in range(6))
+        self.sketches = {
+            coluna: SketchQuantis(k, random_state=random_state) for coluna in self.colunas_numericas
+        }
+        self.contagens = {coluna: pd.Series(dtype=np.int64) for coluna in self.colunas}
+        self.erro_contagens = {coluna: 0 for coluna in self.colunas}
+
+    @property
+    def colunas(self):
+        return self.colunas_numericas + self.colunas_categoricas
+
+    def _nova_parte(self):
+        return PerfilDados(
+            self.colunas_numericas, self.colunas_categoricas, self.coluna_alvo, self.k, self.limite_categorias
+        )
+
+    def atualizar(self, chunk):
+        """Acrescenta um bloco (pandas.DataFrame com as colunas do perfil)."""
+        X = np.column_stack([
+            pd.to_numeric(chunk[coluna], errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+            for coluna in self.colunas_numericas
+        ]) if self.colunas_numericas else np.empty((len(chunk), 0))
+
+        parte = self._nova_parte()
+        parte.n_linhas = len(chunk)
+        parte.nulos[self.colunas_numericas] = np.isnan(X).sum(axis=0)
+        parte.nulos[self.colunas_categoricas] = chunk[self.colunas_categoricas].isna().sum().to_numpy()
+        parte.zeros = (X == 0).sum(axis=0)
+        if len(chunk):
+            parte.minimos = np.fmin.reduce(X, axis=0, initial=np.inf)
+            parte.maximos = np.fmax.reduce(X, axis=0, initial=-np.inf)
+        parte.momentos = _momentos_chunk(X)
+
+        if self.coluna_alvo is not None:
+            parte.comomentos = _comomentos_chunk(X, X[:, self.colunas_numericas.index(self.coluna_alvo)])
+
+        for i, coluna in enumerate(self.colunas_numericas):
+            self.sketches[coluna].atualizar(X[:, i])
+        for coluna in self.colunas:
+            parte.contagens[coluna] = chunk[coluna].value_counts(dropna=True, sort=False)
+
+        # sketches já atualizados acima: o perfil da parte não tem sketches próprios
+        parte.sketches = {}
+        return self.juntar(parte)
+
+    def juntar(self, outro):
+        """Combina o perfil de outra parte dos dados (com as mesmas colunas) neste."""
+        self.n_linhas += outro.n_linhas
+        self.nulos += outro.nulos
+        self.zeros += outro.zeros
+        self.minimos = np.fmin(self.minimos, outro.minimos)
+        self.maximos = np.fmax(self.maximos, outro.maximos)
+        self.momentos = _juntar_momentos(self.momentos, outro.momentos)
+        self.comomentos = _juntar_comomentos(self.comomentos, outro.comomentos)
+
+        for coluna, sketch in outro.sketches.items():
+            self.sketches[coluna].juntar(sketch)
+
+        for coluna in self.colunas:
+            self.contagens[coluna], descartada = _juntar_contagens(
+                self.contagens[coluna], outro.contagens[coluna], self.limite_categorias
+            )
+            self.erro_contagens[coluna] += outro.erro_contagens[coluna] + descartada
+
+        return self
+
+    def correlacoes_alvo(self):
+        """Correlação de Pearson de cada coluna numérica com o alvo (linhas sem nulos nas duas).
+
+        Returns
+        -------
+        pd.Series
+            Ordenada pelo valor absoluto, sem o próprio alvo; vazia sem `coluna_alvo`.
+        """
+        if self.coluna_alvo is None:
+            return pd.Series(dtype=float)
+
+        _, _, _, sxx, syy, sxy = self.comomentos
+        with np.errstate(divide="ignore", invalid="ignore"):
+            correlacoes = pd.Series(sxy / np.sqrt(sxx * syy), index=self.colunas_numericas)
+
+        correlacoes = correlacoes.drop(self.coluna_alvo)
+        return correlacoes.iloc[np.argsort(-correlacoes.abs().fillna(-1).to_numpy(), kind="stable")]
+
+    def top_categorias(self, coluna, n=N_TOP):
+        """Valores mais frequentes de uma coluna.
+
+        Returns
+        -------
+        pd.DataFrame
+            'contagem' e 'percentual' (sobre as linhas não nulas). Se a coluna passou de
+            `limite_categorias` valores distintos, cada contagem pode estar subestimada em até
+            `erro_contagens[coluna]`.
+        """
+        contagens = self.contagens[coluna].sort_values(ascending=False, kind="stable").iloc[:n]
+        nao_nulos = self.n_linhas - self.nulos[coluna]
+
+        return pd.DataFrame({
+            "contagem": contagens.astype(np.int64),
+            "percentual": contagens / nao_nulos if nao_nulos else np.nan,
+        })
+
+    def histograma(self, coluna, n_faixas=N_FAIXAS_HISTOGRAMA):
+        """Histograma de uma coluna numérica entre o mínimo e o máximo.
+
+        As contagens vêm dos valores ponderados do sketch de quantis (exatas enquanto o sketch não
+        compactou os valores; depois, aproximadas com o mesmo erro de rank dos quantis).
+
+        Returns
+        -------
+        Tuple[np.ndarray, np.ndarray]
+            Contagens e bordas das faixas (como `np.histogram`).
+        """
+        sketch = self.sketches[coluna]
+        if sketch.n == 0:
+            return np.zeros(0), np.zeros(1)
+
+        valores = np.concatenate(sketch.niveis)
+        pesos = np.concatenate([np.full(len(v), 2.0**nivel) for nivel, v in enumerate(sketch.niveis)])
+
+        return np.histogram(valores, bins=n_faixas, range=(sketch.minimo, sketch.maximo), weights=pesos)
+
+    def resumo(self, quantis=(0.05, 0.25, 0.5, 0.75, 0.95)):
+        """Uma linha por coluna com contagens, momentos, quantis e a correlação com o alvo.
+
+        Returns
+        -------
+        pd.DataFrame
+            Colunas 'tipo', 'n', 'nulos', 'percentual_nulos', 'distintos' (NaN se passou de
+            `limite_categorias`), 'zeros', 'media', 'desvio', 'minimo', os quantis ('q5', 'q25',
+            ...), 'maximo', 'assimetria', 'curtose' (excesso) e 'correlacao_alvo'. Assimetria e
+            curtose são os estimadores ajustados G1 e G2 (os de `pandas.Series.skew` e `.kurt`).
+        """
+        n, media, m2, m3, m4 = self.momentos
+        with np.errstate(divide="ignore", invalid="ignore"):
+            desvio = np.sqrt(m2 / (n - 1))
+            # g1 e g2 (estimadores populacionais) corrigidos pelo tamanho da amostra
+            g1 = np.sqrt(n) * m3 / m2**1.5
+            g2 = n * m4 / m2**2 - 3
+            assimetria = g1 * np.sqrt(n * (n - 1)) / (n - 2)
+            curtose = ((n + 1) * g2 + 6) * (n - 1) / ((n - 2) * (n - 3))
+        # como no pandas: NaN com poucas linhas e 0 em colunas constantes
+        assimetria = np.where(n < 3, np.nan, np.where(m2 == 0, 0.0, assimetria))
+        curtose = np.where(n < 4, np.nan, np.where(m2 == 0, 0.0, curtose))
+
+        numericas = pd.DataFrame({
+            "tipo": "numérica",
+            "media": np.where(n > 0, media, np.nan),
+            "desvio": desvio,
+            "minimo": np.where(n > 0, self.minimos, np.nan),
+            **{
+                f"q{round(q * 100)}": [self.sketches[coluna].quantil(q) for coluna in self.colunas_numericas]
+                for q in quantis
+            },
+            "maximo": np.where(n > 0, self.maximos, np.nan),
+            "assimetria": assimetria,
+            "curtose": curtose,
+            "zeros": self.zeros,
+        }, index=self.colunas_numericas)
+        numericas["correlacao_alvo"] = self.correlacoes_alvo()
+
+        categoricas = pd.DataFrame({"tipo": "categórica"}, index=self.colunas_categoricas)
+        resumo = pd.concat([numericas, categoricas]).reindex(self.colunas)
+
+        resumo.insert(1, "n", self.n_linhas - self.nulos)
+        resumo.insert(2, "nulos", self.nulos)
+        resumo.insert(3, "percentual_nulos", self.nulos / self.n_linhas if self.n_linhas else np.nan)
+        resumo.insert(4, "distintos", [
+            np.nan if self.erro_contagens[coluna] else len(self.contagens[coluna]) for coluna in self.colunas
+        ])
+
+        return resumo
+
+
+# ------------------------------------------------------------------------------------------------
+# Leitura em blocos e perfis em paralelo
+# ------------------------------------------------------------------------------------------------
+
+def _perfil_chunk(chunk, colunas_numericas, colunas_categoricas, coluna_alvo, k, limite_categorias, semente):
+    perfil = PerfilDados(colunas_numericas, colunas_categoricas, coluna_alvo, k, limite_categorias, semente)
+    return perfil.atualizar(chunk)
+
+
+def perfilar_chunks(chunks, coluna_alvo=COLUNA_ALVO, n_jobs=1, k=K_PADRAO, limite_categorias=LIMITE_CATEGORIAS):
+    """Perfil de uma sequência de blocos, cada um resumido separadamente e combinado.
+
+    O tipo de cada coluna (numérica ou categórica) é definido pelo primeiro bloco. Com
+    `n_jobs != 1`, os blocos são resumidos em processos do joblib enquanto os próximos são
+    lidos, e os perfis são combinados à medida que ficam prontos.
+
+    Parameters
+    ----------
+    chunks : Iterable[pandas.DataFrame]
+        Blocos com as mesmas colunas (ex: `pd.read_csv(..., chunksize=...)`).
+    coluna_alvo : str, opcional
+        Coluna das correlações de Pearson, por padrão 'Response'
+    n_jobs : int, opcional
+        Processos que resumem os blocos, por padrão 1
+    k : int, opcional
+        Parâmetro dos sketches de quantis, por padrão 2000
+    limite_categorias : int, opcional
+        Valores distintos guardados por coluna, por padrão 1_000
+
+    Returns
+    -------
+    PerfilDados
+    """
+    from joblib import Parallel, delayed
+
+    chunks = iter(chunks)
+    primeiro = next(chunks)
+    colunas_numericas, colunas_categoricas = tipos_colunas(primeiro)
+    parametros = (colunas_numericas, colunas_categoricas, coluna_alvo, k, limite_categorias)
+
+    def todos_chunks():
+        yield primeiro
+        yield from chunks
+
+    perfil = PerfilDados(*parametros, random_state=RANDOM_STATE)
+    if n_jobs == 1:
+        for chunk in todos_chunks():
+            perfil.atualizar(chunk)
+        return perfil
+
+    partes = Parallel(n_jobs=n_jobs, return_as="generator_unordered")(
+        delayed(_perfil_chunk)(chunk, *parametros, [RANDOM_STATE, indice])
+        for indice, chunk in enumerate(todos_chunks())
+    )
+    for parte in partes:
+        perfil.juntar(parte)
+
+    return perfil
+
+
+def perfilar_arquivo(
+    caminho=ARQUIVO_ORIGINAL,
+    sep="\t",
+    tamanho_chunk=TAMANHO_CHUNK,
+    coluna_alvo=COLUNA_ALVO,
+    n_jobs=1,
+    colunas=None,
+    **kwargs,
+):
+    """Perfil de um arquivo CSV ou Parquet em uma única leitura, em blocos.
+
+    Parameters
+    ----------
+    caminho : str ou pathlib.Path, opcional
+        Arquivo de clientes, por padrão `ml_project1_data.csv`
+    sep : str, opcional
+        Separador do CSV, por padrão "\\t" (o do arquivo original)
+    tamanho_chunk : int, opcional
+        Linhas por bloco, por padrão 100_000
+    coluna_alvo : str, opcional
+        Coluna das correlações de Pearson, por padrão 'Response'
+    n_jobs : int, opcional
+        Processos que resumem os blocos, por padrão 1
+    colunas : List[str], opcional
+        Colunas lidas, por padrão None (todas)
+    **kwargs
+        `k` e `limite_categorias` de `perfilar_chunks`.
+
+    Returns
+    -------
+    PerfilDados
+    """
+    if str(caminho).endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        lotes = pq.ParquetFile(caminho).iter_batches(batch_size=tamanho_chunk, columns=colunas)
+        chunks = (lote.to_pandas() for lote in lotes)
+    else:
+        chunks = pd.read_csv(caminho, sep=sep, usecols=colunas, chunksize=tamanho_chunk)
+
+    return perfilar_chunks(chunks, coluna_alvo, n_jobs, **kwargs)
+
+
+# ------------------------------------------------------------------------------------------------
+# Relatório HTML
+# ------------------------------------------------------------------------------------------------
+
+_ESTILO = """
+body { font-family: sans-serif; margin: 2em; color: #222; }
+table { border-collapse: collapse; font-size: 13px; margin-bottom: 1em; }
+th, td { padding: 3px 8px; border-bottom: 1px solid #ddd; text-align: right; }
+th:first-child, td:first-child { text-align: left; }
+.coluna { display: inline-block; vertical-align: top; width: 330px; margin: 0 1.5em 1.5em 0; }
+.barra { background: #4c72b0; height: 10px; display: inline-block; }
+"""
+
+
+def _formatar(valor):
+    if isinstance(valor, str):
+        return html.escape(valor)
+    if pd.isna(valor):
+        return ""
+    if isinstance(valor, (int, np.integer)) or (float(valor).is_integer() and abs(valor) < 1e15):
+        return f"{int(valor):,}"
+    if abs(valor) >= 1_000:
+        return f"{valor:,.1f}"
+    return f"{valor:.4g}"
+
+
+def _tabela_html(dataframe):
+    cabecalho = "".join(f"<th>{html.escape(str(coluna))}</th>" for coluna in [""] + list(dataframe.columns))
+    linhas = "".join(
+        f"<tr><td>{html.escape(str(indice))}</td>" + "".join(f"<td>{_formatar(v)}</td>" for v in linha) + "</tr>"
+        for indice, linha in zip(dataframe.index, dataframe.itertuples(index=False))
+    )
+    return f"<table><tr>{cabecalho}</tr>{linhas}</table>"
+
+
+def _histograma_svg(contagens, bordas, largura=320, altura=90):
+    if len(contagens) == 0 or contagens.max() == 0:
+        return ""
+
+    largura_barra = largura / len(contagens)
+    barras = "".join(
+        f'<rect x="{i * largura_barra:.1f}" y="{altura - h:.1f}" width="{largura_barra * 0.9:.1f}" height="{h:.1f}"/>'
+        for i, h in enumerate(contagens / contagens.max() * altura)
+    )
+    return (
+        f'<svg width="{largura}" height="{altura + 14}" fill="#4c72b0">{barras}'
+        f'<text x="0" y="{altura + 12}" font-size="10" fill="#555">{_formatar(bordas[0])}</text>'
+        f'<text x="{largura}" y="{altura + 12}" font-size="10" fill="#555" text-anchor="end">'
+        f'{_formatar(bordas[-1])}</text></svg>'
+    )
+
+
+def _top_html(perfil, coluna):
+    top = perfil.top_categorias(coluna)
+    linhas = "".join(
+        f"<tr><td>{html.escape(str(valor))}</td><td>{_formatar(int(contagem))}</td>"
+        f'<td><span class="barra" style="width:{percentual * 100:.0f}px"></span> {percentual:.1%}</td></tr>'
+        for valor, contagem, percentual in zip(top.index, top["contagem"], top["percentual"])
+    )
+    aviso = ""
+    if perfil.erro_contagens[coluna]:
+        aviso = f"<small>contagens com erro de até {_formatar(int(perfil.erro_contagens[coluna]))}</small>"
+
+    return f"<table>{linhas}</table>{aviso}"
+
+
+def relatorio_html(perfil, caminho=RELATORIO_PERFIL, titulo="Exploratory Data Analysis - EDA Caso iFood", tempo=None):
+    """Grava o relatório do perfil em HTML (tabelas e histogramas em SVG, sem dependências).
+
+    Parameters
+    ----------
+    perfil : PerfilDados
+        Saída de `perfilar_arquivo` ou `perfilar_chunks`.
+    caminho : str ou pathlib.Path, opcional
+        Arquivo de saída, por padrão `relatorios/EDA_Case_iFood_perfil.html`
+    titulo : str, opcional
+        Título do relatório, por padrão "Exploratory Data Analysis - EDA Caso iFood"
+    tempo : float, opcional
+        Tempo do perfil em segundos, mostrado na visão geral, por padrão None
+
+    Returns
+    -------
+    pathlib.Path
+        Caminho do arquivo salvo.
+    """
+    from pathlib import Path
+
+    resumo = perfil.resumo()
+    visao_geral = pd.DataFrame({"valor": {
+        "linhas": perfil.n_linhas,
+        "colunas numéricas": len(perfil.colunas_numericas),
+        "colunas categóricas": len(perfil.colunas_categoricas),
+        "células nulas": int(perfil.nulos.sum()),
+        "tempo do perfil (s)": tempo,
+    }}, dtype=object)
+
+    secoes = [
+        f"<h1>{html.escape(titulo)}</h1>",
+        "<h2>Visão geral</h2>", _tabela_html(visao_geral),
+        "<h2>Colunas</h2>", _tabela_html(resumo.drop(columns=["tipo"])),
+    ]
+
+    correlacoes = perfil.correlacoes_alvo()
+    if len(correlacoes):
+        secoes += [
+            f"<h2>Correlação de Pearson com '{html.escape(perfil.coluna_alvo)}'</h2>",
+            _tabela_html(correlacoes.to_frame("correlacao")),
+        ]
+
+    secoes.append("<h2>Distribuições</h2>")
+    for coluna in perfil.colunas:
+        conteudo = _top_html(perfil, coluna)
+        if coluna in perfil.colunas_numericas:
+            conteudo = _histograma_svg(*perfil.histograma(coluna)) + conteudo
+        secoes.append(f'<div class="coluna"><h3>{html.escape(coluna)}</h3>{conteudo}</div>')
+
+    caminho = Path(caminho)
+    caminho.parent.mkdir(parents=True, exist_ok=True)
+    caminho.write_text(
+        f'<!DOCTYPE html><html><head><meta charset="utf-8"><title>{html.escape(titulo)}</title>'
+        f"<style>{_ESTILO}</style></head><body>{''.join(secoes)}</body></html>",
+        encoding="utf-8",
+    )
+
+    return caminho
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Perfil dos dados em uma única leitura, em blocos.")
+    parser.add_argument("--arquivo", default=str(ARQUIVO_ORIGINAL), help="CSV ou Parquet (padrão: ml_project1_data.csv)")
+    parser.add_argument("--sep", default="\t", help="Separador do CSV (padrão: tab)")
+    parser.add_argument("--tamanho-chunk", type=int, default=TAMANHO_CHUNK)
+    parser.add_argument("--n-jobs", type=int, default=1, help="Processos que resumem os blocos")
+    parser.add_argument("--alvo", default=COLUNA_ALVO, help="Coluna das correlações de Pearson")
+    parser.add_argument("--saida", default=str(RELATORIO_PERFIL), help="Arquivo HTML do relatório")
+    argumentos = parser.parse_args(argumentos)
+
+    inicio = time.perf_counter()
+    perfil = perfilar_arquivo(
+        argumentos.arquivo, argumentos.sep, argumentos.tamanho_chunk, argumentos.alvo, argumentos.n_jobs
+    )
+    tempo = time.perf_counter() - inicio
+
+    print(f"{perfil.n_linhas:_} linhas em {tempo:.1f} s")
+    print(f"Relatório salvo em {relatorio_html(perfil, argumentos.saida, tempo=tempo)}")
+
+
+if __name__ == "__main__":
+    main()
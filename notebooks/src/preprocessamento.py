@@ -0,0 +1,390 @@
+import numpy as np
+
+
+# Colunas categóricas usadas na clusterização (notebook 02)
+COLUNAS_ONE_HOT_CLUSTERIZACAO = [
+    "Education",
+    "Marital_Status",
+    "AgeGroup",
+    "HasChildren",
+    "HasAcceptedCmp",
+    "AcceptedCmp1",
+    "AcceptedCmp2",
+    "AcceptedCmp3",
+    "AcceptedCmp4",
+    "AcceptedCmp5",
+    "Complain",
+    "Response",
+    "Kidhome",
+    "Teenhome",
+    "YearsSinceEnrolled",
+    "Children",
+    "AcceptedCmpTotal",
+]
+
+# Colunas removidas antes da modelagem (notebook 03)
+COLUNAS_REMOVIDAS_MODELO = ["Complain", "AgeGroup", "NumDealsPurchases", "Age", "NumWebVisitsMonth"]
+
+# onde temos uma distribuição uniforme dos dados e queremos padronizar a distribuição dos dados
+COLUNAS_STANDARD_CLUSTERIZACAO = [
+    "Income",
+    "Age",
+]
+
+# Quando a distribuição não é normal, e queremos normalizar
+PREFIXOS_POWER_TRANSFORM = ("Mnt", "Num")
+
+# Com `esparso=True` o ColumnTransformer junta os blocos em uma matriz CSR qualquer que seja a
+# densidade. O one-hot já sai esparso e os scalers recebem apenas as suas colunas numéricas (densas
+# e poucas), então nenhuma etapa cria a matriz densa completa.
+SPARSE_THRESHOLD_ESPARSO = 1.0
+
+
+def _parametros_esparso(esparso):
+    return {"sparse_threshold": SPARSE_THRESHOLD_ESPARSO} if esparso else {}
+
+
+def colunas_por_transformacao(colunas, colunas_one_hot, colunas_standard, colunas_ignoradas=None):
+    """Separa as colunas de um dataframe pelos blocos do ColumnTransformer.
+
+    Segue a mesma regra dos notebooks: colunas 'Mnt*' e 'Num*' vão para o PowerTransformer e
+    as colunas restantes (que não são one-hot nem standard) vão para o MinMaxScaler.
+
+    Parameters
+    ----------
+    colunas : List[str]
+        Colunas disponíveis (ex: `df.columns`).
+    colunas_one_hot : List[str]
+        Colunas categóricas.
+    colunas_standard : List[str]
+        Colunas para o StandardScaler.
+    colunas_ignoradas : List[str], opcional
+        Colunas que não entram no preprocessamento (ex: ['ID']), por padrão None
+
+    Returns
+    -------
+    dict
+        Listas de colunas com as chaves 'one-hot', 'standard', 'minmax' e 'power'.
+    """
+    colunas_ignoradas = set(colunas_ignoradas or [])
+    colunas = [coluna for coluna in colunas if coluna not in colunas_ignoradas]
+
+    colunas_one_hot = [coluna for coluna in colunas_one_hot if coluna in colunas]
+    colunas_standard = [coluna for coluna in colunas_standard if coluna in colunas]
+    colunas_power = [
+        coluna for coluna in colunas
+        if coluna.startswith(PREFIXOS_POWER_TRANSFORM) and coluna not in colunas_one_hot + colunas_standard
+    ]
+    colunas_minmax = [
+        coluna for coluna in colunas if coluna not in colunas_one_hot + colunas_standard + colunas_power
+    ]
+
+    return {
+        "one-hot": colunas_one_hot,
+        "standard": colunas_standard,
+        "minmax": colunas_minmax,
+        "power": colunas_power,
+    }
+
+
+def construir_preprocessamento(colunas_transformacao, categorias=None, esparso=False):
+    """Constrói o ColumnTransformer usado nos notebooks (one-hot, standard, minmax e power).
+
+    Parameters
+    ----------
+    colunas_transformacao : dict
+        Saída de `colunas_por_transformacao`.
+    categorias : dict, opcional
+        Categorias de cada coluna one-hot (coluna -> lista ordenada). Quando informado, o
+        OneHotEncoder usa essas categorias (mesmo que a amostra de ajuste não tenha todas) e
+        ignora categorias desconhecidas, por padrão None ('auto', como nos notebooks)
+    esparso : bool, opcional
+        Devolve sempre uma matriz CSR (ver `SPARSE_THRESHOLD_ESPARSO`), por padrão False (densa
+        quando o one-hot deixa a matriz com mais de 30% de valores não nulos, padrão do sklearn)
+
+    Returns
+    -------
+    sklearn.compose.ColumnTransformer
+        Preprocessador não ajustado.
+    """
+    from sklearn.compose import ColumnTransformer
+    from sklearn.preprocessing import MinMaxScaler, OneHotEncoder, PowerTransformer, StandardScaler
+
+    colunas_one_hot = colunas_transformacao["one-hot"]
+
+    if categorias is None:
+        one_hot = OneHotEncoder()
+    else:
+        one_hot = OneHotEncoder(
+            categories=[categorias[coluna] for coluna in colunas_one_hot], handle_unknown="ignore"
+        )
+
+    return ColumnTransformer(
+        transformers=[
+            ("one-hot", one_hot, colunas_one_hot),
+            ("standard", StandardScaler(), colunas_transformacao["standard"]),
+            ("minmax", MinMaxScaler(), colunas_transformacao["minmax"]),
+            ("power", PowerTransformer(), colunas_transformacao["power"]),
+        ], remainder="passthrough", **_parametros_esparso(esparso)
+    )
+
+
+def construir_preprocessamento_arvore(colunas_one_hot, esparso=False):
+    """Constrói o preprocessamento dos modelos de árvore do notebook 03 (one-hot e as demais
+    colunas sem transformação).
+
+    Parameters
+    ----------
+    colunas_one_hot : List[str]
+        Colunas categóricas.
+    esparso : bool, opcional
+        Devolve sempre uma matriz CSR, por padrão False
+
+    Returns
+    -------
+    sklearn.compose.ColumnTransformer
+        Preprocessador não ajustado.
+    """
+    from sklearn.compose import ColumnTransformer
+    from sklearn.preprocessing import OneHotEncoder
+
+    return ColumnTransformer(
+        transformers=[("one_hot", OneHotEncoder(), colunas_one_hot)],
+        remainder="passthrough", **_parametros_esparso(esparso)
+    )
+
+
+# ------------------------------------------------------------------------------------------------
+# Preprocessamento ajustado com estatísticas acumuladas em blocos (dados maiores que a memória)
+# ------------------------------------------------------------------------------------------------
+
+# Valores de lambda do Yeo-Johnson avaliados na primeira leitura (o PowerTransformer do sklearn
+# procura o lambda entre -2 e 2) e passo da grade refinada em volta do melhor valor
+GRADE_LAMBDA = np.round(np.arange(-2.0, 2.0 + 1e-9, 0.1), 2)
+PASSO_REFINO_LAMBDA = 0.01
+
+
+class _Momentos:
+    # contagem, média e soma dos quadrados dos desvios de várias séries, combináveis entre blocos
+    # (fórmula de Chan et al.), sem a perda de precisão de somar x e x**2
+
+    def __init__(self, n_series):
+        self.n = np.zeros(n_series)
+        self.media = np.zeros(n_series)
+        self.m2 = np.zeros(n_series)
+
+    def _combinar(self, n, media, m2):
+        total = self.n + n
+        with np.errstate(invalid="ignore", divide="ignore"):
+            delta = media - self.media
+            self.media = np.where(total > 0, self.media + delta * n / total, 0.0)
+            self.m2 = self.m2 + m2 + np.where(total > 0, delta**2 * self.n * n / total, 0.0)
+        self.n = total
+
+    def atualizar(self, valores):
+        """valores: matriz (séries x observações), com NaN nas observações ausentes."""
+        validos = ~np.isnan(valores)
+        n = validos.sum(axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            media = np.where(n > 0, np.nansum(valores, axis=1) / n, 0.0)
+            m2 = np.nansum((valores - media[:, None]) ** 2, axis=1)
+        self._combinar(n, media, m2)
+
+    def juntar(self, outro):
+        self._combinar(outro.n, outro.media, outro.m2)
+
+    def variancia(self):
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(self.n > 0, self.m2 / self.n, np.nan)
+
+
+def _yeo_johnson(x, lmbda):
+    # mesma transformação do PowerTransformer(method='yeo-johnson')
+    saida = np.empty_like(x)
+    positivo = x >= 0
+
+    if abs(lmbda) < np.spacing(1.0):
+        saida[positivo] = np.log1p(x[positivo])
+    else:
+        saida[positivo] = (np.power(x[positivo] + 1, lmbda) - 1) / lmbda
+
+    if abs(lmbda - 2) > np.spacing(1.0):
+        saida[~positivo] = -(np.power(-x[~positivo] + 1, 2 - lmbda) - 1) / (2 - lmbda)
+    else:
+        saida[~positivo] = -np.log1p(-x[~positivo])
+
+    return saida
+
+
+def _escala(desvios):
+    # desvios (quase) nulos viram 1, como no sklearn
+    desvios = np.asarray(desvios, dtype=float)
+    return np.where(desvios < 10 * np.finfo(float).eps, 1.0, desvios)
+
+
+class EstatisticasPreprocessamento:
+    """Estatísticas do ColumnTransformer de `construir_preprocessamento`, acumuladas bloco a bloco.
+
+    Guarda as categorias das colunas one-hot, média e variância das colunas standard, mínimo e
+    máximo das colunas minmax e, para cada coluna power, a log-verossimilhança do Yeo-Johnson em
+    uma grade de lambdas (a média e a variância dos dados transformados por cada lambda e a soma
+    de sign(x) * log1p(|x|)). As estatísticas de partes diferentes dos dados podem ser combinadas
+    com `juntar` (ex: todas as partes menos a de um fold de validação).
+
+    Parameters
+    ----------
+    colunas_transformacao : dict
+        Saída de `colunas_por_transformacao`.
+    grades_lambda : dict, opcional
+        Grade de lambdas de cada coluna power, por padrão None (`GRADE_LAMBDA` em todas)
+    """
+
+    def __init__(self, colunas_transformacao, grades_lambda=None):
+        self.colunas_transformacao = colunas_transformacao
+        colunas_power = colunas_transformacao["power"]
+        if grades_lambda is None:
+            grades_lambda = {coluna: GRADE_LAMBDA for coluna in colunas_power}
+        self.grades_lambda = {coluna: np.asarray(grades_lambda[coluna], dtype=float) for coluna in colunas_power}
+
+        self.categorias = {coluna: set() for coluna in colunas_transformacao["one-hot"]}
+        self.standard = _Momentos(len(colunas_transformacao["standard"]))
+        self.minimos = np.full(len(colunas_transformacao["minmax"]), np.inf)
+        self.maximos = np.full(len(colunas_transformacao["minmax"]), -np.inf)
+        self.potencias = {coluna: _Momentos(len(grade)) for coluna, grade in self.grades_lambda.items()}
+        self.soma_log = {coluna: 0.0 for coluna in colunas_power}
+
+    def atualizar(self, chunk):
+        """Adiciona um bloco de linhas (DataFrame com as colunas de `colunas_transformacao`)."""
+        for coluna, categorias in self.categorias.items():
+            categorias.update(chunk[coluna].dropna().unique().tolist())
+
+        if self.colunas_transformacao["standard"]:
+            self.standard.atualizar(chunk[self.colunas_transformacao["standard"]].to_numpy(dtype=float).T)
+
+        if self.colunas_transformacao["minmax"] and len(chunk):
+            valores = chunk[self.colunas_transformacao["minmax"]].to_numpy(dtype=float)
+            self.minimos = np.fmin(self.minimos, np.nanmin(valores, axis=0, initial=np.inf))
+            self.maximos = np.fmax(self.maximos, np.nanmax(valores, axis=0, initial=-np.inf))
+
+        for coluna, grade in self.grades_lambda.items():
+            x = chunk[coluna].to_numpy(dtype=float)
+            x = x[~np.isnan(x)]
+            self.potencias[coluna].atualizar(np.vstack([_yeo_johnson(x, lmbda) for lmbda in grade]))
+            self.soma_log[coluna] += float(np.sum(np.sign(x) * np.log1p(np.abs(x))))
+
+        return self
+
+    def juntar(self, outra):
+        """Combina com as estatísticas de outra parte dos dados (mesmas colunas e grades)."""
+        for coluna, categorias in self.categorias.items():
+            categorias.update(outra.categorias[coluna])
+
+        self.standard.juntar(outra.standard)
+        self.minimos = np.fmin(self.minimos, outra.minimos)
+        self.maximos = np.fmax(self.maximos, outra.maximos)
+
+        for coluna in self.grades_lambda:
+            self.potencias[coluna].juntar(outra.potencias[coluna])
+            self.soma_log[coluna] += outra.soma_log[coluna]
+
+        return self
+
+    def lambdas(self):
+        """Lambda de máxima verossimilhança de cada coluna power e a média e o desvio dos dados
+        transformados por ele.
+
+        Returns
+        -------
+        dict
+            {coluna: (lambda, media, desvio)}
+        """
+        resultado = {}
+
+        for coluna, grade in self.grades_lambda.items():
+            momentos = self.potencias[coluna]
+            variancia = momentos.variancia()
+            with np.errstate(divide="ignore", invalid="ignore"):
+                log_verossimilhanca = -momentos.n / 2 * np.log(variancia) + (grade - 1) * self.soma_log[coluna]
+            log_verossimilhanca = np.where(variancia > np.finfo(float).tiny, log_verossimilhanca, -np.inf)
+
+            melhor = int(np.nanargmax(log_verossimilhanca))
+            resultado[coluna] = (grade[melhor], momentos.media[melhor], np.sqrt(variancia[melhor]))
+
+        return resultado
+
+    def grades_refinadas(self, passo=PASSO_REFINO_LAMBDA, raio=None):
+        """Grades finas em volta do melhor lambda de cada coluna (para uma segunda leitura)."""
+        grades = {}
+
+        for coluna, (lmbda, _, _) in self.lambdas().items():
+            grade = self.grades_lambda[coluna]
+            raio_coluna = raio if raio is not None else (np.max(np.diff(grade)) if len(grade) > 1 else 0.1)
+            grades[coluna] = np.round(np.arange(lmbda - raio_coluna, lmbda + raio_coluna + passo / 2, passo), 6)
+
+        return grades
+
+
+def preprocessamento_de_estatisticas(colunas_transformacao, estatisticas, amostra, estatisticas_potencias=None):
+    """Constrói o ColumnTransformer de `construir_preprocessamento` já ajustado pelas estatísticas.
+
+    O ColumnTransformer é ajustado normalmente em uma amostra pequena (para montar a estrutura:
+    colunas, saídas e nomes das features) com as categorias de todos os dados; em seguida os
+    parâmetros dos scalers e do PowerTransformer são substituídos pelos das estatísticas
+    acumuladas. O bloco 'power' é um Pipeline com PowerTransformer(standardize=False) e
+    StandardScaler, para que a padronização fique em atributos públicos. O resultado transforma os
+    dados exatamente como um preprocessamento ajustado em todas as linhas (a menos da grade de
+    lambdas) e tem os mesmos nomes de features (`get_feature_names_out`).
+
+    Parameters
+    ----------
+    colunas_transformacao : dict
+        Saída de `colunas_por_transformacao`.
+    estatisticas : EstatisticasPreprocessamento
+        Estatísticas de todos os dados de ajuste.
+    amostra : pandas.DataFrame
+        Algumas linhas com todas as colunas (ex: o primeiro bloco do arquivo).
+    estatisticas_potencias : EstatisticasPreprocessamento, opcional
+        Estatísticas com a grade refinada das colunas power, por padrão None (usa `estatisticas`)
+
+    Returns
+    -------
+    sklearn.compose.ColumnTransformer
+        Preprocessador ajustado.
+    """
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import MinMaxScaler, PowerTransformer, StandardScaler
+
+    categorias = {coluna: sorted(valores) for coluna, valores in estatisticas.categorias.items()}
+    preprocessor = construir_preprocessamento(colunas_transformacao, categorias).set_params(
+        power=Pipeline([("power", PowerTransformer(standardize=False)), ("standard", StandardScaler())])
+    ).fit(amostra)
+    transformadores = {nome: transformador for nome, transformador, _ in preprocessor.transformers_}
+
+    standard = transformadores.get("standard")
+    if isinstance(standard, StandardScaler) and colunas_transformacao["standard"]:
+        standard.mean_ = estatisticas.standard.media.copy()
+        standard.var_ = estatisticas.standard.variancia()
+        standard.scale_ = _escala(np.sqrt(standard.var_))
+        standard.n_samples_seen_ = estatisticas.standard.n.astype(np.int64)
+
+    minmax = transformadores.get("minmax")
+    if isinstance(minmax, MinMaxScaler) and colunas_transformacao["minmax"]:
+        minimo, maximo = minmax.feature_range
+        minmax.data_min_ = estatisticas.minimos.copy()
+        minmax.data_max_ = estatisticas.maximos.copy()
+        minmax.data_range_ = minmax.data_max_ - minmax.data_min_
+        minmax.scale_ = (maximo - minimo) / _escala(minmax.data_range_)
+        minmax.min_ = minimo - minmax.data_min_ * minmax.scale_
+
+    power = transformadores.get("power")
+    if isinstance(power, Pipeline) and colunas_transformacao["power"]:
+        lambdas = (estatisticas_potencias or estatisticas).lambdas()
+        colunas_power = colunas_transformacao["power"]
+
+        power["power"].lambdas_ = np.array([lambdas[coluna][0] for coluna in colunas_power])
+        desvios = np.array([lambdas[coluna][2] for coluna in colunas_power])
+        power["standard"].mean_ = np.array([lambdas[coluna][1] for coluna in colunas_power])
+        power["standard"].var_ = desvios**2
+        power["standard"].scale_ = _escala(desvios)
+
+    return preprocessor
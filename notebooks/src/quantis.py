@@ -0,0 +1,129 @@
+import numpy as np
+
+
+K_PADRAO = 2000
+
+
+class SketchQuantis:
+    """Sketch de quantis aproximados para dados em streaming (no estilo do KLL).
+
+    Os valores ficam em níveis: cada valor do nível h representa 2**h valores originais. Quando um
+    nível passa da sua capacidade, ele é ordenado e metade dos valores (posições pares ou ímpares,
+    sorteadas) sobe para o nível seguinte. A memória é O(k) independente do número de valores e
+    o erro de rank é da ordem de 1/k. Enquanto nenhum nível for compactado, os quantis são exatos
+    (interpolação linear, como `pandas.Series.quantile`).
+
+    Sketches de partes diferentes dos dados podem ser combinados com `juntar`, o que permite
+    processar blocos de um arquivo separadamente (inclusive em paralelo).
+
+    Parameters
+    ----------
+    k : int, opcional
+        Capacidade do nível mais alto (controla o erro), por padrão 2000
+    random_state : int, opcional
+        Semente das compactações, por padrão None
+    """
+
+    def __init__(self, k=K_PADRAO, random_state=None):
+        self.k = k
+        self.random_state = random_state
+        self._rng = np.random.default_rng(random_state)
+        self.niveis = [np.empty(0)]
+        self.n = 0
+        self.minimo = np.inf
+        self.maximo = -np.inf
+
+    def _capacidade(self, nivel):
+        altura = len(self.niveis) - 1 - nivel
+        return max(2, int(np.ceil(self.k * (2 / 3) ** altura)))
+
+    def _compactar(self):
+        nivel = 0
+        while nivel < len(self.niveis):
+            valores = self.niveis[nivel]
+
+            if len(valores) > self._capacidade(nivel):
+                if nivel + 1 == len(self.niveis):
+                    self.niveis.append(np.empty(0))
+
+                valores = np.sort(valores)
+                # com tamanho ímpar, o último valor fica no nível atual
+                sobra = valores[len(valores) - len(valores) % 2:]
+                promovidos = valores[self._rng.integers(2):len(valores) - len(sobra):2]
+
+                self.niveis[nivel] = sobra
+                self.niveis[nivel + 1] = np.concatenate([self.niveis[nivel + 1], promovidos])
+
+            nivel += 1
+
+    def atualizar(self, valores):
+        """Adiciona um bloco de valores ao sketch (valores faltantes são ignorados)."""
+        valores = np.asarray(valores, dtype=float).ravel()
+        valores = valores[~np.isnan(valores)]
+
+        if len(valores) == 0:
+            return self
+
+        self.n += len(valores)
+        self.minimo = min(self.minimo, valores.min())
+        self.maximo = max(self.maximo, valores.max())
+
+        self.niveis[0] = np.concatenate([self.niveis[0], valores])
+        self._compactar()
+
+        return self
+
+    def juntar(self, outro):
+        """Combina outro sketch (de outra parte dos dados) neste."""
+        while len(self.niveis) < len(outro.niveis):
+            self.niveis.append(np.empty(0))
+
+        for nivel, valores in enumerate(outro.niveis):
+            self.niveis[nivel] = np.concatenate([self.niveis[nivel], valores])
+
+        self.n += outro.n
+        self.minimo = min(self.minimo, outro.minimo)
+        self.maximo = max(self.maximo, outro.maximo)
+        self._compactar()
+
+        return self
+
+    @property
+    def exato(self):
+        """True se nenhum valor foi compactado (os quantis são exatos)."""
+        return len(self.niveis) == 1
+
+    def quantil(self, q):
+        """Retorna o(s) quantil(is) aproximado(s) dos valores vistos.
+
+        Parameters
+        ----------
+        q : float ou array-like
+            Quantil(is) entre 0 e 1.
+
+        Returns
+        -------
+        float ou np.ndarray
+            Quantil(is) estimado(s); NaN se o sketch estiver vazio.
+        """
+        q = np.asarray(q, dtype=float)
+
+        if self.n == 0:
+            return np.full(q.shape, np.nan)[()]
+
+        if self.exato:
+            return np.quantile(self.niveis[0], q)
+
+        valores = np.concatenate(self.niveis)
+        pesos = np.concatenate([np.full(len(v), 2.0 ** nivel) for nivel, v in enumerate(self.niveis)])
+
+        ordem = np.argsort(valores, kind="mergesort")
+        valores = valores[ordem]
+        acumulado = np.cumsum(pesos[ordem])
+
+        posicoes = np.searchsorted(acumulado, q * acumulado[-1], side="left")
+        resultado = valores[np.minimum(posicoes, len(valores) - 1)]
+
+        resultado = np.where(q <= 0, self.minimo, np.where(q >= 1, self.maximo, resultado))
+
+        return resultado[()]
@@ -0,0 +1,450 @@
+"""Geração das figuras dos relatórios sem abrir os notebooks.
+
+Uso (a partir da pasta `notebooks`):
+
+    python -m src.relatorios                      # gera apenas as figuras desatualizadas
+    python -m src.relatorios --figuras "Matriz de confusao" --forcar
+    python -m src.relatorios --listar
+
+Cada figura é gerada em um processo separado (backend Agg, sem janelas) e salva em
+`PASTA_IMAGENS`. Um arquivo de cache (`cache_relatorios.json`, na mesma pasta) guarda o hash dos
+dados de entrada, dos parâmetros e do código de cada figura; figuras cujo hash não mudou desde a
+última geração são puladas.
+"""
+import argparse
+import hashlib
+import json
+import os
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from .config import MODELO_CAMPANHA, PASTA_DADOS, PASTA_IMAGENS, RANDOM_STATE
+from .preprocessamento import COLUNAS_REMOVIDAS_MODELO
+
+
+ARQUIVO_CACHE = "cache_relatorios.json"
+DPI = 150
+
+# Código que gera as figuras (entra no hash para que uma mudança no gráfico, no modelo ou no
+# preprocessamento também gere a figura de novo): todos os módulos do pacote `src`, já que as
+# figuras importam graficos, models, metricas, escoragem, preprocessamento etc.
+CODIGO_FIGURAS = sorted(Path(__file__).parent.glob("*.py"))
+
+
+# ------------------------------------------------------------------------------------------------
+# Figuras (cada função desenha uma figura na figura atual do matplotlib)
+# ------------------------------------------------------------------------------------------------
+
+def _dados_modelo():
+    import pandas as pd
+
+    df = pd.read_csv(PASTA_DADOS / "customers_clustered.csv")
+    df = df.drop(columns=COLUNAS_REMOVIDAS_MODELO)
+
+    return df.drop(columns=["Response"]), df["Response"]
+
+
+def _figura_elbow_silhouette(n_init):
+    import pandas as pd
+
+    from .graficos import grafico_elbow_silhouette
+    from .preprocessamento import (
+        COLUNAS_ONE_HOT_CLUSTERIZACAO,
+        COLUNAS_STANDARD_CLUSTERIZACAO,
+        colunas_por_transformacao,
+        construir_preprocessamento,
+    )
+
+    df = pd.read_csv(PASTA_DADOS / "customers_data_cleaned.csv")
+    colunas = colunas_por_transformacao(df.columns, COLUNAS_ONE_HOT_CLUSTERIZACAO, COLUNAS_STANDARD_CLUSTERIZACAO)
+    X = construir_preprocessamento(colunas).fit_transform(df)
+
+    # um processo por figura: o KMeans de cada k roda sequencialmente dentro dele
+    grafico_elbow_silhouette(X, random_state=RANDOM_STATE, n_jobs=1, n_init=n_init)
+
+
+def _figura_boxplot_clusters(palette):
+    import matplotlib.pyplot as plt
+    import pandas as pd
+    import seaborn as sns
+
+    from .preprocessamento import (
+        COLUNAS_ONE_HOT_CLUSTERIZACAO,
+        COLUNAS_STANDARD_CLUSTERIZACAO,
+        colunas_por_transformacao,
+    )
+
+    df = pd.read_csv(PASTA_DADOS / "customers_clustered.csv")
+    colunas = colunas_por_transformacao(
+        df.columns, COLUNAS_ONE_HOT_CLUSTERIZACAO, COLUNAS_STANDARD_CLUSTERIZACAO, colunas_ignoradas=["cluster"]
+    )
+
+    fig, axs = plt.subplots(nrows=3, ncols=6, figsize=(15, 12))
+
+    for ax, coluna in zip(axs.flatten(), colunas["power"] + colunas["standard"] + colunas["minmax"]):
+        sns.boxplot(data=df, x=coluna, ax=ax, showmeans=True, hue="cluster", palette=palette)
+
+    fig.suptitle("Boxplot por Cluster", fontsize=15, fontweight="bold")
+    plt.tight_layout()
+
+
+def _figura_barras_clusters(palette):
+    import matplotlib.pyplot as plt
+    import pandas as pd
+    import seaborn as sns
+
+    from .preprocessamento import COLUNAS_ONE_HOT_CLUSTERIZACAO
+
+    df = pd.read_csv(PASTA_DADOS / "customers_clustered.csv")
+
+    fig, axs = plt.subplots(nrows=4, ncols=5, figsize=(15, 15), tight_layout=True)
+
+    for ax, coluna in zip(axs.flatten(), COLUNAS_ONE_HOT_CLUSTERIZACAO):
+        sns.countplot(data=df, x=coluna, ax=ax, hue="cluster", palette=palette)
+
+    for ax in axs.flatten()[len(COLUNAS_ONE_HOT_CLUSTERIZACAO):]:
+        ax.set_visible(False)
+
+    fig.suptitle("Gráfico de Barras por Cluster - Features Categóricas", fontsize=15, fontweight="bold")
+
+
+def _figura_correlacao_response():
+    import matplotlib.pyplot as plt
+    import pandas as pd
+    import seaborn as sns
+
+    df = pd.read_csv(PASTA_DADOS / "customers_new_features_and_drop_dummies.csv", index_col=0)
+    correlacoes = df.corr()["Response"].drop("Response").sort_values()
+
+    fig, ax = plt.subplots(figsize=(16, 6))
+    sns.barplot(x=correlacoes.index, y=correlacoes.values, hue=correlacoes.values, palette="coolwarm_r", legend=False, ax=ax)
+    ax.tick_params(axis="x", rotation=90)
+    ax.set_ylabel("corr")
+    ax.set_title(
+        "Correlação das Features com 'Response' - referente à resposta da Campanha Piloto",
+        fontsize=14, fontweight="bold",
+    )
+
+
+def _figura_comparar_modelos(n_splits):
+    from lightgbm import LGBMClassifier
+    from sklearn.base import clone
+    from sklearn.dummy import DummyClassifier
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.model_selection import StratifiedKFold
+    from sklearn.neighbors import KNeighborsClassifier
+    from sklearn.svm import SVC
+    from sklearn.tree import DecisionTreeClassifier
+    from xgboost import XGBClassifier
+
+    from .escoragem import carregar_modelo
+    from .graficos import plot_comparar_metricas_modelos
+    from .models import comparar_modelos_classificacao
+    from .preprocessamento import construir_preprocessamento_arvore
+
+    X, y = _dados_modelo()
+
+    # mesmo preprocessamento do modelo salvo (sem os parâmetros ajustados)
+    preprocessamento = clone(carregar_modelo(MODELO_CAMPANHA)["preprocessor"])
+    colunas_one_hot = dict((nome, colunas) for nome, _, colunas in preprocessamento.transformers)["one-hot"]
+    preprocessamento_arvore = construir_preprocessamento_arvore(colunas_one_hot)
+
+    scale_pos_weight = (y == 0).sum() / (y == 1).sum()
+
+    modelos = {
+        "DummyClassifier": DummyClassifier(strategy="stratified"),
+        "LogisticRegression": (
+            LogisticRegression(class_weight="balanced", random_state=RANDOM_STATE, max_iter=1000), preprocessamento
+        ),
+        "DecisionTreeClassifier": (DecisionTreeClassifier(class_weight="balanced"), preprocessamento_arvore),
+        "XGBClassifier": (
+            XGBClassifier(scale_pos_weight=scale_pos_weight, random_state=RANDOM_STATE, n_jobs=1),
+            preprocessamento_arvore,
+        ),
+        "LGBMClassifier": (
+            LGBMClassifier(scale_pos_weight=scale_pos_weight, random_state=RANDOM_STATE, n_jobs=1, verbose=-1),
+            preprocessamento_arvore,
+        ),
+        "SVC": (SVC(class_weight="balanced", cache_size=1000, random_state=RANDOM_STATE), preprocessamento),
+        "KNeighborsClassifier": (KNeighborsClassifier(), preprocessamento),
+    }
+
+    kf = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=RANDOM_STATE)
+    df_resultados = comparar_modelos_classificacao(X, y, kf, modelos, n_jobs=1)
+
+    plot_comparar_metricas_modelos(df_resultados)
+
+
+def _figura_coeficientes():
+    from .escoragem import carregar_modelo
+    from .graficos import plot_coeficientes
+    from .models import dataframe_coeficientes
+
+    modelo = carregar_modelo(MODELO_CAMPANHA)
+    coefs = dataframe_coeficientes(modelo["model"].coef_[0], modelo["preprocessor"].get_feature_names_out())
+
+    plot_coeficientes(coefs)
+
+
+def _figura_matriz_confusao():
+    import matplotlib.pyplot as plt
+    from sklearn.metrics import ConfusionMatrixDisplay
+
+    from .escoragem import carregar_modelo
+
+    modelo = carregar_modelo(MODELO_CAMPANHA)
+    X, y = _dados_modelo()
+
+    ConfusionMatrixDisplay.from_estimator(modelo, X, y, display_labels=["Não Respondeu", "Respondeu"])
+    plt.grid(False)
+
+
+def _figura_permutation_importance(n_repeats, scoring):
+    import matplotlib.pyplot as plt
+
+    from .escoragem import carregar_modelo
+    from .models import importancia_permutacao
+
+    modelo = carregar_modelo(MODELO_CAMPANHA)
+    X, y = _dados_modelo()
+
+    importancias = importancia_permutacao(modelo, X, y, scoring=scoring, n_repeats=n_repeats, random_state=RANDOM_STATE)
+    ordem = importancias.importances_mean.argsort()
+
+    fig, ax = plt.subplots()
+    ax.boxplot(importancias.importances[ordem].T, orientation="horizontal", tick_labels=importancias.feature_names[ordem])
+    ax.axvline(x=0, linestyle="--")
+    ax.set_xlabel("Decréscimo na Performance do Modelo - Recall")
+    ax.set_title("Permutation Importance")
+    ax.grid(True, linestyle=":")
+
+
+# Figuras do relatório: função que desenha, arquivos de entrada e parâmetros. O nome é também o
+# nome do arquivo .png gerado.
+FIGURAS = {
+    "Elbow and Silhouette Method": {
+        "funcao": _figura_elbow_silhouette,
+        "entradas": [PASTA_DADOS / "customers_data_cleaned.csv"],
+        "parametros": {"n_init": 10},
+    },
+    "Separacao dos Clusters - Boxplot para features numericas": {
+        "funcao": _figura_boxplot_clusters,
+        "entradas": [PASTA_DADOS / "customers_clustered.csv"],
+        "parametros": {"palette": "tab10"},
+    },
+    "Separacao dos Clusters - Histograma para features categoricas": {
+        "funcao": _figura_barras_clusters,
+        "entradas": [PASTA_DADOS / "customers_clustered.csv"],
+        "parametros": {"palette": "tab10"},
+    },
+    "Correlacao das Features com Response": {
+        "funcao": _figura_correlacao_response,
+        "entradas": [PASTA_DADOS / "customers_new_features_and_drop_dummies.csv"],
+        "parametros": {},
+    },
+    "Comparando diferentes modelos de classificacao": {
+        "funcao": _figura_comparar_modelos,
+        "entradas": [PASTA_DADOS / "customers_clustered.csv", MODELO_CAMPANHA],
+        "parametros": {"n_splits": 5},
+    },
+    "Coeficientes do modelo regressao logistica": {
+        "funcao": _figura_coeficientes,
+        "entradas": [MODELO_CAMPANHA],
+        "parametros": {},
+    },
+    "Matriz de confusao": {
+        "funcao": _figura_matriz_confusao,
+        "entradas": [PASTA_DADOS / "customers_clustered.csv", MODELO_CAMPANHA],
+        "parametros": {},
+    },
+    "Permutation Importance": {
+        "funcao": _figura_permutation_importance,
+        "entradas": [PASTA_DADOS / "customers_clustered.csv", MODELO_CAMPANHA],
+        "parametros": {"n_repeats": 10, "scoring": "recall"},
+    },
+}
+
+
+# ------------------------------------------------------------------------------------------------
+# Cache e execução
+# ------------------------------------------------------------------------------------------------
+
+def _hash_arquivo(caminho, tamanho_bloco=1 << 20):
+    hash_arquivo = hashlib.sha256()
+    with open(caminho, "rb") as arquivo:
+        for bloco in iter(lambda: arquivo.read(tamanho_bloco), b""):
+            hash_arquivo.update(bloco)
+    return hash_arquivo.hexdigest()
+
+
+def hash_figura(nome, hashes_arquivos=None):
+    """Hash dos arquivos de entrada, dos parâmetros e do código de uma figura de `FIGURAS`.
+
+    Parameters
+    ----------
+    nome : str
+        Nome da figura.
+    hashes_arquivos : dict, opcional
+        Hashes já calculados por caminho (evita ler o mesmo arquivo mais de uma vez), por padrão None
+
+    Returns
+    -------
+    str
+        Hash sha256 em hexadecimal.
+    """
+    hashes_arquivos = {} if hashes_arquivos is None else hashes_arquivos
+    figura = FIGURAS[nome]
+
+    partes = []
+    for caminho in list(figura["entradas"]) + CODIGO_FIGURAS:
+        if caminho not in hashes_arquivos:
+            hashes_arquivos[caminho] = _hash_arquivo(caminho)
+        partes.append(hashes_arquivos[caminho])
+
+    partes.append(json.dumps(figura["parametros"], sort_keys=True, default=str))
+
+    return hashlib.sha256("|".join(partes).encode()).hexdigest()
+
+
+def carregar_cache(arquivo_cache):
+    """Lê o cache {nome da figura: hash}; retorna um dicionário vazio se ele não existir."""
+    try:
+        return json.loads(Path(arquivo_cache).read_text(encoding="utf-8"))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def _inicializar_processo():
+    # backend sem janelas antes de qualquer import do pyplot no processo
+    import matplotlib
+
+    matplotlib.use("Agg")
+
+    import seaborn as sns
+
+    sns.set_theme(palette="bright")
+
+
+def _gerar_figura(nome, pasta_saida, dpi):
+    import matplotlib.pyplot as plt
+
+    figura = FIGURAS[nome]
+    inicio = time.perf_counter()
+
+    with warnings.catch_warnings():
+        # plt.show() das funções de graficos.py não faz nada no backend Agg
+        warnings.filterwarnings("ignore", message=".*non-interactive.*")
+        figura["funcao"](**figura["parametros"])
+
+    caminho = Path(pasta_saida) / f"{nome}.png"
+    plt.gcf().savefig(caminho, dpi=dpi, bbox_inches="tight")
+    plt.close("all")
+
+    return caminho, time.perf_counter() - inicio
+
+
+def gerar_relatorio(
+    figuras=None,
+    pasta_saida=PASTA_IMAGENS,
+    forcar=False,
+    n_processos=None,
+    dpi=DPI,
+):
+    """Gera as figuras do relatório em paralelo, pulando as que não mudaram.
+
+    Parameters
+    ----------
+    figuras : List[str], opcional
+        Nomes das figuras (chaves de `FIGURAS`), por padrão None (todas)
+    pasta_saida : str ou pathlib.Path, opcional
+        Pasta onde os arquivos .png são salvos, por padrão `PASTA_IMAGENS`
+    forcar : bool, opcional
+        Gera as figuras mesmo que o cache esteja atualizado, por padrão False
+    n_processos : int, opcional
+        Número de processos, por padrão None (número de núcleos)
+    dpi : int, opcional
+        Resolução das imagens, por padrão 150
+
+    Returns
+    -------
+    dict
+        Situação de cada figura: 'gerada', 'atualizada' (pulada) ou a mensagem de erro.
+    """
+    figuras = list(FIGURAS) if figuras is None else list(figuras)
+    desconhecidas = [nome for nome in figuras if nome not in FIGURAS]
+    if desconhecidas:
+        raise ValueError(f"Figuras desconhecidas: {desconhecidas}. Disponíveis: {list(FIGURAS)}")
+
+    pasta_saida = Path(pasta_saida)
+    pasta_saida.mkdir(parents=True, exist_ok=True)
+
+    # o cache fica junto das imagens, com os hashes da última geração
+    arquivo_cache = pasta_saida / ARQUIVO_CACHE
+    cache = carregar_cache(arquivo_cache)
+    hashes_arquivos = {}
+    hashes = {nome: hash_figura(nome, hashes_arquivos) for nome in figuras}
+
+    situacao = {}
+    pendentes = []
+    for nome in figuras:
+        if not forcar and cache.get(nome) == hashes[nome] and (pasta_saida / f"{nome}.png").exists():
+            situacao[nome] = "atualizada"
+        else:
+            pendentes.append(nome)
+
+    if pendentes:
+        n_processos = min(n_processos or os.cpu_count() or 1, len(pendentes))
+
+        with ProcessPoolExecutor(max_workers=n_processos, initializer=_inicializar_processo) as executor:
+            tarefas = {executor.submit(_gerar_figura, nome, pasta_saida, dpi): nome for nome in pendentes}
+
+            for tarefa in as_completed(tarefas):
+                nome = tarefas[tarefa]
+                try:
+                    caminho, tempo = tarefa.result()
+                except Exception as erro:
+                    situacao[nome] = f"erro: {type(erro).__name__}: {erro}"
+                    cache.pop(nome, None)
+                    continue
+
+                situacao[nome] = "gerada"
+                cache[nome] = hashes[nome]
+                print(f"{nome}: {caminho.name} ({tempo:.1f} s)")
+
+    Path(arquivo_cache).write_text(json.dumps(cache, indent=2, sort_keys=True), encoding="utf-8")
+
+    return {nome: situacao[nome] for nome in figuras}
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Gera as figuras dos relatórios em PASTA_IMAGENS.")
+    parser.add_argument("--figuras", nargs="+", help="Nomes das figuras (padrão: todas)")
+    parser.add_argument("--pasta-saida", default=PASTA_IMAGENS, type=Path, help="Pasta de saída")
+    parser.add_argument("--forcar", action="store_true", help="Ignora o cache e gera todas as figuras pedidas")
+    parser.add_argument("--n-processos", type=int, default=None, help="Número de processos")
+    parser.add_argument("--dpi", type=int, default=DPI, help="Resolução das imagens")
+    parser.add_argument("--listar", action="store_true", help="Lista as figuras disponíveis e sai")
+    argumentos = parser.parse_args(argumentos)
+
+    if argumentos.listar:
+        print("\n".join(FIGURAS))
+        return 0
+
+    situacao = gerar_relatorio(
+        figuras=argumentos.figuras,
+        pasta_saida=argumentos.pasta_saida,
+        forcar=argumentos.forcar,
+        n_processos=argumentos.n_processos,
+        dpi=argumentos.dpi,
+    )
+
+    for nome, estado in situacao.items():
+        print(f"{estado:>10} | {nome}" if not estado.startswith("erro") else f"{nome}: {estado}")
+
+    return int(any(estado.startswith("erro") for estado in situacao.values()))
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,376 @@
+import numpy as np
+import pandas as pd
+from joblib import dump, load
+
+from .config import MODELO_SEGMENTACAO, RANDOM_STATE
+from .preprocessamento import (
+    COLUNAS_ONE_HOT_CLUSTERIZACAO,
+    COLUNAS_STANDARD_CLUSTERIZACAO,
+    colunas_por_transformacao,
+    construir_preprocessamento,
+)
+
+
+TAMANHO_CHUNK = 100_000
+TAMANHO_AMOSTRA = 50_000
+TAMANHO_LOTE = 1024
+COLUNA_CLUSTER = "cluster"
+
+LIMITE_PSI = 0.2
+LIMITE_DISTANCIA = 1.25
+MINIMO_LINHAS_DRIFT = 100
+
+_EPS = 1e-6
+
+
+def _atualizar_reservatorio(amostra, chunk, linhas_vistas, tamanho_amostra, rng):
+    # Amostragem de reservatório (algoritmo R) vetorizada por chunk: a linha de posição global t
+    # substitui uma posição sorteada em [0, t] se ela cair dentro do reservatório.
+    faltando = tamanho_amostra - len(amostra)
+    if faltando > 0:
+        amostra = pd.concat([amostra, chunk.iloc[:faltando]], ignore_index=True)
+        chunk = chunk.iloc[faltando:]
+        linhas_vistas += faltando
+
+    if len(chunk) == 0:
+        return amostra
+
+    posicoes = rng.integers(0, linhas_vistas + np.arange(1, len(chunk) + 1))
+    linhas = np.flatnonzero(posicoes < tamanho_amostra)
+    posicoes = posicoes[linhas]
+
+    # se duas linhas sortearem a mesma posição, vale a última (como no algoritmo sequencial)
+    _, ultimas = np.unique(posicoes[::-1], return_index=True)
+    ultimas = len(posicoes) - 1 - ultimas
+
+    manter = np.ones(len(amostra), dtype=bool)
+    manter[posicoes[ultimas]] = False
+
+    return pd.concat([amostra[manter], chunk.iloc[linhas[ultimas]]], ignore_index=True)
+
+
+def _lotes(n_linhas, tamanho_lote, rng):
+    ordem = rng.permutation(n_linhas)
+    return [ordem[i:i + tamanho_lote] for i in range(0, n_linhas, tamanho_lote)]
+
+
+def _distancias(kmeans, X):
+    # distância quadrada de cada linha ao centroide mais próximo e o respectivo cluster
+    distancias = kmeans.transform(X) ** 2
+    labels = distancias.argmin(axis=1)
+
+    return labels, distancias[np.arange(len(labels)), labels]
+
+
+def ajustar_segmentacao_em_chunks(
+    caminho_entrada,
+    n_clusters=3,
+    colunas_ignoradas=None,
+    tamanho_chunk=TAMANHO_CHUNK,
+    tamanho_amostra=TAMANHO_AMOSTRA,
+    tamanho_lote=TAMANHO_LOTE,
+    n_epocas=1,
+    random_state=RANDOM_STATE,
+    sep=",",
+):
+    """Ajusta a segmentação de clientes (preprocessamento + KMeans) lendo o CSV em blocos.
+
+    Equivalente ao pipeline do notebook 02 (ColumnTransformer + KMeans), mas sem carregar a base
+    inteira em memória:
+
+    1. Uma leitura coleta as categorias de cada coluna one-hot e uma amostra de reservatório de
+       `tamanho_amostra` linhas. O preprocessamento é ajustado na amostra (com as categorias de
+       toda a base) e os centroides iniciais vêm de um KMeans (k-means++, n_init=10) na amostra.
+    2. `n_epocas` leituras refinam os centroides com `MiniBatchKMeans.partial_fit` em lotes
+       embaralhados de `tamanho_lote` linhas de cada bloco.
+
+    Parameters
+    ----------
+    caminho_entrada : str ou pathlib.Path
+        Arquivo CSV de clientes (ex: dados/customers_data_cleaned.csv).
+    n_clusters : int, opcional
+        Número de clusters, por padrão 3
+    colunas_ignoradas : List[str], opcional
+        Colunas do arquivo que não entram na clusterização (ex: ['ID']), por padrão None
+    tamanho_chunk : int, opcional
+        Número de linhas lidas por vez, por padrão 100_000
+    tamanho_amostra : int, opcional
+        Tamanho da amostra usada no ajuste do preprocessamento e na inicialização, por padrão 50_000
+    tamanho_lote : int, opcional
+        Tamanho de cada lote do `partial_fit`, por padrão 1024
+    n_epocas : int, opcional
+        Número de leituras completas para o refinamento dos centroides, por padrão 1
+    random_state : int, opcional
+        Valor para fixar o estado aleatório para reprodutibilidade, por padrão 42
+    sep : str, opcional
+        Separador do arquivo, por padrão ","
+
+    Returns
+    -------
+    dict
+        Segmentação com o preprocessamento, o MiniBatchKMeans, as colunas e as estatísticas
+        de referência usadas na detecção de drift (ver `medir_drift`).
+    """
+    from sklearn.cluster import KMeans, MiniBatchKMeans
+
+    rng = np.random.default_rng(random_state)
+
+    colunas_arquivo = pd.read_csv(caminho_entrada, sep=sep, nrows=0).columns
+    colunas_transformacao = colunas_por_transformacao(
+        colunas_arquivo,
+        COLUNAS_ONE_HOT_CLUSTERIZACAO,
+        COLUNAS_STANDARD_CLUSTERIZACAO,
+        colunas_ignoradas=colunas_ignoradas,
+    )
+    colunas = [coluna for bloco in colunas_transformacao.values() for coluna in bloco]
+
+    # 1ª leitura: categorias de toda a base + amostra de reservatório
+    categorias = {coluna: set() for coluna in colunas_transformacao["one-hot"]}
+    amostra = None
+    linhas_vistas = 0
+
+    for chunk in pd.read_csv(caminho_entrada, sep=sep, usecols=colunas, chunksize=tamanho_chunk):
+        chunk = chunk[colunas]
+        for coluna in categorias:
+            categorias[coluna].update(chunk[coluna].dropna().unique().tolist())
+
+        if amostra is None:
+            amostra = chunk.iloc[:0]
+        amostra = _atualizar_reservatorio(amostra, chunk, linhas_vistas, tamanho_amostra, rng)
+        linhas_vistas += len(chunk)
+
+    categorias = {coluna: sorted(valores) for coluna, valores in categorias.items()}
+
+    preprocessamento = construir_preprocessamento(colunas_transformacao, categorias=categorias)
+    X_amostra = preprocessamento.fit_transform(amostra)
+
+    inicial = KMeans(n_clusters=n_clusters, n_init=10, random_state=random_state).fit(X_amostra)
+
+    kmeans = MiniBatchKMeans(
+        n_clusters=n_clusters,
+        init=inicial.cluster_centers_,
+        n_init=1,
+        batch_size=tamanho_lote,
+        random_state=random_state,
+    )
+
+    # 2ª leitura em diante: refinamento dos centroides
+    for _ in range(n_epocas):
+        for chunk in pd.read_csv(caminho_entrada, sep=sep, usecols=colunas, chunksize=tamanho_chunk):
+            X_chunk = preprocessamento.transform(chunk[colunas])
+            for lote in _lotes(len(X_chunk), tamanho_lote, rng):
+                kmeans.partial_fit(X_chunk[lote])
+
+    segmentacao = {
+        "preprocessamento": preprocessamento,
+        "kmeans": kmeans,
+        "colunas": colunas,
+        "n_linhas": linhas_vistas,
+    }
+
+    # estatísticas de referência estimadas na amostra, já com os centroides finais
+    labels, distancias = _distancias(kmeans, X_amostra)
+    segmentacao["referencia"] = {
+        "proporcoes": np.bincount(labels, minlength=n_clusters) / len(labels),
+        "distancia_media": float(distancias.mean()),
+    }
+
+    return segmentacao
+
+
+def salvar_segmentacao(segmentacao, caminho=MODELO_SEGMENTACAO):
+    """Salva a segmentação (preprocessamento, centroides e referência de drift) com joblib."""
+    dump(segmentacao, caminho)
+
+
+def carregar_segmentacao(caminho=MODELO_SEGMENTACAO):
+    """Carrega a segmentação salva por `salvar_segmentacao`."""
+    return load(caminho)
+
+
+def atribuir_clusters(segmentacao, dataframe):
+    """Atribui cada cliente ao centroide mais próximo da segmentação.
+
+    Parameters
+    ----------
+    segmentacao : dict
+        Saída de `ajustar_segmentacao_em_chunks` ou `carregar_segmentacao`.
+    dataframe : pandas.DataFrame
+        Clientes com (pelo menos) as colunas usadas na segmentação.
+
+    Returns
+    -------
+    Tuple[np.ndarray, np.ndarray]
+        Cluster de cada linha e a distância quadrada ao respectivo centroide.
+    """
+    X = segmentacao["preprocessamento"].transform(dataframe[segmentacao["colunas"]])
+
+    return _distancias(segmentacao["kmeans"], X)
+
+
+def medir_drift(segmentacao, labels, distancias):
+    """Compara a distribuição de um lote de clientes atribuídos com a referência da segmentação.
+
+    Parameters
+    ----------
+    segmentacao : dict
+        Segmentação com as estatísticas de referência.
+    labels : np.ndarray
+        Clusters atribuídos (saída de `atribuir_clusters`).
+    distancias : np.ndarray
+        Distâncias quadradas aos centroides (saída de `atribuir_clusters`).
+
+    Returns
+    -------
+    dict
+        'psi': Population Stability Index entre as proporções de cada cluster e as da referência;
+        'razao_distancia': distância média do lote dividida pela distância média de referência.
+    """
+    contagens = np.bincount(labels, minlength=len(segmentacao["referencia"]["proporcoes"]))
+
+    return _drift(segmentacao["referencia"], contagens, float(np.mean(distancias)))
+
+
+def _drift(referencia, contagens, distancia_media):
+    esperado = np.clip(referencia["proporcoes"], _EPS, None)
+    observado = np.clip(contagens / max(contagens.sum(), 1), _EPS, None)
+
+    return {
+        "psi": float(np.sum((observado - esperado) * np.log(observado / esperado))),
+        "razao_distancia": distancia_media / referencia["distancia_media"],
+    }
+
+
+def atualizar_segmentacao(
+    segmentacao,
+    dataframe,
+    limite_psi=LIMITE_PSI,
+    limite_distancia=LIMITE_DISTANCIA,
+    minimo_linhas=MINIMO_LINHAS_DRIFT,
+    colunas_identificacao=None,
+    tamanho_lote=TAMANHO_LOTE,
+    random_state=RANDOM_STATE,
+):
+    """Atribui clusters aos clientes novos ou alterados e reajusta parcialmente se houver drift.
+
+    O custo depende apenas do número de clientes em `dataframe`: as linhas são preprocessadas e
+    atribuídas aos centroides existentes. Se o lote tiver pelo menos `minimo_linhas` linhas e o
+    PSI ou a razão de distâncias ultrapassarem os limites, os centroides são atualizados com
+    `partial_fit` nesse lote e os clientes são atribuídos novamente. A referência de drift passa
+    a ser a média ponderada (pelo número de linhas) entre a referência anterior e o lote.
+
+    Parameters
+    ----------
+    segmentacao : dict
+        Segmentação carregada (é alterada no lugar quando há reajuste).
+    dataframe : pandas.DataFrame
+        Clientes novos ou alterados.
+    limite_psi : float, opcional
+        PSI a partir do qual há reajuste, por padrão 0.2
+    limite_distancia : float, opcional
+        Razão de distâncias a partir da qual há reajuste, por padrão 1.25
+    minimo_linhas : int, opcional
+        Número mínimo de linhas para avaliar o drift, por padrão 100
+    colunas_identificacao : List[str], opcional
+        Colunas copiadas para a saída junto com o cluster (ex: ['ID']), por padrão None
+    tamanho_lote : int, opcional
+        Tamanho de cada lote do `partial_fit`, por padrão 1024
+    random_state : int, opcional
+        Semente do embaralhamento dos lotes, por padrão 42
+
+    Returns
+    -------
+    Tuple[pandas.DataFrame, dict]
+        Clusters dos clientes (colunas de identificação + 'cluster') e o resumo do drift, com
+        a chave 'reajustado' indicando se os centroides foram atualizados.
+    """
+    labels, distancias = atribuir_clusters(segmentacao, dataframe)
+    drift = medir_drift(segmentacao, labels, distancias)
+
+    reajustar = len(dataframe) >= minimo_linhas and (
+        drift["psi"] > limite_psi or drift["razao_distancia"] > limite_distancia
+    )
+
+    if reajustar:
+        rng = np.random.default_rng(random_state)
+        kmeans = segmentacao["kmeans"]
+        X = segmentacao["preprocessamento"].transform(dataframe[segmentacao["colunas"]])
+
+        for lote in _lotes(len(X), tamanho_lote, rng):
+            kmeans.partial_fit(X[lote])
+
+        labels, distancias = _distancias(kmeans, X)
+
+        referencia = segmentacao["referencia"]
+        peso = len(X) / (segmentacao["n_linhas"] + len(X))
+        referencia["proporcoes"] = (1 - peso) * referencia["proporcoes"] + peso * (
+            np.bincount(labels, minlength=kmeans.n_clusters) / len(labels)
+        )
+        referencia["distancia_media"] = (1 - peso) * referencia["distancia_media"] + peso * float(distancias.mean())
+        segmentacao["n_linhas"] += len(X)
+
+    drift["reajustado"] = reajustar
+
+    saida = dataframe[list(colunas_identificacao or [])].copy()
+    saida[COLUNA_CLUSTER] = labels
+
+    return saida, drift
+
+
+def atribuir_clusters_em_chunks(
+    caminho_entrada,
+    caminho_saida,
+    segmentacao=None,
+    colunas_identificacao=None,
+    tamanho_chunk=TAMANHO_CHUNK,
+    sep=",",
+):
+    """Atribui clusters a um arquivo CSV de clientes em blocos, sem reajustar os centroides.
+
+    Parameters
+    ----------
+    caminho_entrada : str ou pathlib.Path
+        Arquivo CSV com os clientes.
+    caminho_saida : str ou pathlib.Path
+        Arquivo CSV de saída (sobrescrito se existir).
+    segmentacao : dict, opcional
+        Segmentação ajustada, por padrão carrega `MODELO_SEGMENTACAO`
+    colunas_identificacao : List[str], opcional
+        Colunas copiadas para a saída junto com o cluster. Por padrão (None), todas as colunas
+        do arquivo são copiadas, como no `customers_clustered.csv` do notebook 02.
+    tamanho_chunk : int, opcional
+        Número de linhas lidas por vez, por padrão 100_000
+    sep : str, opcional
+        Separador do arquivo de entrada, por padrão ","
+
+    Returns
+    -------
+    dict
+        Resumo do drift da base inteira em relação à referência (ver `medir_drift`).
+    """
+    if segmentacao is None:
+        segmentacao = carregar_segmentacao()
+
+    usecols = None
+    if colunas_identificacao is not None:
+        usecols = list(colunas_identificacao) + [
+            coluna for coluna in segmentacao["colunas"] if coluna not in colunas_identificacao
+        ]
+
+    n_clusters = segmentacao["kmeans"].n_clusters
+    contagens = np.zeros(n_clusters, dtype=np.int64)
+    soma_distancias = 0.0
+
+    leitor = pd.read_csv(caminho_entrada, sep=sep, usecols=usecols, chunksize=tamanho_chunk)
+
+    for i, chunk in enumerate(leitor):
+        labels, distancias = atribuir_clusters(segmentacao, chunk)
+
+        saida = chunk.copy() if colunas_identificacao is None else chunk[list(colunas_identificacao)].copy()
+        saida[COLUNA_CLUSTER] = labels
+        saida.to_csv(caminho_saida, mode="w" if i == 0 else "a", header=(i == 0), index=False)
+
+        contagens += np.bincount(labels, minlength=n_clusters)
+        soma_distancias += float(distancias.sum())
+
+    return _drift(segmentacao["referencia"], contagens, soma_distancias / max(int(contagens.sum()), 1))
@@ -0,0 +1,252 @@
+import numpy as np
+import pandas as pd
+from scipy.stats import chi2, norm
+
+
+LIMITE_P = 0.05
+# valores (linhas x colunas) ordenados de uma vez no Mann-Whitney: limita a memória das matrizes
+# de ordem, ranks e grupos de empate (~8 bytes por valor em cada uma)
+VALORES_POR_BLOCO = 2_000_000
+
+
+def corrigir_p_valores(p_valores, metodo="fdr_bh"):
+    """Corrige p-valores para múltiplos testes.
+
+    Parameters
+    ----------
+    p_valores : array-like
+        P-valores de cada teste.
+    metodo : str, opcional
+        'fdr_bh' (Benjamini-Hochberg), 'bonferroni' ou None (sem correção), por padrão 'fdr_bh'
+
+    Returns
+    -------
+    np.ndarray
+        P-valores ajustados (limitados a 1).
+    """
+    p_valores = np.asarray(p_valores, dtype=float)
+    m = len(p_valores)
+
+    if metodo is None or m == 0:
+        return p_valores.copy()
+
+    if metodo == "bonferroni":
+        return np.minimum(p_valores * m, 1.0)
+
+    if metodo == "fdr_bh":
+        ordem = np.argsort(p_valores)
+        ajustados = p_valores[ordem] * m / np.arange(1, m + 1)
+        ajustados = np.minimum.accumulate(ajustados[::-1])[::-1]
+
+        resultado = np.empty(m)
+        resultado[ordem] = np.minimum(ajustados, 1.0)
+        return resultado
+
+    raise ValueError(f"Método de correção desconhecido: '{metodo}'. Use 'fdr_bh', 'bonferroni' ou None.")
+
+
+def _grupos_empatados(ordenado):
+    # id (global) do grupo de valores empatados de cada posição e número de grupos de cada linha
+    # (cada linha de `ordenado` é uma coluna do dataframe, já ordenada)
+    inicio = np.ones(ordenado.shape, dtype=bool)
+    inicio[:, 1:] = ordenado[:, 1:] != ordenado[:, :-1]
+
+    grupos = np.cumsum(inicio, axis=1) - 1
+    n_grupos = grupos[:, -1] + 1
+    deslocamento = np.r_[0, np.cumsum(n_grupos)[:-1]]
+
+    return grupos + deslocamento[:, None], n_grupos
+
+
+def _codificar(serie):
+    # código inteiro de cada categoria (-1 para faltantes) e número de códigos possíveis.
+    # A ordem das categorias não altera o teste, então categóricas usam os próprios códigos e
+    # inteiros com poucos valores distintos usam o deslocamento até o mínimo (sem hash).
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        return serie.cat.codes.to_numpy(), len(serie.cat.categories)
+
+    if pd.api.types.is_integer_dtype(serie.dtype) or pd.api.types.is_bool_dtype(serie.dtype):
+        valores = serie.to_numpy().astype(np.int64)
+        minimo, maximo = valores.min(), valores.max()
+        if maximo - minimo < max(len(valores), 1):
+            return valores - minimo, int(maximo - minimo + 1)
+
+    codigos, categorias = pd.factorize(serie)
+    return codigos, len(categorias)
+
+
+def _dataframe_resultados(colunas, estatisticas, p_valores, limite_p, correcao):
+    p_ajustados = corrigir_p_valores(p_valores, correcao)
+
+    return pd.DataFrame({
+        "feature": list(colunas),
+        "statistic": estatisticas,
+        "p_value": p_valores,
+        "p_value_ajustado": p_ajustados,
+        "correlacao": np.where(p_ajustados < limite_p, "Significativa", "Não Significativa"),
+    }).sort_values(by="p_value")
+
+
+def _somas_ranks_bloco(X, y):
+    # soma dos ranks do grupo positivo e termo de empates (soma de t³ - t) de cada linha de X
+    n_colunas, n = X.shape
+
+    ordem = np.argsort(X, axis=1)
+    ordenado = np.take_along_axis(X, ordem, axis=1)
+    grupos, n_grupos = _grupos_empatados(ordenado)
+    total_grupos = int(n_grupos.sum())
+
+    # rank médio de cada grupo de empate (ranks começam em 1) e número de positivos em cada grupo
+    grupos = grupos.ravel()
+    posicoes = np.broadcast_to(np.arange(1, n + 1), X.shape).ravel()
+    tamanhos = np.bincount(grupos, minlength=total_grupos)
+    rank_medio = np.bincount(grupos, weights=posicoes, minlength=total_grupos) / tamanhos
+    positivos = np.bincount(grupos, weights=y[ordem].ravel(), minlength=total_grupos)
+
+    coluna_do_grupo = np.repeat(np.arange(n_colunas), n_grupos)
+    soma_ranks_1 = np.bincount(coluna_do_grupo, weights=positivos * rank_medio, minlength=n_colunas)
+    termo_empates = np.bincount(coluna_do_grupo, weights=tamanhos ** 3.0 - tamanhos, minlength=n_colunas)
+
+    return soma_ranks_1, termo_empates
+
+
+def teste_mann_whitney(
+    dataframe,
+    colunas,
+    coluna_target="Response",
+    limite_p=LIMITE_P,
+    correcao="fdr_bh",
+    valores_por_bloco=VALORES_POR_BLOCO,
+):
+    """Teste de Mann-Whitney U (bicaudal) de todas as colunas numéricas contra um target binário.
+
+    As colunas são ordenadas em blocos (um único `argsort` por bloco na matriz transposta, sem
+    loop em Python por coluna) e as somas de ranks de cada grupo saem de contagens por grupo de
+    empate. O resultado é o mesmo de
+    `scipy.stats.mannwhitneyu(grupo_0, grupo_1, alternative='two-sided', method='asymptotic')`:
+    a estatística é o U do grupo com target == 0 e o p-valor usa a aproximação normal com correção
+    de empates e de continuidade (para amostras grandes, é também o método padrão do scipy).
+
+    Parameters
+    ----------
+    dataframe : pandas.DataFrame
+        Dataframe com os dados (sem valores faltantes nas colunas testadas).
+    colunas : List[str]
+        Colunas numéricas a serem testadas.
+    coluna_target : str, opcional
+        Coluna com o target binário (0/1), por padrão 'Response'
+    limite_p : float, opcional
+        Nível de significância aplicado ao p-valor ajustado, por padrão 0.05
+    correcao : str, opcional
+        Correção para múltiplos testes (ver `corrigir_p_valores`), por padrão 'fdr_bh'
+    valores_por_bloco : int, opcional
+        Número aproximado de valores (linhas x colunas) ordenados de uma vez; cada bloco tem pelo
+        menos uma coluna, por padrão 2_000_000
+
+    Returns
+    -------
+    pd.DataFrame
+        Colunas 'feature', 'statistic', 'p_value', 'p_value_ajustado' e 'correlacao', ordenado pelo p-valor.
+    """
+    colunas = list(colunas)
+    y = (dataframe[coluna_target].to_numpy() == 1).astype(float)
+
+    n_colunas, n = len(colunas), len(y)
+    n1 = y.sum()
+    n0 = n - n1
+
+    soma_ranks_1 = np.zeros(n_colunas)
+    termo_empates = np.zeros(n_colunas)
+    colunas_por_bloco = max(1, valores_por_bloco // max(n, 1))
+
+    for inicio in range(0, n_colunas, colunas_por_bloco):
+        bloco = slice(inicio, inicio + colunas_por_bloco)
+        # uma linha por coluna testada (ordenação contígua na memória)
+        X = np.ascontiguousarray(dataframe[colunas[bloco]].to_numpy(dtype=float).T)
+
+        if np.isnan(X).any():
+            raise ValueError("As colunas testadas não podem ter valores faltantes.")
+
+        soma_ranks_1[bloco], termo_empates[bloco] = _somas_ranks_bloco(X, y)
+
+    soma_ranks_0 = n * (n + 1) / 2 - soma_ranks_1
+    u0 = soma_ranks_0 - n0 * (n0 + 1) / 2
+
+    u = np.maximum(u0, n0 * n1 - u0)
+    media = n0 * n1 / 2
+    desvio = np.sqrt(n0 * n1 / 12 * ((n + 1) - termo_empates / (n * (n - 1))))
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z = (u - media - 0.5) / desvio
+    p_valores = np.clip(2 * norm.sf(z), 0, 1)
+
+    return _dataframe_resultados(colunas, u0, p_valores, limite_p, correcao)
+
+
+def teste_qui_quadrado(dataframe, colunas, coluna_target="Response", limite_p=LIMITE_P, correcao="fdr_bh"):
+    """Teste de qui-quadrado de independência de todas as colunas categóricas contra o target.
+
+    As tabelas de contingência de todas as colunas saem de uma única contagem (`np.bincount`) dos
+    pares (categoria, target), e as estatísticas são calculadas de uma vez em tabelas completadas
+    com zeros. O resultado é o mesmo de `scipy.stats.chi2_contingency(pd.crosstab(target, coluna))`,
+    inclusive a correção de Yates quando a tabela tem 1 grau de liberdade.
+
+    Parameters
+    ----------
+    dataframe : pandas.DataFrame
+        Dataframe com os dados. Valores faltantes são ignorados (como no `pd.crosstab`).
+    colunas : List[str]
+        Colunas categóricas ou ordinais a serem testadas.
+    coluna_target : str, opcional
+        Coluna com o target, por padrão 'Response'
+    limite_p : float, opcional
+        Nível de significância aplicado ao p-valor ajustado, por padrão 0.05
+    correcao : str, opcional
+        Correção para múltiplos testes (ver `corrigir_p_valores`), por padrão 'fdr_bh'
+
+    Returns
+    -------
+    pd.DataFrame
+        Colunas 'feature', 'statistic', 'p_value', 'p_value_ajustado' e 'correlacao', ordenado pelo p-valor.
+    """
+    codigos_target, classes = pd.factorize(dataframe[coluna_target], sort=True)
+    n_classes = len(classes)
+
+    n = len(dataframe)
+    codigos = np.empty((len(colunas), n), dtype=np.int64)
+    n_categorias = np.empty(len(colunas), dtype=np.int64)
+
+    for i, coluna in enumerate(colunas):
+        codigos[i], n_categorias[i] = _codificar(dataframe[coluna])
+
+    max_categorias = int(n_categorias.max())
+    n_chaves = len(colunas) * max_categorias * n_classes
+
+    # uma única contagem de (coluna, categoria, classe do target) para todas as colunas
+    validas = (codigos >= 0) & (codigos_target >= 0)
+    chaves = (np.arange(len(colunas))[:, None] * max_categorias + codigos) * n_classes + codigos_target
+    observado = np.bincount(chaves[validas], minlength=n_chaves).reshape(
+        len(colunas), max_categorias, n_classes
+    ).astype(float)
+
+    total = observado.sum(axis=(1, 2), keepdims=True)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        esperado = observado.sum(axis=2, keepdims=True) * observado.sum(axis=1, keepdims=True) / total
+
+    linhas_presentes = (observado.sum(axis=1) > 0).sum(axis=1)
+    colunas_presentes = (observado.sum(axis=2) > 0).sum(axis=1)
+    graus_liberdade = (linhas_presentes - 1) * (colunas_presentes - 1)
+
+    # correção de Yates (como no scipy): aproxima o observado do esperado em até 0.5
+    diferenca = observado - esperado
+    yates = (graus_liberdade == 1)[:, None, None]
+    diferenca = np.where(yates, np.sign(diferenca) * np.maximum(np.abs(diferenca) - 0.5, 0), diferenca)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        termos = np.where(esperado > 0, diferenca ** 2 / esperado, 0.0)
+    estatisticas = termos.sum(axis=(1, 2))
+
+    p_valores = np.where(graus_liberdade > 0, chi2.sf(estatisticas, np.maximum(graus_liberdade, 1)), 1.0)
+    estatisticas = np.where(graus_liberdade > 0, estatisticas, 0.0)
+
+    return _dataframe_resultados(colunas, estatisticas, p_valores, limite_p, correcao)
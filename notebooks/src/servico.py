@@ -0,0 +1,514 @@
+"""Serviço HTTP de escoragem em tempo real do modelo da campanha.
+
+Responde "devemos contatar este cliente?" com a probabilidade de resposta do pipeline de
+`PASTA_MODELOS`. Usa apenas a biblioteca padrão (asyncio) e o caminho rápido da escoragem:
+
+- o modelo é carregado uma vez por worker e exportado para arrays NumPy
+  (`escoragem.exportar_pipeline_linear`); com `--exportado` o worker nem importa o sklearn;
+- requisições que chegam dentro de poucos milissegundos são agrupadas em um único lote
+  vetorizado (`escoragem.escorar_lote`), sem o custo fixo do Pipeline por requisição;
+- com `--workers N`, N processos escutam na mesma porta (SO_REUSEPORT, Linux) e o kernel
+  distribui as conexões entre eles.
+
+Rotas:
+
+    POST /escorar   {"Income": 58138.0, ...}            -> {"probabilidade_resposta": 0.63, "contatar": true}
+                    {"clientes": [{...}, {...}]}          -> {"resultados": [{...}, {...}]}
+    GET  /saude     fila, número de requisições e lotes e histograma do tamanho dos lotes
+
+'contatar' compara a probabilidade com o limiar de `limiar_contato` (lucro máximo nas previsões
+out-of-fold do modelo, ou 0.5); um `--limiar` informado deve estar na mesma escala das
+probabilidades do modelo, que não são calibradas (class_weight='balanced').
+
+Uso (a partir da pasta `notebooks`):
+
+    python -m src.servico --porta 8000 --workers 4
+"""
+import argparse
+import asyncio
+import json
+import math
+import multiprocessing
+import os
+import signal
+import sys
+import time
+from http import HTTPStatus
+
+from .config import MODELO_CAMPANHA, PASTA_OOF
+
+
+HOST = "0.0.0.0"
+PORTA = 8000
+ESPERA_LOTE_MS = 2.0
+TAMANHO_MAXIMO_LOTE = 1024
+TAMANHO_MAXIMO_CORPO = 1 << 20
+
+# corte do `predict` do modelo, usado quando não há previsões out-of-fold salvas. O ponto de
+# equilíbrio custo / receita (3 / 11) só vale para probabilidades calibradas, e o modelo da
+# campanha (class_weight='balanced') superestima a probabilidade de resposta
+LIMIAR_PADRAO = 0.5
+
+
+# ------------------------------------------------------------------------------------------------
+# Modelo
+# ------------------------------------------------------------------------------------------------
+
+def carregar_escorador(caminho_modelo=MODELO_CAMPANHA, caminho_exportado=None):
+    """Carrega o modelo e devolve a função que escora um lote de clientes.
+
+    Parameters
+    ----------
+    caminho_modelo : str ou pathlib.Path, opcional
+        Pipeline do sklearn salvo com joblib, por padrão o modelo da campanha
+    caminho_exportado : str ou pathlib.Path, opcional
+        Pipeline salvo por `escoragem.salvar_pipeline_exportado`; quando informado, o sklearn
+        não é importado, por padrão None
+
+    Returns
+    -------
+    Tuple[Callable, List[str], str]
+        Função `escorar(colunas, n_linhas)` (colunas = {coluna: lista de valores}) que devolve as
+        probabilidades, colunas obrigatórias de cada cliente e a descrição do caminho usado.
+    """
+    from . import escoragem
+
+    if caminho_exportado is not None:
+        exportado = escoragem.carregar_pipeline_exportado(caminho_exportado)
+        descricao = f"exportado ({caminho_exportado})"
+    else:
+        modelo = escoragem.carregar_modelo(caminho_modelo)
+        try:
+            exportado = escoragem.exportar_pipeline_linear(modelo)
+            descricao = f"exportado de {caminho_modelo}"
+        except ValueError:
+            # modelo não linear: predict_proba do pipeline, ainda assim uma vez por lote
+            import pandas as pd
+
+            def escorar(colunas, n_linhas):
+                return escoragem.escorar_dataframe(modelo, pd.DataFrame(colunas))
+
+            return escorar, list(modelo.feature_names_in_), f"pipeline sklearn ({caminho_modelo})"
+
+    colunas = list(dict.fromkeys(
+        list(exportado["colunas_lineares"])
+        + [coluna for coluna, *_ in exportado["potencias"]]
+        + list(exportado["tabelas_categoricas"])
+    ))
+
+    def escorar(colunas_lote, n_linhas):
+        return escoragem.escorar_lote(exportado, colunas_lote)
+
+    return escorar, colunas, descricao
+
+
+def limiar_contato(caminho_modelo=MODELO_CAMPANHA, pasta_oof=PASTA_OOF):
+    """Probabilidade a partir da qual o cliente deve ser contatado.
+
+    É o limiar de maior lucro (`lucro.limiar_otimo`) nas probabilidades out-of-fold do modelo
+    (`oof.carregar_oof`, mesmo nome do arquivo do modelo), ou `LIMIAR_PADRAO` (0.5) se elas não
+    tiverem sido salvas.
+
+    Parameters
+    ----------
+    caminho_modelo : str ou pathlib.Path, opcional
+        Pipeline do sklearn salvo com joblib, por padrão o modelo da campanha
+    pasta_oof : pathlib.Path, opcional
+        Pasta das previsões out-of-fold, por padrão `PASTA_OOF`
+
+    Returns
+    -------
+    Tuple[float, str]
+        Limiar e a origem dele (exibida em /saude).
+    """
+    from pathlib import Path
+
+    from .oof import caminho_oof
+
+    nome = Path(caminho_modelo).stem
+    if not caminho_oof(nome, pasta_oof).exists():
+        return LIMIAR_PADRAO, "padrão (0.5)"
+
+    from .lucro import curva_lucro, limiar_otimo
+    from .oof import carregar_oof
+
+    oof = carregar_oof(nome, pasta_oof)
+    limiar = float(limiar_otimo(curva_lucro(oof["y_proba"], oof["y_true"]))["limiar"])
+    return limiar, f"lucro máximo out-of-fold ({nome})"
+
+
+# ------------------------------------------------------------------------------------------------
+# Micro-lotes
+# ------------------------------------------------------------------------------------------------
+
+def _resolver(futuro, resultado):
+    if isinstance(resultado, Exception):
+        futuro.set_exception(resultado)
+    else:
+        futuro.set_result(resultado)
+
+
+class AgrupadorLotes:
+    """Junta os clientes de requisições próximas no tempo e escora todos de uma vez.
+
+    O primeiro cliente que chega com a fila vazia agenda o processamento para daqui a
+    `espera_maxima` segundos; se a fila chegar a `tamanho_maximo` clientes antes disso, o lote é
+    processado imediatamente. Cada requisição recebe a fatia de probabilidades dos seus clientes.
+
+    Parameters
+    ----------
+    escorar : Callable
+        Função de `carregar_escorador`.
+    colunas : List[str]
+        Colunas obrigatórias de cada cliente.
+    espera_maxima : float, opcional
+        Espera máxima (s) antes de processar um lote, por padrão 0.002
+    tamanho_maximo : int, opcional
+        Número de clientes que dispara o processamento imediato, por padrão 1024
+    """
+
+    def __init__(self, escorar, colunas, espera_maxima=ESPERA_LOTE_MS / 1000, tamanho_maximo=TAMANHO_MAXIMO_LOTE):
+        self.escorar = escorar
+        self.colunas = colunas
+        self.espera_maxima = espera_maxima
+        self.tamanho_maximo = tamanho_maximo
+
+        self._pendentes = []
+        self._clientes_pendentes = 0
+        self._agendado = None
+
+        self.requisicoes = 0
+        self.clientes = 0
+        self.lotes = 0
+        self.erros = 0
+        self.fila_maxima = 0
+        self.tempo_escoragem = 0.0
+        self.histograma_lotes = {}
+
+    def validar(self, clientes):
+        """Levanta ValueError se algum cliente não for um objeto com as colunas do modelo.
+
+        NaN e Infinity (aceitos pelo `json.loads`) também são rejeitados.
+        """
+        for cliente in clientes:
+            if not isinstance(cliente, dict):
+                raise ValueError("Cada cliente deve ser um objeto JSON {coluna: valor}.")
+            faltantes = [coluna for coluna in self.colunas if coluna not in cliente]
+            if faltantes:
+                raise ValueError(f"Colunas faltantes: {faltantes}")
+            nao_finitas = [
+                coluna for coluna in self.colunas
+                if isinstance(cliente[coluna], float) and not math.isfinite(cliente[coluna])
+            ]
+            if nao_finitas:
+                raise ValueError(f"Valores não finitos: {nao_finitas}")
+
+    async def escorar_clientes(self, clientes):
+        """Coloca os clientes na fila e espera as probabilidades do lote em que forem processados."""
+        futuro = asyncio.get_running_loop().create_future()
+        self._pendentes.append((clientes, futuro))
+        self._clientes_pendentes += len(clientes)
+        self.requisicoes += 1
+        self.fila_maxima = max(self.fila_maxima, self._clientes_pendentes)
+
+        if self._clientes_pendentes >= self.tamanho_maximo:
+            self._processar()
+        elif self._agendado is None:
+            self._agendado = asyncio.get_running_loop().call_later(self.espera_maxima, self._processar)
+
+        return await futuro
+
+    def _escorar(self, clientes):
+        colunas = {coluna: [cliente[coluna] for cliente in clientes] for coluna in self.colunas}
+        return self.escorar(colunas, len(clientes))
+
+    def _processar(self):
+        if self._agendado is not None:
+            self._agendado.cancel()
+            self._agendado = None
+
+        pendentes, self._pendentes = self._pendentes, []
+        n_clientes, self._clientes_pendentes = self._clientes_pendentes, 0
+        if not pendentes:
+            return
+
+        inicio = time.perf_counter()
+        try:
+            probabilidades = self._escorar([cliente for clientes, _ in pendentes for cliente in clientes])
+        except Exception:
+            # um valor inválido não derruba o lote: cada requisição é escorada separadamente
+            for clientes, futuro in pendentes:
+                try:
+                    resultado = self._escorar(clientes)
+                except Exception as erro:
+                    self.erros += 1
+                    resultado = erro
+                if not futuro.done():
+                    _resolver(futuro, resultado)
+        else:
+            inicio_fatia = 0
+            for clientes, futuro in pendentes:
+                # a requisição pode ter sido cancelada (conexão fechada) enquanto esperava o lote
+                if not futuro.done():
+                    futuro.set_result(probabilidades[inicio_fatia:inicio_fatia + len(clientes)])
+                inicio_fatia += len(clientes)
+
+        self.tempo_escoragem += time.perf_counter() - inicio
+        self.lotes += 1
+        self.clientes += n_clientes
+
+        faixa = 1 << (n_clientes - 1).bit_length()
+        self.histograma_lotes[faixa] = self.histograma_lotes.get(faixa, 0) + 1
+
+    def metricas(self):
+        return {
+            "fila_clientes": self._clientes_pendentes,
+            "fila_requisicoes": len(self._pendentes),
+            "fila_maxima": self.fila_maxima,
+            "requisicoes": self.requisicoes,
+            "clientes": self.clientes,
+            "lotes": self.lotes,
+            "erros": self.erros,
+            "clientes_por_lote": self.clientes / self.lotes if self.lotes else 0.0,
+            "tempo_medio_lote_ms": 1000 * self.tempo_escoragem / self.lotes if self.lotes else 0.0,
+            # faixa -> número de lotes com até `faixa` clientes (potências de 2)
+            "histograma_lotes": {f"<={faixa}": n for faixa, n in sorted(self.histograma_lotes.items())},
+        }
+
+
+# ------------------------------------------------------------------------------------------------
+# HTTP
+# ------------------------------------------------------------------------------------------------
+
+def _resposta_http(status, corpo, manter_conexao):
+    conteudo = json.dumps(corpo, allow_nan=False).encode()
+    cabecalho = (
+        f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+        "Content-Type: application/json\r\n"
+        f"Content-Length: {len(conteudo)}\r\n"
+        f"Connection: {'keep-alive' if manter_conexao else 'close'}\r\n\r\n"
+    )
+    return cabecalho.encode("latin-1") + conteudo
+
+
+class ServicoEscoragem:
+    """Servidor HTTP/1.1 (keep-alive) com as rotas `POST /escorar` e `GET /saude`.
+
+    Parameters
+    ----------
+    agrupador : AgrupadorLotes
+        Fila de micro-lotes do modelo.
+    descricao_modelo : str, opcional
+        Caminho do modelo exibido em /saude, por padrão ""
+    limiar : float, opcional
+        Probabilidade a partir da qual 'contatar' é true (na escala das probabilidades do modelo),
+        por padrão 0.5 (ver `limiar_contato`)
+    """
+
+    def __init__(self, agrupador, descricao_modelo="", limiar=LIMIAR_PADRAO):
+        self.agrupador = agrupador
+        self.descricao_modelo = descricao_modelo
+        self.limiar = limiar
+        self.inicio = time.time()
+        self.conexoes = 0
+
+    def _resultado(self, probabilidade):
+        probabilidade = float(probabilidade)
+        return {"probabilidade_resposta": probabilidade, "contatar": probabilidade >= self.limiar}
+
+    async def _escorar(self, corpo):
+        try:
+            dados = json.loads(corpo)
+        except ValueError:
+            return HTTPStatus.BAD_REQUEST, {"erro": "Corpo não é um JSON válido."}
+
+        varios = isinstance(dados, dict) and "clientes" in dados
+        clientes = dados["clientes"] if varios else [dados]
+
+        try:
+            if not isinstance(clientes, list) or not clientes:
+                raise ValueError("'clientes' deve ser uma lista não vazia.")
+            self.agrupador.validar(clientes)
+            probabilidades = await self.agrupador.escorar_clientes(clientes)
+        except (ValueError, TypeError) as erro:
+            return HTTPStatus.BAD_REQUEST, {"erro": str(erro)}
+
+        # campos numéricos nulos viram NaN na escoragem e a probabilidade sai NaN
+        invalidos = [i for i, p in enumerate(probabilidades) if not math.isfinite(p)]
+        if invalidos:
+            return HTTPStatus.BAD_REQUEST, {
+                "erro": f"Valores nulos ou não numéricos nos clientes {invalidos}."
+            }
+
+        if varios:
+            return HTTPStatus.OK, {"resultados": [self._resultado(p) for p in probabilidades]}
+        return HTTPStatus.OK, self._resultado(probabilidades[0])
+
+    def _saude(self):
+        return HTTPStatus.OK, {
+            "status": "ok",
+            "pid": os.getpid(),
+            "modelo": self.descricao_modelo,
+            "limiar": self.limiar,
+            "segundos_ativo": time.time() - self.inicio,
+            "conexoes_abertas": self.conexoes,
+            **self.agrupador.metricas(),
+        }
+
+    async def _rotear(self, metodo, caminho, corpo):
+        caminho = caminho.split("?", 1)[0]
+
+        if caminho == "/escorar":
+            if metodo != "POST":
+                return HTTPStatus.METHOD_NOT_ALLOWED, {"erro": "Use POST."}
+            return await self._escorar(corpo)
+
+        if caminho == "/saude":
+            return self._saude()
+
+        return HTTPStatus.NOT_FOUND, {"erro": f"Rota desconhecida: {caminho}"}
+
+    async def atender(self, reader, writer):
+        self.conexoes += 1
+        try:
+            while True:
+                try:
+                    cabecalho = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    break
+
+                linha, *linhas = cabecalho.decode("latin-1").rstrip("\r\n").split("\r\n")
+                try:
+                    metodo, caminho, versao = linha.split(" ", 2)
+                except ValueError:
+                    writer.write(_resposta_http(HTTPStatus.BAD_REQUEST, {"erro": "Requisição inválida."}, False))
+                    break
+
+                cabecalhos = {}
+                for item in linhas:
+                    nome, _, valor = item.partition(":")
+                    cabecalhos[nome.strip().lower()] = valor.strip()
+
+                try:
+                    tamanho = int(cabecalhos.get("content-length") or 0)
+                    if tamanho < 0:
+                        raise ValueError
+                except ValueError:
+                    writer.write(_resposta_http(HTTPStatus.BAD_REQUEST, {"erro": "Content-Length inválido."}, False))
+                    break
+
+                if tamanho > TAMANHO_MAXIMO_CORPO:
+                    writer.write(_resposta_http(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {"erro": "Corpo muito grande."}, False))
+                    break
+
+                try:
+                    corpo = await reader.readexactly(tamanho)
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+
+                status, resposta = await self._rotear(metodo, caminho, corpo)
+
+                manter = versao == "HTTP/1.1" and cabecalhos.get("connection", "").lower() != "close"
+                writer.write(_resposta_http(status, resposta, manter))
+                await writer.drain()
+
+                if not manter:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            self.conexoes -= 1
+            writer.close()
+
+
+async def servir(
+    host=HOST,
+    porta=PORTA,
+    caminho_modelo=MODELO_CAMPANHA,
+    caminho_exportado=None,
+    espera_ms=ESPERA_LOTE_MS,
+    tamanho_lote=TAMANHO_MAXIMO_LOTE,
+    limiar=None,
+    reuse_port=False,
+):
+    """Carrega o modelo e atende requisições até receber SIGINT/SIGTERM.
+
+    Sem `limiar`, usa `limiar_contato(caminho_modelo)`.
+    """
+    escorar, colunas, descricao = carregar_escorador(caminho_modelo, caminho_exportado)
+    if limiar is None:
+        limiar, origem = limiar_contato(caminho_modelo)
+        print(f"[{os.getpid()}] limiar {limiar:.4f} - {origem}", flush=True)
+    agrupador = AgrupadorLotes(escorar, colunas, espera_ms / 1000, tamanho_lote)
+    servico = ServicoEscoragem(agrupador, descricao, limiar)
+
+    parar = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sinal in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sinal, parar.set)
+
+    servidor = await asyncio.start_server(
+        servico.atender, host, porta, reuse_port=reuse_port or None, backlog=4096
+    )
+    print(f"[{os.getpid()}] escutando em {host}:{porta} - modelo: {descricao}", flush=True)
+
+    async with servidor:
+        await parar.wait()
+
+
+def _executar_worker(parametros):
+    asyncio.run(servir(**parametros, reuse_port=True))
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Serviço HTTP de escoragem do modelo da campanha.")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--porta", type=int, default=PORTA)
+    parser.add_argument("--workers", type=int, default=1, help="Processos escutando na mesma porta (SO_REUSEPORT)")
+    parser.add_argument("--modelo", default=MODELO_CAMPANHA, help="Pipeline do sklearn (.joblib)")
+    parser.add_argument("--exportado", help="Pipeline exportado (.joblib); dispensa o sklearn")
+    parser.add_argument("--espera-ms", type=float, default=ESPERA_LOTE_MS, help="Espera máxima para formar um lote")
+    parser.add_argument("--tamanho-lote", type=int, default=TAMANHO_MAXIMO_LOTE, help="Clientes por lote")
+    parser.add_argument(
+        "--limiar", type=float,
+        help="Probabilidade mínima para contatar, na escala das probabilidades do modelo (padrão: limiar "
+        "de lucro máximo das previsões out-of-fold do modelo, ou 0.5 sem elas)",
+    )
+    argumentos = parser.parse_args(argumentos)
+
+    parametros = {
+        "host": argumentos.host,
+        "porta": argumentos.porta,
+        "caminho_modelo": argumentos.modelo,
+        "caminho_exportado": argumentos.exportado,
+        "espera_ms": argumentos.espera_ms,
+        "tamanho_lote": argumentos.tamanho_lote,
+        "limiar": argumentos.limiar,
+    }
+
+    if argumentos.workers == 1:
+        asyncio.run(servir(**parametros))
+        return
+
+    workers = [
+        multiprocessing.Process(target=_executar_worker, args=(parametros,), daemon=True)
+        for _ in range(argumentos.workers)
+    ]
+    for worker in workers:
+        worker.start()
+
+    # SIGTERM no processo principal também encerra os workers
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        for worker in workers:
+            worker.join()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for worker in workers:
+            worker.terminate()
+            worker.join()
+
+
+if __name__ == "__main__":
+    main()